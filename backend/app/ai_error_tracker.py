@@ -1,4 +1,5 @@
 from backend.app.core.logging_config import get_logger, log_exception
+from backend.app.core.request_context import current_request_id
 
 ai_logger = get_logger('app')
 
@@ -14,32 +15,91 @@ import json
 import traceback
 import logging
 import sys
+import os
+import re
+import gzip
+import hashlib
+import queue
+import shutil
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 import inspect
 
+# JSONL segment rotation for the AI error log
+AI_LOG_MAX_BYTES = int(os.getenv("AI_ERROR_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+AI_LOG_MAX_AGE = float(os.getenv("AI_ERROR_LOG_MAX_AGE", "86400"))
+AI_LOG_BACKUPS = int(os.getenv("AI_ERROR_LOG_BACKUPS", "10"))
+AI_LOG_GZIP = os.getenv("AI_ERROR_LOG_GZIP", "true").lower() in ("1", "true", "yes")
+# Minimum seconds between sidecar index rewrites
+AI_LOG_INDEX_INTERVAL = float(os.getenv("AI_ERROR_LOG_INDEX_INTERVAL", "5"))
+
+# track_error only enqueues; a writer thread builds and persists the full record.
+# Above the high-water mark non-CRITICAL events are sampled 1-in-N; when full they are dropped.
+AI_QUEUE_ASYNC = os.getenv("AI_ERROR_QUEUE_ASYNC", "true").lower() in ("1", "true", "yes")
+AI_QUEUE_SIZE = int(os.getenv("AI_ERROR_QUEUE_SIZE", "1000"))
+AI_QUEUE_SAMPLE_AT = float(os.getenv("AI_ERROR_QUEUE_SAMPLE_AT", "0.8"))
+AI_QUEUE_SAMPLE_RATE = int(os.getenv("AI_ERROR_QUEUE_SAMPLE_RATE", "10"))
+
+# Fingerprint dedup: only novel errors are persisted in full; repeats are counted
+# and summarized by a rollup record at most once per interval per fingerprint.
+# Exemplars go into those JSONL records; the index keeps just count and last_seen
+# per fingerprint, so a fingerprint seen again after a restart is logged in full once.
+AI_ROLLUP_INTERVAL = float(os.getenv("AI_ERROR_ROLLUP_INTERVAL", "60"))
+AI_MAX_FINGERPRINTS = int(os.getenv("AI_ERROR_MAX_FINGERPRINTS", "1000"))
+AI_MAX_EXEMPLARS = int(os.getenv("AI_ERROR_MAX_EXEMPLARS", "3"))
+AI_FINGERPRINT_FRAMES = 3
+
+_STOP = object()
+
+_NORMALIZERS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\d+(\.\d+)?"), "<n>"),
+]
+
+
+def normalize_message(message: str) -> str:
+    """Strip volatile parts (ids, numbers, quoted values) so repeats share a fingerprint."""
+    for rx, repl in _NORMALIZERS:
+        message = rx.sub(repl, message)
+    return message[:500]
+
 class AIErrorTracker:
     """
     Advanced error tracking system designed for AI analysis and recognition.
     Logs errors in structured JSON format with context and metadata.
     """
     
-    def __init__(self, log_file: str = "ai_error_log.json"):
+    def __init__(self, log_file: str = "ai_error_log.jsonl"):
+        # Active segment is append-only JSONL; rotated segments sit next to it as
+        # ai_error_log.<timestamp>.jsonl[.gz] and ai_error_log.index.json holds the counters.
         self.log_file = Path(log_file)
+        self.index_file = self.log_file.with_name(self.log_file.stem + ".index.json")
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=5)
+        self._segment_started = time.time()
+        self._index_written_at = 0.0
+        self._counters = self._load_index()
+        self._queue = queue.Queue(maxsize=AI_QUEUE_SIZE)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        # Bumped from request threads, I/O executor threads and the writer thread
+        self._stats_lock = threading.Lock()
+        self._sample_counter = 0
+        self.queue_stats = {"enqueued": 0, "written": 0, "deduplicated": 0, "rollups": 0,
+                            "dropped_full": 0, "dropped_sampled": 0, "write_errors": 0}
         self.setup_logging()
         
     def setup_logging(self):
         """Setup structured logging for AI analysis"""
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('debug.log'),
-                logging.StreamHandler()
-            ]
-        )
+        # Root handlers and level are configured once in main.py (LOG_LEVEL); configuring them here,
+        # at import time, pinned the root logger to DEBUG and made main's configuration a no-op
         self.logger = logging.getLogger(__name__)
         
     def log_error(self, 
@@ -61,22 +121,208 @@ class AIErrorTracker:
             severity: ERROR, WARNING, CRITICAL, INFO
         """
         
-        # Get caller information
+        # Capture everything that depends on the calling thread now; the rest is
+        # built by the writer thread so the request path does no formatting or I/O.
         frame = inspect.currentframe()
         caller_frame = frame.f_back
+        if caller_frame.f_code.co_name == "track_error" and caller_frame.f_back is not None:
+            caller_frame = caller_frame.f_back
         caller_info = {
             "file": caller_frame.f_code.co_filename,
             "function": caller_frame.f_code.co_name,
             "line": caller_frame.f_lineno
         }
-        
-        error_entry = {
+        timestamp = datetime.now().isoformat()
+        tb = error.__traceback__ or (sys.exc_info()[2] if sys.exc_info()[1] is error else None)
+        request_id = current_request_id()
+        event = (timestamp, error, tb, context, user_action, endpoint, request_data, severity, caller_info, request_id)
+
+        queued = self._enqueue(event, severity) if AI_QUEUE_ASYNC else self._write_event(event) is not None
+        return {
+            "timestamp": timestamp,
+            "request_id": request_id,
+            "session_id": self.session_id,
+            "severity": severity,
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+            "queued": queued,
+        }
+
+    def suggest_fixes(self, error: Exception, context: str = "") -> list:
+        """Suggested fixes for an error (cheap; safe to call on the request path)."""
+        return self._suggest_fixes(error, context)
+
+    # ---- background writer ------------------------------------------------
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            with self._writer_lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(target=self._run_writer, name="ai-error-writer", daemon=True)
+                    self._writer.start()
+
+    def _enqueue(self, event, severity: str) -> bool:
+        self._ensure_writer()
+        if severity != "CRITICAL" and self._queue.qsize() >= AI_QUEUE_SAMPLE_AT * AI_QUEUE_SIZE:
+            # Under pressure: keep 1 in AI_QUEUE_SAMPLE_RATE non-critical events
+            with self._stats_lock:
+                self._sample_counter += 1
+                keep = self._sample_counter % max(1, AI_QUEUE_SAMPLE_RATE) == 0
+            if not keep:
+                self._bump("dropped_sampled")
+                return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._bump("dropped_full")
+            return False
+        self._bump("enqueued")
+        return True
+
+    def _bump(self, stat: str):
+        with self._stats_lock:
+            self.queue_stats[stat] += 1
+
+    def _queue_stats_copy(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.queue_stats)
+
+    def _run_writer(self):
+        while True:
+            try:
+                event = self._queue.get(timeout=AI_ROLLUP_INTERVAL)
+            except queue.Empty:
+                self._emit_rollups()
+                continue
+            if event is _STOP:
+                self._emit_rollups(force=True)
+                return
+            self._write_event(event)
+
+    def _fingerprint(self, error, tb, endpoint, caller_info) -> str:
+        frames = traceback.extract_tb(tb)[-AI_FINGERPRINT_FRAMES:] if tb is not None else []
+        top = [f"{os.path.basename(f.filename)}:{f.name}" for f in frames] or [caller_info.get("function", "")]
+        raw = "|".join([type(error).__name__, normalize_message(str(error)), endpoint or ""] + top)
+        return hashlib.sha1(raw.encode("utf-8", "replace")).hexdigest()[:16]
+
+    def _write_event(self, event) -> Optional[Dict[str, Any]]:
+        try:
+            timestamp, error, tb, context, user_action, endpoint, request_data, severity, caller_info, _ = event
+            fingerprint = self._fingerprint(error, tb, endpoint, caller_info)
+            with self._lock:
+                known = self._counters["fingerprints"].get(fingerprint)
+                seen_before = known["count"] if known is not None else 0
+                if known is not None and "error_type" not in known:
+                    # Restored from the index without its details: log this one in full
+                    known = None
+                if known is not None:
+                    # Repeat: count it, keep a few exemplars for the next rollup, persist nothing now
+                    known["count"] += 1
+                    known["pending"] += 1
+                    known["last_seen"] = timestamp
+                    if len(known["exemplars"]) < AI_MAX_EXEMPLARS:
+                        known["exemplars"].append({"timestamp": timestamp, "error_message": str(error)[:500]})
+                    self._count(timestamp, known["error_type"], known["tags"], severity)
+                    # Refresh LRU position
+                    self._counters["fingerprints"][fingerprint] = self._counters["fingerprints"].pop(fingerprint)
+                    self._bump("deduplicated")
+                    due = time.time() - known["persisted_at"] >= AI_ROLLUP_INTERVAL
+            if known is not None:
+                if due:
+                    self._emit_rollups(only=fingerprint)
+                return None
+
+            error_entry = self._build_entry(*event)
+            error_entry["fingerprint"] = fingerprint
+            # Compact single-line record; the full entry also lands in the JSONL log
+            self.logger.error(f"AI_ERROR_TRACKER: {json.dumps(error_entry, default=str)}")
+            evicted = []
+            with self._lock:
+                fps = self._counters["fingerprints"]
+                fps.pop(fingerprint, None)
+                fps[fingerprint] = {
+                    "error_type": error_entry["error_type"],
+                    "message": normalize_message(error_entry["error_message"]),
+                    "endpoint": endpoint,
+                    "severity": severity,
+                    "tags": error_entry["ai_analysis_tags"],
+                    "count": seen_before + 1,
+                    "pending": 0,
+                    "first_seen": timestamp,
+                    "last_seen": timestamp,
+                    "persisted_at": time.time(),
+                    "exemplars": [],
+                }
+                while len(fps) > AI_MAX_FINGERPRINTS:
+                    # Evict the least recently seen, persisting repeats not yet rolled up
+                    old = next(iter(fps))
+                    fp = fps.pop(old)
+                    if fp.get("pending"):
+                        evicted.append(self._rollup_record(old, fp))
+                self._count(timestamp, error_entry["error_type"], error_entry["ai_analysis_tags"], severity)
+                self._recent.append(error_entry)
+            self._append_to_json_log(error_entry)
+            for record in evicted:
+                self._append_to_json_log(record)
+                self._bump("rollups")
+            self._bump("written")
+            return error_entry
+        except Exception as e:
+            self._bump("write_errors")
+            try:
+                self.logger.error(f"AI error writer failed: {e}")
+            except Exception:
+                pass
+            return None
+
+    def _emit_rollups(self, force: bool = False, only: Optional[str] = None):
+        """Persist one rollup record per fingerprint with repeats since its last record."""
+        now = time.time()
+        records = []
+        with self._lock:
+            items = [(only, self._counters["fingerprints"].get(only))] if only else list(self._counters["fingerprints"].items())
+            for fingerprint, fp in items:
+                if not fp or not fp.get("pending"):
+                    continue
+                if not force and now - fp["persisted_at"] < AI_ROLLUP_INTERVAL:
+                    continue
+                records.append(self._rollup_record(fingerprint, fp))
+                fp["persisted_at"] = now
+        for record in records:
+            self._append_to_json_log(record)
+            self._bump("rollups")
+
+    @staticmethod
+    def _rollup_record(fingerprint: str, fp: Dict[str, Any]) -> Dict[str, Any]:
+        """JSONL record for a fingerprint's repeats since its last record; resets them. Caller holds the lock."""
+        record = {
+            "record_type": "rollup",
             "timestamp": datetime.now().isoformat(),
+            "fingerprint": fingerprint,
+            "error_type": fp["error_type"],
+            "error_message": fp["message"],
+            "endpoint": fp["endpoint"],
+            "severity": fp["severity"],
+            "occurrences_since_last": fp["pending"],
+            "occurrences_total": fp["count"],
+            "first_seen": fp["first_seen"],
+            "last_seen": fp["last_seen"],
+            "exemplars": fp["exemplars"],
+        }
+        fp["pending"] = 0
+        fp["exemplars"] = []
+        return record
+
+    def _build_entry(self, timestamp, error, tb, context, user_action, endpoint,
+                     request_data, severity, caller_info, request_id=None) -> Dict[str, Any]:
+        return {
+            "timestamp": timestamp,
+            "request_id": request_id,
             "session_id": self.session_id,
             "severity": severity,
             "error_type": type(error).__name__,
             "error_message": str(error),
-            "traceback": traceback.format_exc(),
+            "traceback": "".join(traceback.format_exception(type(error), error, tb)),
             "context": context,
             "user_action": user_action,
             "endpoint": endpoint,
@@ -87,15 +333,18 @@ class AIErrorTracker:
             "suggested_fixes": self._suggest_fixes(error, context),
             "error_pattern": self._identify_pattern(error, context, endpoint)
         }
-        
-        # Log to console for immediate visibility
-        self.logger.error(f"AI_ERROR_TRACKER: {json.dumps(error_entry, indent=2)}")
-        
-        # Append to JSON log file for AI analysis
-        self._append_to_json_log(error_entry)
-        
-        return error_entry
-    
+
+    def close(self, timeout: float = 5.0):
+        """Drain queued errors, stop the writer thread and persist the index."""
+        if self._writer is not None and self._writer.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._writer.join(timeout=timeout)
+        self._writer = None
+        self.flush()
+
     def _generate_ai_tags(self, error: Exception, context: str, user_action: str) -> list:
         """Generate tags for AI pattern recognition"""
         tags = []
@@ -277,64 +526,157 @@ class AIErrorTracker:
         else:
             return "MEDIUM"
     
-    def _append_to_json_log(self, error_entry: Dict[str, Any]):
-        """Append error to JSON log file for AI analysis"""
+    @staticmethod
+    def _empty_counters() -> Dict[str, Any]:
+        return {
+            "created": datetime.now().isoformat(),
+            "last_updated": None,
+            "total_errors": 0,
+            "error_types": {},
+            "patterns": {},
+            "severity_breakdown": {},
+            "segments": [],
+            "fingerprints": {},
+        }
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Restore counters from the sidecar index so summaries span restarts."""
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+            counters = self._empty_counters()
+            counters.update(data)
+            # Older indexes stored full fingerprint details; keep only what the index persists
+            counters["fingerprints"] = {
+                k: {"count": int(v.get("count", 0)), "last_seen": v.get("last_seen")}
+                for k, v in counters["fingerprints"].items()
+            }
+            return counters
+        except Exception:
+            return self._empty_counters()
+
+    def _write_index(self):
+        """Atomically rewrite the (small) sidecar index. Caller holds the lock."""
+        index = dict(self._counters)
+        index["fingerprints"] = {
+            k: {"count": v["count"], "last_seen": v["last_seen"]}
+            for k, v in self._counters["fingerprints"].items()
+        }
+        tmp = self.index_file.with_name(self.index_file.name + ".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(index, f, default=str)
+        os.replace(tmp, self.index_file)
+        self._index_written_at = time.time()
+
+    def _count(self, timestamp: str, error_type: str, tags: list, severity: str):
+        """Update summary counters for one occurrence. Caller holds the lock."""
+        c = self._counters
+        c["total_errors"] += 1
+        c["last_updated"] = timestamp
+        c["error_types"][error_type] = c["error_types"].get(error_type, 0) + 1
+        for tag in tags:
+            c["patterns"][tag] = c["patterns"].get(tag, 0) + 1
+        c["severity_breakdown"][severity] = c["severity_breakdown"].get(severity, 0) + 1
+
+    def _should_rotate(self) -> bool:
+        try:
+            size = self.log_file.stat().st_size
+        except OSError:
+            return False
+        if size == 0:
+            return False
+        return size >= AI_LOG_MAX_BYTES or (time.time() - self._segment_started) >= AI_LOG_MAX_AGE
+
+    def _rotate(self):
+        """Close out the active segment. Caller holds the lock."""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = self.log_file.with_name(f"{self.log_file.stem}.{stamp}{self.log_file.suffix}")
+        os.replace(self.log_file, rotated)
+        self._segment_started = time.time()
+        segment = {"file": rotated.name, "rotated_at": datetime.now().isoformat(),
+                   "bytes": rotated.stat().st_size}
+        if AI_LOG_GZIP:
+            segment["file"] += ".gz"
+            threading.Thread(target=self._gzip_segment, args=(rotated,), daemon=True).start()
+        segments = self._counters["segments"]
+        segments.append(segment)
+        # Prune the oldest segments beyond the retention count
+        while len(segments) > AI_LOG_BACKUPS:
+            old = segments.pop(0)
+            for name in (old["file"], old["file"][:-3] if old["file"].endswith(".gz") else None):
+                if name:
+                    try:
+                        (self.log_file.parent / name).unlink()
+                    except OSError:
+                        pass
+
+    @staticmethod
+    def _gzip_segment(path: Path):
         try:
-            # Read existing log
-            if self.log_file.exists():
-                with open(self.log_file, 'r') as f:
-                    data = json.load(f)
-            else:
-                data = {"errors": [], "metadata": {"created": datetime.now().isoformat()}}
-            
-            # Add new error
-            data["errors"].append(error_entry)
-            data["metadata"]["last_updated"] = datetime.now().isoformat()
-            data["metadata"]["total_errors"] = len(data["errors"])
-            
-            # Write back to file
-            with open(self.log_file, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
-                
+            with open(path, 'rb') as src, gzip.open(str(path) + ".gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            path.unlink()
+        except Exception:
+            pass
+
+    def _append_to_json_log(self, record: Dict[str, Any]):
+        """Append one JSON line to the active segment (O(1) per record)."""
+        try:
+            line = json.dumps(record, default=str) + "\n"
+            with self._lock:
+                if self._should_rotate():
+                    self._rotate()
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                if time.time() - self._index_written_at >= AI_LOG_INDEX_INTERVAL:
+                    self._write_index()
         except Exception as e:
             self.logger.error(f"Failed to write to AI error log: {e}")
-    
+
+    def flush(self):
+        """Persist the sidecar index now (call on shutdown)."""
+        try:
+            with self._lock:
+                self._write_index()
+        except Exception as e:
+            self.logger.error(f"Failed to write AI error index: {e}")
+
+    def clear(self):
+        """Remove all segments and the index, and reset counters."""
+        with self._lock:
+            pattern = f"{self.log_file.stem}.*"
+            for path in [self.log_file] + list(self.log_file.parent.glob(pattern)):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._counters = self._empty_counters()
+            self._recent.clear()
+            self._segment_started = time.time()
+            self._write_index()
+
     def get_error_summary(self) -> Dict[str, Any]:
-        """Get AI-readable error summary"""
+        """Get AI-readable error summary (served from in-memory counters, no file reads)"""
         try:
-            if not self.log_file.exists():
-                return {"message": "No errors logged yet"}
-            
-            with open(self.log_file, 'r') as f:
-                data = json.load(f)
-            
-            errors = data.get("errors", [])
-            
-            # Generate summary
-            summary = {
-                "total_errors": len(errors),
-                "session_id": self.session_id,
-                "error_types": {},
-                "patterns": {},
-                "severity_breakdown": {},
-                "recent_errors": errors[-5:] if errors else []
-            }
-            
-            for error in errors:
-                # Count error types
-                error_type = error.get("error_type", "Unknown")
-                summary["error_types"][error_type] = summary["error_types"].get(error_type, 0) + 1
-                
-                # Count patterns
-                for tag in error.get("ai_analysis_tags", []):
-                    summary["patterns"][tag] = summary["patterns"].get(tag, 0) + 1
-                
-                # Count severity
-                severity = error.get("severity", "Unknown")
-                summary["severity_breakdown"][severity] = summary["severity_breakdown"].get(severity, 0) + 1
-            
-            return summary
-            
+            with self._lock:
+                c = self._counters
+                if not c["total_errors"]:
+                    return {"message": "No errors logged yet"}
+                return {
+                    "total_errors": c["total_errors"],
+                    "session_id": self.session_id,
+                    "error_types": dict(c["error_types"]),
+                    "patterns": dict(c["patterns"]),
+                    "severity_breakdown": dict(c["severity_breakdown"]),
+                    "recent_errors": list(self._recent),
+                    "segments": list(c["segments"]),
+                    "unique_fingerprints": len(c["fingerprints"]),
+                    "top_fingerprints": [
+                        {"fingerprint": k, **{f: v.get(f) for f in ("error_type", "message", "endpoint", "count", "first_seen", "last_seen")}}
+                        for k, v in sorted(c["fingerprints"].items(), key=lambda kv: kv[1]["count"], reverse=True)[:10]
+                    ],
+                    "queue": {**self._queue_stats_copy(), "depth": self._queue.qsize()},
+                }
         except Exception as e:
             return {"error": f"Failed to generate summary: {e}"}
 
@@ -348,7 +690,8 @@ def track_error(error: Exception,
                 request_data: Dict = None,
                 severity: str = "ERROR") -> Dict[str, Any]:
     """
-    Global function to track errors for AI analysis
+    Global function to track errors for AI analysis. Only enqueues; the record is
+    built and written by the tracker's writer thread.
     
     Usage:
         try:
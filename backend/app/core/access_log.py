@@ -0,0 +1,119 @@
+"""
+Structured JSON access log with request IDs and per-stage timings.
+
+Example usage:
+
+from .core.access_log import AccessLogMiddleware, TimedJSONResponse
+
+app = FastAPI(default_response_class=TimedJSONResponse)
+app.add_middleware(AccessLogMiddleware)
+
+One line per request in access.log:
+
+{"ts": "...Z", "request_id": "3f2a...", "method": "GET", "route": "/api/properties/{property_id}",
+ "path": "/api/properties/42", "status": 200, "bytes": 812, "duration_ms": 14.2, "auth_ms": 1.1,
+ "db_ms": 11.9, "sp_calls": 2, "serialize_ms": 0.3, "client": "127.0.0.1"}
+
+The request ID comes from a sane incoming X-Request-ID header or is generated,
+and is echoed back in the response. Stages overlap where the work does: token
+verification that hits the session table counts towards both auth_ms and db_ms.
+serialize_ms covers rendering the JSON body (TimedJSONResponse); responses built
+explicitly as JSONResponse are not included.
+"""
+import json
+import logging
+import re
+import time
+import uuid
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+
+from .logging_config import get_logger
+from .request_context import end_request, record_stage, start_request
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Access records are already JSON; write them as-is
+access_logger = get_logger('access', formatter=logging.Formatter('%(message)s'))
+
+
+class TimedJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        with record_stage("serialize"):
+            return super().render(content)
+
+
+def _route_template(scope):
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", None)
+    if "endpoint" in scope and scope.get("root_path"):
+        # Mounted app (e.g. /uploads static files)
+        return scope["root_path"] + "/{path}"
+    return None
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware: no extra task or body buffering, unlike @app.middleware('http')."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                request_id = candidate if _REQUEST_ID.match(candidate) else None
+                break
+        request_id = request_id or uuid.uuid4().hex
+        timings, token = start_request(request_id)
+        started = time.perf_counter()
+        response = {"status": 500, "bytes": 0, "content_length": None}
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                for name, value in headers:
+                    if name.lower() == b"content-length":
+                        response["content_length"] = int(value)
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message["headers"] = headers
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            elif message["type"] == "http.response.pathsend":
+                # Zero-copy file send: the server writes Content-Length bytes
+                response["bytes"] = response["content_length"] or 0
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception:
+            self._log(scope, request_id, timings, response, started)
+            # Leave the context bound so the outer exception handler's tracker record carries the ID
+            raise
+        self._log(scope, request_id, timings, response, started)
+        end_request(token)
+
+    @staticmethod
+    def _log(scope, request_id, timings, response, started):
+        client = scope.get("client")
+        record = {
+            "ts": datetime.utcnow().isoformat() + "Z",
+            "request_id": request_id,
+            "method": scope["method"],
+            "route": _route_template(scope),
+            "path": scope["path"],
+            "status": response["status"],
+            "bytes": response["bytes"],
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            **timings.as_dict(),
+            "client": client[0] if client else None,
+        }
+        access_logger.info(json.dumps(record, separators=(",", ":")))
@@ -0,0 +1,67 @@
+"""
+Async access to blocking work from ``async def`` endpoints.
+
+Example usage:
+
+from ..core.async_db import adb, run_blocking
+
+rows = await adb.execute_sp("sp_GetProperty", [property_id])
+await run_blocking(track_error, err, context="...")
+
+DB calls run on a dedicated executor sized to the connection pool, so they
+queue for a worker instead of for a connection and never stall the event loop.
+Other blocking calls (file I/O, error tracking) go through ``run_blocking``,
+which uses a separate small executor so they can't starve DB work.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ..database import StoredProcedures, db_pool
+
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(db_pool.max_size)))
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "4"))
+
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+io_executor = ThreadPoolExecutor(max_workers=IO_EXECUTOR_WORKERS, thread_name_prefix="io")
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking DB callable on the DB executor."""
+    loop = asyncio.get_running_loop()
+    # Carry the request context (request ID, stage timings) into the worker thread
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(db_executor, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking non-DB callable (file I/O, error tracking) off the event loop."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(io_executor, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+class AsyncStoredProcedures:
+    """Awaitable mirror of StoredProcedures: ``await adb.<method>(...)``."""
+
+    def __getattr__(self, name):
+        attr = getattr(StoredProcedures, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await run_db(attr, *args, **kwargs)
+
+        setattr(self, name, call)
+        return call
+
+
+adb = AsyncStoredProcedures()
+
+
+def shutdown_executors():
+    db_executor.shutdown(wait=True)
+    io_executor.shutdown(wait=True)
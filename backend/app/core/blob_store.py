@@ -0,0 +1,87 @@
+"""
+Content-addressed storage for uploaded property documents.
+
+Example usage:
+
+from ..core.blob_store import stage_upload, place_blob, blob_url_path
+
+staged = await stage_upload(f, safe_name)                  # temp file + sha256
+rows = await adb.add_property_document(..., staged["sha256"], staged["storage_path"], staged["size"])
+blob = await place_blob(staged, rows[0]["StoragePath"])     # {"sha256", "size", "path", "storage_path", "deduplicated"}
+url = base + blob_url_path(row["storage_path"])
+
+Files live at BLOB_DIR/<aa>/<bb>/<sha256><ext>, where aa/bb are the first two
+byte pairs of the hash, so no directory grows past a few hundred entries. The
+same bytes are stored once no matter how many owners, properties or file names
+refer to them: a re-upload is hashed while it streams and the temp file is
+dropped if the blob file already exists. Because a path never changes content,
+the URLs can be cached forever.
+
+Metadata lives in dbo.document_blobs (see backend/database/document_blobs.sql),
+whose ref_count tracks how many property_documents rows point at each blob.
+Blobs whose count reaches zero are removed by backend/scripts/gc_blobs.py
+after a grace period rather than on delete. The reference is registered before
+the existing file is reused, and place_blob moves the temp file into place if
+GC removed the file in the meantime, so an upload can't end up pointing at
+nothing.
+"""
+import os
+import re
+
+from fastapi import UploadFile
+
+from .async_db import run_blocking
+from .uploads import UPLOAD_MAX_FILE_BYTES, commit_temp, discard_temp, stream_to_temp
+
+UPLOADS_ROOT = os.getenv("UPLOADS_ROOT", os.path.join(os.getcwd(), "uploads"))
+BLOB_DIR = os.getenv("BLOB_DIR", os.path.join(UPLOADS_ROOT, "blobs"))
+BLOB_URL_PREFIX = "blobs/"
+
+_EXT = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+
+
+def blob_relpath(sha256: str, file_name: str = "") -> str:
+    """Sharded path of a blob relative to BLOB_DIR, keeping a sane extension for content-type detection."""
+    ext = os.path.splitext(file_name)[1].lower()
+    if not _EXT.match(ext):
+        ext = ""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def blob_abspath(storage_path: str) -> str:
+    return os.path.join(BLOB_DIR, *storage_path.split("/"))
+
+
+def blob_url_path(storage_path: str) -> str:
+    """Path under /uploads/ that serves the blob."""
+    return BLOB_URL_PREFIX + storage_path
+
+
+async def stage_upload(upload: UploadFile, file_name: str, max_bytes: int = UPLOAD_MAX_FILE_BYTES) -> dict:
+    """Stream ``upload`` to a temp file in the blob store. Register the blob, then ``place_blob``
+    (or ``discard_temp`` the ``tmp_path`` on failure)."""
+    info = await stream_to_temp(upload, os.path.join(BLOB_DIR, ".tmp"), file_name, max_bytes)
+    info["storage_path"] = blob_relpath(info["sha256"], file_name)
+    return info
+
+
+async def place_blob(staged: dict, storage_path: str = None) -> dict:
+    """Reuse the stored file for a registered blob, or move the staged temp file into place.
+
+    ``storage_path`` is the path the database holds for the blob (an earlier upload may
+    have stored it under another extension); defaults to the staged one.
+    """
+    storage_path = storage_path or staged["storage_path"]
+    path = blob_abspath(storage_path)
+    deduplicated = await run_blocking(os.path.exists, path)
+    if deduplicated:
+        await discard_temp(staged["tmp_path"])
+    else:
+        await commit_temp(staged["tmp_path"], path)
+    return {
+        "sha256": staged["sha256"],
+        "size": staged["size"],
+        "storage_path": storage_path,
+        "path": path,
+        "deduplicated": deduplicated,
+    }
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
-import json
 from datetime import datetime
 import os
+from .file_sink import JsonlSink
 
 router = APIRouter()
 LOG_FILE = os.path.join(os.path.dirname(__file__), '../../logs/click_events.log')
+click_sink = JsonlSink(LOG_FILE)
 
 @router.post('/log_click')
 async def log_click(request: Request):
@@ -15,9 +16,7 @@ async def log_click(request: Request):
         'timestamp': data.get('timestamp', datetime.utcnow().isoformat()),
         'user': data.get('user')
     }
-    try:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry) + '\n')
-        return JSONResponse({'status': 'ok'})
-    except Exception as e:
-        return JSONResponse({'status': 'error', 'detail': str(e)}, status_code=500)
+    # Queued to the sink's writer thread; never blocks the event loop
+    if not click_sink.write(log_entry):
+        return JSONResponse({'status': 'dropped'}, status_code=503)
+    return JSONResponse({'status': 'ok'})
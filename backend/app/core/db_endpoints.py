@@ -0,0 +1,149 @@
+"""
+Sticky "last known good" SQL Server endpoint resolver.
+
+The hot path connects straight to the endpoint that worked last. Endpoints that
+fail are put into exponential backoff instead of being retried inline on every
+statement, and once the sticky choice is older than its TTL a background probe
+re-validates the candidates in priority order (so a recovered primary wins back).
+"""
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .logging_config import db_logger as logger
+
+ENDPOINT_TTL = float(os.getenv("DB_ENDPOINT_TTL", "300"))
+ENDPOINT_BACKOFF_BASE = float(os.getenv("DB_ENDPOINT_BACKOFF", "5"))
+ENDPOINT_BACKOFF_MAX = float(os.getenv("DB_ENDPOINT_BACKOFF_MAX", "300"))
+
+
+class _EndpointState:
+    __slots__ = ("failures", "retry_at", "last_error", "last_ok")
+
+    def __init__(self):
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error = None
+        self.last_ok = None
+
+
+class EndpointResolver:
+    def __init__(self,
+                 candidates_fn: Callable[[], List[str]],
+                 probe_fn: Callable[[str], None],
+                 ttl: float = ENDPOINT_TTL,
+                 backoff_base: float = ENDPOINT_BACKOFF_BASE,
+                 backoff_max: float = ENDPOINT_BACKOFF_MAX):
+        self._candidates_fn = candidates_fn
+        self._probe_fn = probe_fn
+        self.ttl = ttl
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._candidates = None
+        self._states = {}
+        self._preferred = None
+        self._preferred_at = 0.0
+        self._probing = False
+
+    def candidates(self) -> List[str]:
+        """Candidate list in priority order; computed once since it only depends on config."""
+        if self._candidates is None:
+            self._candidates = list(self._candidates_fn())
+        return self._candidates
+
+    def _state(self, endpoint: str) -> _EndpointState:
+        st = self._states.get(endpoint)
+        if st is None:
+            st = self._states[endpoint] = _EndpointState()
+        return st
+
+    def connect_order(self) -> List[str]:
+        """Endpoints to try for a new connection, sticky endpoint first, backed-off ones skipped."""
+        now = time.monotonic()
+        candidates = self.candidates()
+        with self._lock:
+            preferred = self._preferred
+            stale = preferred is not None and (now - self._preferred_at) > self.ttl
+            order = [preferred] if preferred else []
+            order += [c for c in candidates if c != preferred]
+            ready = [c for c in order if self._state(c).retry_at <= now]
+            if not ready and order:
+                # Everything is backing off: try the endpoint that becomes eligible first
+                ready = [min(order, key=lambda c: self._state(c).retry_at)]
+        if stale:
+            self.refresh_async()
+        return ready
+
+    def mark_success(self, endpoint: str):
+        with self._lock:
+            st = self._state(endpoint)
+            st.failures = 0
+            st.retry_at = 0.0
+            st.last_ok = time.time()
+            if self._preferred != endpoint:
+                logger.info(f"DB endpoint resolver: using '{endpoint}'")
+            self._preferred = endpoint
+            self._preferred_at = time.monotonic()
+
+    def mark_failure(self, endpoint: str, error: Exception):
+        with self._lock:
+            st = self._state(endpoint)
+            st.failures += 1
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (st.failures - 1)))
+            st.retry_at = time.monotonic() + delay
+            st.last_error = str(error)
+            if self._preferred == endpoint:
+                self._preferred = None
+        logger.info(f"DB endpoint '{endpoint}' failed ({st.failures}x); backing off {delay:.1f}s. Details: {error}")
+
+    def refresh_async(self):
+        """Re-probe candidates on a background thread (at most one probe at a time)."""
+        with self._lock:
+            if self._probing:
+                return
+            self._probing = True
+        threading.Thread(target=self._refresh, name="db-endpoint-probe", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            for endpoint in self.candidates():
+                with self._lock:
+                    if self._state(endpoint).retry_at > time.monotonic():
+                        continue
+                try:
+                    self._probe_fn(endpoint)
+                except Exception as e:
+                    self.mark_failure(endpoint, e)
+                    continue
+                self.mark_success(endpoint)
+                return
+            with self._lock:
+                # Nothing answered; keep the current choice but wait another TTL before re-probing
+                self._preferred_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._probing = False
+
+    @property
+    def preferred(self) -> Optional[str]:
+        return self._preferred
+
+    def state(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "preferred": self._preferred,
+                "preferred_age_s": round(now - self._preferred_at, 1) if self._preferred else None,
+                "ttl_s": self.ttl,
+                "endpoints": {
+                    ep: {
+                        "failures": st.failures,
+                        "backoff_remaining_s": round(max(0.0, st.retry_at - now), 1),
+                        "last_error": st.last_error,
+                        "last_ok": st.last_ok,
+                    }
+                    for ep, st in self._states.items()
+                },
+            }
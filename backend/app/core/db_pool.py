@@ -0,0 +1,303 @@
+"""
+Thread-safe pyodbc connection pool shared by StoredProcedures, session checks
+and the public endpoints.
+
+Example usage:
+
+from .db_pool import ConnectionPool
+
+pool = ConnectionPool(connect_fn, min_size=1, max_size=10)
+with pool.connection() as conn:
+    cur = conn.cursor()
+    cur.execute("SELECT 1")
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from .logging_config import db_logger as logger
+from .request_context import record_stage
+
+# Pool sizing/lifetime knobs (seconds for all time values)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", "10"))
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "15"))
+# Health check connections that sat idle longer than this on checkout (0 = always)
+POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+def _is_disconnect(error: Exception) -> bool:
+    """Best-effort detection of errors that leave the connection unusable."""
+    args = getattr(error, "args", None) or ()
+    sqlstate = str(args[0]) if args else ""
+    if sqlstate.startswith("08"):
+        return True
+    msg = str(error).lower()
+    return any(s in msg for s in (
+        "communication link failure",
+        "connection is busy",
+        "tcp provider",
+        "named pipes provider",
+        "connection was forcibly closed",
+    ))
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections.
+
+    - At most ``max_size`` connections exist at once; callers wait up to
+      ``checkout_timeout`` for one to be released.
+    - Idle connections above ``min_size`` are closed after ``idle_timeout``.
+    - Any connection older than ``max_lifetime`` is recycled on checkin/checkout.
+    - Connections idle longer than ``ping_after`` are health-checked on checkout.
+    """
+
+    def __init__(self,
+                 connect_fn: Callable[[], object],
+                 min_size: int = POOL_MIN_SIZE,
+                 max_size: int = POOL_MAX_SIZE,
+                 idle_timeout: float = POOL_IDLE_TIMEOUT,
+                 max_lifetime: float = POOL_MAX_LIFETIME,
+                 checkout_timeout: float = POOL_CHECKOUT_TIMEOUT,
+                 ping_after: float = POOL_PING_AFTER):
+        self._connect_fn = connect_fn
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []  # LIFO stack of _PooledConnection
+        self._in_use = {}  # id(conn) -> _PooledConnection
+        self._opening = 0  # connections being created outside the lock
+        self._closed = False
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_destroyed": 0,
+            "health_check_failures": 0,
+        }
+
+    # ---- internal helpers -------------------------------------------------
+
+    def _total(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _expired(self, entry: _PooledConnection, now: float) -> bool:
+        return self.max_lifetime > 0 and (now - entry.created_at) > self.max_lifetime
+
+    def _destroy(self, entry: _PooledConnection):
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._metrics["connections_destroyed"] += 1
+
+    def _ping(self, entry: _PooledConnection) -> bool:
+        try:
+            cur = entry.conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            return True
+        except Exception as e:
+            logger.info(f"Pooled connection failed health check; discarding. Details: {e}")
+            with self._cond:
+                self._metrics["health_check_failures"] += 1
+            return False
+
+    def _reap_idle(self, now: float) -> list:
+        """Pop idle connections past their idle timeout / lifetime. Caller holds the lock."""
+        stale = []
+        keep = []
+        # Oldest idle connections sit at the bottom of the stack
+        for entry in self._idle:
+            idle_for = now - entry.last_used
+            too_idle = (self.idle_timeout > 0 and idle_for > self.idle_timeout
+                        and len(keep) + len(self._in_use) >= self.min_size)
+            if too_idle or self._expired(entry, now):
+                stale.append(entry)
+            else:
+                keep.append(entry)
+        self._idle = keep
+        if stale:
+            self._cond.notify(len(stale))
+        return stale
+
+    # ---- public API -------------------------------------------------------
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Check out a connection, creating one if the pool has spare capacity."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        wait_start = None
+
+        while True:
+            entry = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+                stale = self._reap_idle(time.monotonic())
+                while not self._idle and self._total() >= self.max_size:
+                    if not waited:
+                        waited = True
+                        wait_start = time.monotonic()
+                        self._metrics["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a DB connection "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                    self._in_use[id(entry.conn)] = entry
+                else:
+                    self._opening += 1
+                    create = True
+                if waited:
+                    waited_for = time.monotonic() - wait_start
+                    self._metrics["wait_time_total"] += waited_for
+                    self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], waited_for)
+                    waited = False
+                    wait_start = None
+
+            for s in stale:
+                self._destroy(s)
+
+            if create:
+                try:
+                    conn = self._connect_fn()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                entry = _PooledConnection(conn)
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use[id(conn)] = entry
+                    self._metrics["connections_created"] += 1
+                    self._metrics["checkouts"] += 1
+                return conn
+
+            now = time.monotonic()
+            healthy = not self._expired(entry, now)
+            if healthy and (now - entry.last_used) >= self.ping_after:
+                healthy = self._ping(entry)
+            if healthy:
+                with self._cond:
+                    self._metrics["checkouts"] += 1
+                return entry.conn
+
+            # Drop the bad connection and loop to get another one
+            with self._cond:
+                self._in_use.pop(id(entry.conn), None)
+                self._cond.notify()
+            self._destroy(entry)
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool (or close it when ``discard`` is set)."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            # Not ours (or already released); just close it
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+
+        if not discard:
+            try:
+                # Never hand out a connection with an open transaction
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        now = time.monotonic()
+        if discard or self._closed or self._expired(entry, now):
+            with self._cond:
+                self._cond.notify()
+            self._destroy(entry)
+            return
+
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager that checks out a connection and always returns it."""
+        # Pool wait plus work done on the connection counts as the current request's DB time
+        with record_stage("db"):
+            conn = self.acquire(timeout)
+            discard = False
+            try:
+                yield conn
+            except Exception as e:
+                discard = _is_disconnect(e)
+                raise
+            finally:
+                self.release(conn, discard=discard)
+
+    def dispose(self):
+        """Close every idle connection (in-use ones close when released)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._destroy(entry)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+        self.dispose()
+
+    def stats(self) -> dict:
+        with self._cond:
+            data = dict(self._metrics)
+            data.update({
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "opening": self._opening,
+                "closed": self._closed,
+            })
+        checkouts = data["checkouts"] or 1
+        data["wait_time_avg"] = data["wait_time_total"] / checkouts
+        return data
@@ -0,0 +1,126 @@
+"""
+Non-blocking append-only line sink.
+
+Example usage:
+
+from ..core.file_sink import JsonlSink
+
+sink = JsonlSink('/path/to/events.log')
+sink.write({'action': 'click'})   # never blocks; the writer thread does the I/O
+
+Records go through a bounded queue to a single writer thread, so async
+endpoints can log without touching the disk on the event loop. When the queue
+is full new records are dropped and counted rather than blocking the caller.
+With ``max_bytes`` set the file is rotated to ``<path>.1`` .. ``<path>.<backups>``.
+"""
+import json
+import os
+import queue
+import threading
+
+SINK_QUEUE_SIZE = int(os.getenv("FILE_SINK_QUEUE_SIZE", "10000"))
+
+_STOP = object()
+
+
+class JsonlSink:
+    def __init__(self, path: str, max_queue: int = SINK_QUEUE_SIZE, max_bytes: int = 0, backups: int = 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name=f"sink:{os.path.basename(self.path)}", daemon=True
+                    )
+                    self._thread.start()
+
+    def write(self, record) -> bool:
+        """Queue a record (dict or pre-serialized line). Returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    @staticmethod
+    def _serialize(record) -> str:
+        if isinstance(record, str):
+            return record
+        try:
+            return json.dumps(record, ensure_ascii=False, default=str)
+        except Exception:
+            return str(record)
+
+    def _run(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch = [item]
+            # Drain whatever else is queued so a burst costs one open/write
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if any(r is _STOP for r in batch):
+                stop = True
+                batch = [r for r in batch if r is not _STOP]
+            if not batch:
+                continue
+            try:
+                self._maybe_rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(self._serialize(r) + "\n" for r in batch))
+                self.written += len(batch)
+            except Exception:
+                self.errors += len(batch)
+
+    def _maybe_rotate(self):
+        if not self.max_bytes:
+            return
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued records and stop the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
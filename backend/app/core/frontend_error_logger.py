@@ -1,13 +1,34 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 import os
-import json
 from backend.app.ai_error_tracker import track_error
+from .file_sink import JsonlSink
 
 LOG_FILE = os.path.join(os.path.dirname(__file__), '../../logs/frontend_errors.log')
+# Shared with routers/logs.py, which appends to the same file
+frontend_error_sink = JsonlSink(LOG_FILE)
 router = APIRouter()
 
 
+class FrontendError(Exception):
+    pass
+
+
+def _track_frontend_errors(entries):
+    for e in entries:
+        # Forward to AI tracker for structured analysis when possible
+        try:
+            err = FrontendError(e.get('message', 'Frontend error'))
+            track_error(err,
+                        context=e.get('type', 'frontend'),
+                        user_action=e.get('user_action', ''),
+                        endpoint=e.get('url', ''),
+                        request_data=e)
+        except Exception:
+            # don't let AI tracker failures break logging
+            pass
+
+
 @router.post('/log_frontend_error')
 async def log_frontend_error(request: Request):
     """Accept batched frontend errors and log them in structured JSON.
@@ -27,31 +48,11 @@ async def log_frontend_error(request: Request):
     else:
         return JSONResponse({'status': 'invalid payload'}, status_code=400)
 
-    # Ensure log directory exists
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        for e in entries:
-            timestamp = e.get('timestamp') or ''
-            try:
-                f.write(json.dumps({'timestamp': timestamp, **e}, ensure_ascii=False) + "\n")
-            except Exception:
-                f.write(str({'timestamp': timestamp, **e}) + "\n")
-
-            # Forward to AI tracker for structured analysis when possible
-            try:
-                # Build a lightweight Exception to pass into track_error
-                class FrontendError(Exception):
-                    pass
-
-                err = FrontendError(e.get('message', 'Frontend error'))
-                track_error(err,
-                            context=e.get('type', 'frontend'),
-                            user_action=e.get('user_action', ''),
-                            endpoint=e.get('url', ''),
-                            request_data=e)
-            except Exception:
-                # don't let AI tracker failures break logging
-                pass
+    # Queued to the sink's writer thread; no file I/O on the event loop
+    for e in entries:
+        timestamp = e.get('timestamp') or ''
+        frontend_error_sink.write({'timestamp': timestamp, **e})
+
+    _track_frontend_errors(entries)
 
     return JSONResponse({'status': 'logged', 'count': len(entries)})
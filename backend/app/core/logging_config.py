@@ -33,47 +33,267 @@ LOG_FILES = {
     'performance': 'performance.log',
     'user_activity': 'user_activity.log',
     'background_tasks': 'background_tasks.log',
+    'access': 'access.log',
 }
 
-def get_logger(name, level=logging.INFO):
+def get_logger(name, level=None, formatter=None):
     logger = logging.getLogger(name)
-    if not logger.hasHandlers():
+    if not log_pipeline.has_route(name):
         log_file = os.path.join(LOG_DIR, LOG_FILES.get(name, f'{name}.log'))
-        handler = logging.FileHandler(log_file)
-        formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(level)
+        formatter = formatter or logging.Formatter('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s',
+                                                   defaults={'request_id': '-'})
+        log_pipeline.route(name, log_file, formatter)
+        # LOG_LEVEL is defined further down this module; read it at call time
+        logger.setLevel(level or LOG_LEVEL)
+    apply_log_policy(logger)
     return logger
 
 def log_exception(logger, msg, exc):
     logger.error(msg, exc_info=exc)
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+import re
 import sys
-from datetime import datetime
-
-def clear_logs(logs_dir):
-    """Clear all log files in the logs directory"""
-    if os.path.exists(logs_dir):
-        for log_file in os.listdir(logs_dir):
-            if log_file.endswith('.log'):
-                file_path = os.path.join(logs_dir, log_file)
-                try:
-                    # Open the file in write mode, which clears its contents
-                    with open(file_path, 'w') as f:
-                        f.write(f"Log cleared at {datetime.now().isoformat()}\n")
-                except Exception as e:
-                    print(f"Failed to clear log file {log_file}: {e}")
+import threading
+
+from .request_context import RequestIdFilter
+
+# Logging policy
+# - LOG_LEVEL: default level for the app loggers and the root logger (DEBUG floods disk on hot paths)
+# - LOG_LEVELS: per-module overrides, e.g. "database=DEBUG,auth=WARNING"; also settable at runtime
+#   through set_log_level() / PUT /debug/log-levels/{name} (authenticated, and only when LOG_LEVEL_API=1)
+# - LOG_DEBUG_SAMPLE_EVERY: keep 1 in N DEBUG records per call site (1 keeps all); loggers with an
+#   explicit LOG_LEVELS / runtime override are not sampled, so DEBUG asked for is DEBUG received
+# Handlers redact JWTs, bearer tokens, password hashes and password/token fields before writing.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_DEBUG_SAMPLE_EVERY = max(1, int(os.getenv('LOG_DEBUG_SAMPLE_EVERY', '10')))
+LOG_LEVEL_API = os.getenv('LOG_LEVEL_API', '0') == '1'
+
+_REDACTIONS = (
+    (re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]+'), '[JWT]'),
+    (re.compile(r'(?i)\b(bearer\s+)[\w.~+/-]+=*'), r'\1[REDACTED]'),
+    (re.compile(r'\$pbkdf2[\w-]*\$[^\s\'",)\]]+'), '[PASSWORD_HASH]'),
+    (re.compile(r'(?i)(\b(?:password|hashed_password|access_token|refresh_token|secret)[\'"]?\s*[:=]\s*)([\'"]?)[^\s\'",)}\]]+'),
+     r'\1\2[REDACTED]'),
+)
+
+
+def redact(text):
+    for pattern, replacement in _REDACTIONS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class RedactingFilter(logging.Filter):
+    """Scrub secrets from the formatted message; attach to handlers so every logger is covered."""
+
+    def filter(self, record):
+        message = record.getMessage()
+        redacted = redact(message)
+        if redacted != message:
+            record.msg, record.args = redacted, None
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Pass 1 in ``every`` DEBUG records per call site; INFO and above, and overridden loggers, always pass."""
+
+    def __init__(self, every=LOG_DEBUG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = every
+        self.dropped = 0
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every <= 1 or record.name in _level_overrides:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            seen = self._seen.get(key, 0)
+            self._seen[key] = seen + 1
+            if seen % self.every == 0:
+                return True
+            self.dropped += 1
+            return False
+
+
+redacting_filter = RedactingFilter()
+debug_sampling_filter = DebugSamplingFilter()
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_level_overrides = _parse_levels(LOG_LEVELS)
+_policy_loggers = set()
+
+
+def apply_log_policy(logger, default_level=None):
+    """Apply the configured level override and DEBUG sampling to an app logger."""
+    level = _level_overrides.get(logger.name, default_level)
+    if level is not None:
+        logger.setLevel(level)
+    if debug_sampling_filter not in logger.filters:
+        logger.addFilter(debug_sampling_filter)
+    _policy_loggers.add(logger.name)
+    return logger
+
+
+def set_log_level(name, level):
+    """Change one module's level at runtime ('root' for the root logger); returns its new level."""
+    level = str(level).upper()
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"Unknown log level '{level}'")
+    logger = logging.getLogger() if name == 'root' else logging.getLogger(name)
+    logger.setLevel(level)
+    _level_overrides[name] = level
+    if name != 'root':
+        apply_log_policy(logger)
+    return logging.getLevelName(logger.getEffectiveLevel())
+
+
+def log_levels():
+    names = sorted(_policy_loggers | set(_level_overrides) - {'root'})
+    return {
+        'root': logging.getLevelName(logging.getLogger().level),
+        'loggers': {name: logging.getLevelName(logging.getLogger(name).getEffectiveLevel()) for name in names},
+        'debug_sample_every': debug_sampling_filter.every,
+        'debug_sampled_out': debug_sampling_filter.dropped,
+    }
+
+
+# Asynchronous pipeline: callers only format the record and put it on a queue; one listener
+# thread does all file/console I/O. Files rotate by size (LOG_MAX_BYTES) or, when
+# LOG_ROTATE_WHEN is set (e.g. "midnight"), by time, instead of being truncated on startup.
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN', '')
+
+
+def rotating_file_handler(path, formatter=None):
+    if LOG_ROTATE_WHEN:
+        handler = TimedRotatingFileHandler(path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, delay=True)
+    else:
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True)
+    if formatter is not None:
+        handler.setFormatter(formatter)
+    handler.addFilter(redacting_filter)
+    return handler
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never block the caller: when the listener falls behind, count and drop the record."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _RoutingHandler(logging.Handler):
+    """Runs on the listener thread: shared handlers get every record, routes only their logger's."""
+
+    def __init__(self):
+        super().__init__()
+        self.shared = []
+        self.routes = {}
+
+    def handle(self, record):
+        for handler in self.shared:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        handler = self.routes.get(record.name)
+        if handler is not None and record.levelno >= handler.level:
+            handler.handle(record)
+        return True
+
+    def close(self):
+        for handler in self.shared + list(self.routes.values()):
+            handler.close()
+        super().close()
+
+
+class LogPipeline:
+    def __init__(self, queue_size=LOG_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = _DroppingQueueHandler(self.queue)
+        # Runs on the caller's thread, where the request context is still visible
+        self.queue_handler.addFilter(RequestIdFilter())
+        self.router = _RoutingHandler()
+        self.listener = QueueListener(self.queue, self.router)
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            root = logging.getLogger()
+            if self.queue_handler not in root.handlers:
+                root.addHandler(self.queue_handler)
+            self.listener.start()
+            self._started = True
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Drain the queue and close the files; safe to call more than once."""
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            self.listener.stop()
+            self.router.close()
+
+    def add_handler(self, handler):
+        """Handler for every record (root-level: debug.log, python_errors.log, console)."""
+        with self._lock:
+            self.router.shared.append(handler)
+
+    def has_route(self, name):
+        return name in self.router.routes
+
+    def route(self, name, path, formatter=None):
+        """Send records of logger ``name`` to their own rotating file as well."""
+        with self._lock:
+            if name not in self.router.routes:
+                self.router.routes[name] = rotating_file_handler(path, formatter)
+
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'dropped': self.queue_handler.dropped,
+            'routes': sorted(self.router.routes),
+            'shared_handlers': len(self.router.shared),
+            'rotation': {'when': LOG_ROTATE_WHEN} if LOG_ROTATE_WHEN
+                        else {'max_bytes': LOG_MAX_BYTES, 'backup_count': LOG_BACKUP_COUNT},
+        }
+
+
+log_pipeline = LogPipeline()
+
 
 def setup_logging():
     # Create logs directory if it doesn't exist
     logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
     os.makedirs(logs_dir, exist_ok=True)
-    
-    # Clear existing logs
-    clear_logs(logs_dir)
 
     # Configure different log files for different purposes
     log_files = {
@@ -81,44 +301,29 @@ def setup_logging():
         'api': os.path.join(logs_dir, 'api.log'),
         'database': os.path.join(logs_dir, 'database.log'),
         'security': os.path.join(logs_dir, 'security.log'),
-        'general': os.path.join(logs_dir, 'app.log')
+        'app': os.path.join(logs_dir, 'app.log')
     }
 
     # Basic logging format
     log_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
+        defaults={'request_id': '-'}
     )
 
-    # Setup handlers for each log file
-    handlers = {}
-    for name, filepath in log_files.items():
-        handler = RotatingFileHandler(
-            filepath,
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5
-        )
-        handler.setFormatter(log_format)
-        handlers[name] = handler
-
-    # Configure loggers
-    loggers = {
-        'auth': logging.getLogger('auth'),
-        'api': logging.getLogger('api'),
-        'database': logging.getLogger('database'),
-        'security': logging.getLogger('security'),
-        'app': logging.getLogger('app')
-    }
+    # One console handler for every logger (written by the listener thread, like the files)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(log_format)
+    console_handler.setLevel(logging.INFO)
+    console_handler.addFilter(redacting_filter)
+    log_pipeline.add_handler(console_handler)
 
-    # Set up each logger
-    for name, logger in loggers.items():
-        logger.setLevel(logging.DEBUG)
-        logger.addHandler(handlers.get(name if name != 'app' else 'general'))
-        # Add console handler in development
-        if os.getenv('ENVIRONMENT') != 'production':
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setFormatter(log_format)
-            logger.addHandler(console_handler)
+    # Each logger hands records to the root queue handler; the listener writes its file
+    loggers = {}
+    for name, filepath in log_files.items():
+        log_pipeline.route(name, filepath, log_format)
+        loggers[name] = apply_log_policy(logging.getLogger(name), LOG_LEVEL)
 
+    log_pipeline.start()
     return loggers
 
 # Global logger instances
@@ -127,4 +332,4 @@ auth_logger = loggers['auth']
 api_logger = loggers['api']
 db_logger = loggers['database']
 security_logger = loggers['security']
-app_logger = loggers['app']
\ No newline at end of file
+app_logger = loggers['app']
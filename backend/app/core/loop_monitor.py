@@ -0,0 +1,65 @@
+"""
+Event loop lag monitor.
+
+A background task sleeps for a fixed interval and measures how late it wakes
+up. Any blocking call on the loop shows up as lag, so regressions (a sync DB
+call or file write sneaking into an ``async def`` route) are visible in
+/debug/loop-lag and in performance.log.
+"""
+import asyncio
+import os
+import time
+
+from .logging_config import get_logger
+
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+LOOP_LAG_WARN = float(os.getenv("LOOP_LAG_WARN", "0.1"))
+
+performance_logger = get_logger('performance')
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, warn_threshold: float = LOOP_LAG_WARN):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._task = None
+        self.samples = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.lag_last = 0.0
+        self.slow_ticks = 0
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.samples += 1
+            self.lag_total += lag
+            self.lag_last = lag
+            self.lag_max = max(self.lag_max, lag)
+            if lag >= self.warn_threshold:
+                self.slow_ticks += 1
+                performance_logger.warning(f"Event loop lag {lag * 1000:.1f}ms (threshold {self.warn_threshold * 1000:.0f}ms)")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "lag_last_ms": round(self.lag_last * 1000, 2),
+            "lag_avg_ms": round(self.lag_total / self.samples * 1000, 2) if self.samples else 0.0,
+            "lag_max_ms": round(self.lag_max * 1000, 2),
+            "slow_ticks": self.slow_ticks,
+        }
+
+
+loop_monitor = LoopLagMonitor()
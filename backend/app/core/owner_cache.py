@@ -0,0 +1,105 @@
+"""
+Per-owner result cache for dashboard aggregates.
+
+Example usage:
+
+from ..core.owner_cache import owner_kpi_cache
+
+kpis = owner_kpi_cache.get(owner_id)
+if kpis is None:
+    generation = owner_kpi_cache.generation(owner_id)
+    kpis = compute(owner_id)
+    owner_kpi_cache.put(owner_id, kpis, generation)
+
+Writes that touch an owner's properties, leases or payments call
+``invalidate(owner_id)`` after they commit. A read whose generation was taken
+before the invalidation is not stored, so a slow read racing a write can't
+cache stale numbers. The TTL bounds staleness from writes made by other processes.
+
+Generations come from one counter: each invalidation records the counter value
+for its owner, and only the most recent max_size of those are kept. Forgetting
+an older one raises a floor below which every read is refused. A forgotten
+invalidation therefore rejects a few in-flight reads, but never lets a stale one
+in, and memory stays bounded.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+OWNER_KPI_CACHE_TTL = float(os.getenv("OWNER_KPI_CACHE_TTL", "300"))
+OWNER_KPI_CACHE_SIZE = int(os.getenv("OWNER_KPI_CACHE_SIZE", "5000"))
+
+
+class OwnerResultCache:
+    def __init__(self, ttl: float = OWNER_KPI_CACHE_TTL, max_size: int = OWNER_KPI_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # owner_id -> (value, valid_until)
+        self._seq = 0  # bumped by every invalidate() / clear()
+        self._invalidated = OrderedDict()  # owner_id -> _seq of its last invalidation, oldest first
+        self._floor = 0  # reads with an older generation are never stored
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, owner_id) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[owner_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(owner_id)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self, owner_id) -> int:
+        """Token to pass to ``put``; take it before reading ``owner_id``'s data."""
+        with self._lock:
+            return self._seq
+
+    def put(self, owner_id, value, generation: Optional[int] = None):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and (generation < self._floor
+                                           or self._invalidated.get(owner_id, 0) > generation):
+                return
+            self._entries[owner_id] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(owner_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, owner_id):
+        if owner_id is None:
+            return
+        with self._lock:
+            self._entries.pop(owner_id, None)
+            self._seq += 1
+            self._invalidated[owner_id] = self._seq
+            self._invalidated.move_to_end(owner_id)
+            while len(self._invalidated) > self.max_size:
+                _, seq = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, seq)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._seq += 1
+            self._floor = self._seq
+            self._invalidated.clear()
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "invalidations": self.invalidations}
+
+
+owner_kpi_cache = OwnerResultCache()
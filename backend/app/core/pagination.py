@@ -0,0 +1,67 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Example usage:
+
+from ..core.pagination import decode_cursor, set_next_cursor
+
+after_key, after_id = decode_cursor(after)          # HTTP 400 on a bad cursor
+rows = StoredProcedures.list_properties_page(owner_id, limit + 1, after_key, after_id)
+return set_next_cursor(response, rows, limit, "created_at")
+
+Lists are ordered by ``(sort_key DESC, id DESC)`` and the next page starts
+strictly after the last row seen, so page N costs the same index seek as page
+one. The cursor is an opaque base64 token; clients must pass it back unchanged
+in ``?after=``. The body stays a plain list and the next cursor is returned in
+the ``X-Next-Cursor`` header (absent on the last page).
+"""
+import base64
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import HTTPException, Response
+
+CURSOR_MAX_LIMIT = int(os.getenv("CURSOR_MAX_LIMIT", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    if isinstance(sort_value, datetime):
+        key = ["dt", sort_value.isoformat()]
+    elif isinstance(sort_value, date):
+        key = ["d", sort_value.isoformat()]
+    elif isinstance(sort_value, Decimal):
+        key = ["n", str(sort_value)]
+    else:
+        key = ["v", sort_value]
+    raw = json.dumps([key, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (sort_value, id) for a cursor, or (None, None) when no cursor was given."""
+    if not cursor:
+        return None, None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (kind, value), row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if kind == "dt":
+            value = datetime.fromisoformat(value)
+        elif kind == "d":
+            value = date.fromisoformat(value)
+        elif kind == "n":
+            value = Decimal(value)
+        return value, int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def set_next_cursor(response: Response, rows: list, limit: int, sort_key: str) -> list:
+    """Trim the look-ahead row fetched with ``limit + 1`` and publish the next cursor."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.get(sort_key), last.get("id"))
+    return rows
@@ -0,0 +1,130 @@
+"""
+Bounded executor for password hashing and verification.
+
+Example usage:
+
+from ..core.password_hashing import password_hasher
+
+ok, new_hash = await password_hasher.verify_and_update(password, user['hashed_password'])
+hashed = await password_hasher.hash(password)
+
+pbkdf2 runs in hashlib with the GIL released, so a few dedicated threads keep
+every core busy during a login burst without taking threads from the DB
+executor or Starlette's threadpool. At most PASSWORD_HASH_MAX_QUEUE requests
+wait for a worker; beyond that callers get a 503 instead of piling up.
+``verify_and_update`` returns a replacement hash when the stored one was made
+with different rounds than PASSWORD_HASH_ROUNDS (see security.pwd_context).
+"""
+import asyncio
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from .request_context import record_stage
+from .security import pwd_context
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.max_queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        self._dummy_hash = None
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in requests in progress, please retry shortly",
+                    headers={"Retry-After": "2", "X-Error-Code": "AUTH_BUSY"}
+                )
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                waited = started - submitted
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.total_run += time.perf_counter() - started
+
+        def release_if_cancelled(future):
+            # A caller cancelled while queued cancels the pending job, so job() never runs
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+
+        future = self._executor.submit(job)
+        future.add_done_callback(release_if_cancelled)
+        with record_stage("auth"):
+            return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set only when valid and the stored hash needs upgrading."""
+        valid, new_hash = await self._run(pwd_context.verify_and_update, password, hashed)
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    async def verify_unknown_user(self, password: str):
+        """Do the same work as a real verify so response time doesn't reveal whether an account exists."""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self._run(pwd_context.hash, secrets.token_hex(16))
+        await self._run(pwd_context.verify, password, self._dummy_hash)
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "active": self.active,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_wait_ms": round(self.total_wait / done * 1000, 2),
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "avg_hash_ms": round(self.total_run / done * 1000, 2),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,189 @@
+"""
+Token-bucket rate limiting for credential endpoints.
+
+Example usage:
+
+from ..core.rate_limit import login_limiter
+
+await login_limiter.check(request, user_data.email)   # raises 429 when over budget
+
+Each key (client IP, normalized email) has a bucket of ``burst`` tokens that
+refills at ``rate`` tokens per second; every attempt takes one. The check runs
+before any DB lookup or password hashing, so a credential-stuffing run is shed
+for the cost of a dict lookup.
+
+Buckets live in process memory by default (LOGIN_LIMIT_BACKEND=memory). With
+several workers or hosts set LOGIN_LIMIT_BACKEND=redis and LOGIN_LIMIT_REDIS_URL
+to share them; if Redis is unreachable the in-memory buckets take over until it
+is back.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+
+from .async_db import run_blocking
+from .logging_config import get_logger
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+LOGIN_LIMIT_BACKEND = os.getenv("LOGIN_LIMIT_BACKEND", "memory").lower()
+LOGIN_LIMIT_REDIS_URL = os.getenv("LOGIN_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+LOGIN_LIMIT_MAX_KEYS = int(os.getenv("LOGIN_LIMIT_MAX_KEYS", "100000"))
+# Per client IP: bursts of 20, then one attempt every 5 seconds
+LOGIN_LIMIT_IP_BURST = float(os.getenv("LOGIN_LIMIT_IP_BURST", "20"))
+LOGIN_LIMIT_IP_RATE = float(os.getenv("LOGIN_LIMIT_IP_RATE", "0.2"))
+# Per account: 5 attempts, then one per minute
+LOGIN_LIMIT_EMAIL_BURST = float(os.getenv("LOGIN_LIMIT_EMAIL_BURST", "5"))
+LOGIN_LIMIT_EMAIL_RATE = float(os.getenv("LOGIN_LIMIT_EMAIL_RATE", str(1 / 60)))
+# Only honour X-Forwarded-For when running behind a proxy that sets it
+LOGIN_LIMIT_TRUST_FORWARDED = os.getenv("LOGIN_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+security_logger = get_logger('security')
+
+
+class MemoryBucketBackend:
+    """Buckets in an LRU-bounded dict; the local stand-in for a shared backend."""
+    blocking = False
+    name = "memory"
+
+    def __init__(self, max_keys: int = LOGIN_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, now: float):
+        """Take one token; returns (allowed, retry_after_seconds)."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [burst, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            return False, (1 - bucket[0]) / rate
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+class RedisBucketBackend:
+    """Buckets shared across workers, updated atomically by a Lua script."""
+    blocking = True
+    name = "redis"
+
+    _SCRIPT = """
+local b = redis.call('HMGET', KEYS[1], 't', 'ts')
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens, ts = tonumber(b[1]) or burst, tonumber(b[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed, retry = 0, 0
+if tokens >= 1 then tokens = tokens - 1; allowed = 1 else retry = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+    def __init__(self, url: str = LOGIN_LIMIT_REDIS_URL):
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._take = self._client.register_script(self._SCRIPT)
+
+    def take(self, key: str, rate: float, burst: float, now: float):
+        allowed, retry = self._take(keys=[f"ratelimit:{key}"], args=[rate, burst, now])
+        return bool(allowed), float(retry)
+
+    def size(self):
+        return None
+
+
+class LoginLimiter:
+    def __init__(self, backend=None):
+        self.local = MemoryBucketBackend()
+        self.backend = backend or self.local
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected_ip = 0
+        self.rejected_email = 0
+        self.backend_errors = 0
+
+    async def _take(self, key: str, rate: float, burst: float):
+        now = time.time()
+        if self.backend is not self.local:
+            try:
+                return await run_blocking(self.backend.take, key, rate, burst, now)
+            except Exception as e:
+                with self._lock:
+                    self.backend_errors += 1
+                security_logger.warning(f"Login limiter backend {self.backend.name} failed, using local buckets: {e}")
+        return self.local.take(key, rate, burst, now)
+
+    @staticmethod
+    def client_ip(request: Request) -> str:
+        if LOGIN_LIMIT_TRUST_FORWARDED:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def check(self, request: Request, email: str):
+        """Raise 429 if this IP or this account is over its login budget."""
+        ip = self.client_ip(request)
+        allowed, retry_after = await self._take(f"login:ip:{ip}", LOGIN_LIMIT_IP_RATE, LOGIN_LIMIT_IP_BURST)
+        if not allowed:
+            with self._lock:
+                self.rejected_ip += 1
+            self._reject(retry_after)
+        account = hashlib.sha256((email or "").strip().lower().encode("utf-8")).hexdigest()
+        allowed, retry_after = await self._take(f"login:email:{account}", LOGIN_LIMIT_EMAIL_RATE, LOGIN_LIMIT_EMAIL_BURST)
+        if not allowed:
+            with self._lock:
+                self.rejected_email += 1
+            self._reject(retry_after)
+        with self._lock:
+            self.allowed += 1
+
+    @staticmethod
+    def _reject(retry_after: float):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please wait before trying again",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999))), "X-Error-Code": "TOO_MANY_ATTEMPTS"}
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend.name,
+                "allowed": self.allowed,
+                "rejected_ip": self.rejected_ip,
+                "rejected_email": self.rejected_email,
+                "backend_errors": self.backend_errors,
+                "local_keys": self.local.size(),
+                "ip_limit": {"burst": LOGIN_LIMIT_IP_BURST, "per_second": LOGIN_LIMIT_IP_RATE},
+                "email_limit": {"burst": LOGIN_LIMIT_EMAIL_BURST, "per_second": LOGIN_LIMIT_EMAIL_RATE},
+            }
+
+
+def _make_backend():
+    if LOGIN_LIMIT_BACKEND == "redis":
+        if redis is None:
+            security_logger.warning("LOGIN_LIMIT_BACKEND=redis but the redis package is not installed; using memory")
+            return None
+        return RedisBucketBackend()
+    return None
+
+
+login_limiter = LoginLimiter(_make_backend())
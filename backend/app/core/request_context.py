@@ -0,0 +1,96 @@
+"""
+Per-request context: request ID and where the time went.
+
+Example usage:
+
+from ..core.request_context import current_request_id, record_stage
+
+with record_stage("auth"):
+    payload = verify_token(token)
+
+AccessLogMiddleware starts a RequestTimings for every HTTP request and stores
+it in a ContextVar. Stages add to it from wherever they run: the event loop,
+Starlette's threadpool, or our DB/IO executors (``run_db`` / ``run_blocking``
+copy the context into the worker). Log records get ``request_id`` through
+RequestIdFilter, and the access log reports the totals.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+class RequestTimings:
+    __slots__ = ("request_id", "auth", "db", "sp_calls", "serialize", "_lock")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.auth = 0.0
+        self.db = 0.0
+        self.sp_calls = 0
+        self.serialize = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        # Stages of one request can run on several threads (e.g. asyncio.gather of DB calls)
+        with self._lock:
+            setattr(self, stage, getattr(self, stage) + seconds)
+
+    def count_sp_call(self):
+        with self._lock:
+            self.sp_calls += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "auth_ms": round(self.auth * 1000, 2),
+            "db_ms": round(self.db * 1000, 2),
+            "sp_calls": self.sp_calls,
+            "serialize_ms": round(self.serialize * 1000, 2),
+        }
+
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request(request_id: str):
+    """Bind a new RequestTimings to this context; returns (timings, token for end_request)."""
+    timings = RequestTimings(request_id)
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_request_id():
+    timings = _current.get()
+    return timings.request_id if timings is not None else None
+
+
+def count_sp_call():
+    timings = _current.get()
+    if timings is not None:
+        timings.count_sp_call()
+
+
+@contextmanager
+def record_stage(stage: str):
+    """Add the block's wall time to ``stage`` ('auth', 'db' or 'serialize') of the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.perf_counter() - started)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp ``record.request_id``; attach where records are created (the queue handler), not on the listener."""
+
+    def filter(self, record):
+        record.request_id = current_request_id() or "-"
+        return True
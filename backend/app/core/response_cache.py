@@ -0,0 +1,153 @@
+"""
+Shared TTL + stale-while-revalidate response cache for anonymous endpoints.
+
+Example usage:
+
+from ..core.response_cache import public_cache
+
+return public_cache.respond(request, "public:summary", build_summary)
+
+``build_summary`` returns a JSON-able value. It runs at most once per key at a
+time: concurrent misses wait for the first caller's result instead of each
+hitting the DB. Within ``ttl`` the cached body is served as-is; after that and
+until ``ttl + stale_ttl`` the stale body is served immediately while one
+background thread recomputes it. Bodies are serialized once per refresh and
+carry an ETag, so repeat visitors get a 304 without a body.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .logging_config import get_logger
+
+PUBLIC_CACHE_TTL = float(os.getenv("PUBLIC_CACHE_TTL", "30"))
+PUBLIC_CACHE_STALE_TTL = float(os.getenv("PUBLIC_CACHE_STALE_TTL", "300"))
+
+performance_logger = get_logger('performance')
+
+
+class _Entry:
+    __slots__ = ("body", "etag", "created")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.created = time.monotonic()
+
+
+class SwrCache:
+    def __init__(self, ttl: float = PUBLIC_CACHE_TTL, stale_ttl: float = PUBLIC_CACHE_STALE_TTL):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}   # key -> _Entry
+        self._inflight = {}  # key -> Future for the running computation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.not_modified = 0
+
+    def _compute(self, key, fn, future: Future):
+        try:
+            body = json.dumps(jsonable_encoder(fn()), separators=(",", ":")).encode("utf-8")
+            entry = _Entry(body)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.errors += 1
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._inflight.pop(key, None)
+        future.set_result(entry)
+
+    def _refresh_in_background(self, key, fn):
+        future = Future()
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight[key] = future
+            self.refreshes += 1
+
+        def run():
+            self._compute(key, fn, future)
+            if future.exception() is not None:
+                performance_logger.warning(f"Background refresh of {key} failed, serving stale: {future.exception()}")
+
+        threading.Thread(target=run, name=f"swr:{key}", daemon=True).start()
+
+    def get(self, key, fn) -> _Entry:
+        now = time.monotonic()
+        compute = False
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry.created if entry else None
+            if entry is not None and age < self.ttl:
+                self.hits += 1
+                return entry
+            if entry is not None and age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                future = None
+            else:
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.coalesced += 1
+                else:
+                    self.misses += 1
+                    future = Future()
+                    self._inflight[key] = future
+                    compute = True
+        if future is None:
+            self._refresh_in_background(key, fn)
+            return entry
+        if compute:
+            self._compute(key, fn, future)
+        return future.result()
+
+    def respond(self, request: Request, key, fn) -> Response:
+        """Serve ``fn()``'s cached JSON with ETag/Cache-Control, or a 304 for a matching If-None-Match."""
+        entry = self.get(key, fn)
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": f"public, max-age={int(self.ttl)}, stale-while-revalidate={int(self.stale_ttl)}",
+        }
+        if request.headers.get("if-none-match") == entry.etag:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "not_modified": self.not_modified,
+            }
+
+
+public_cache = SwrCache()
@@ -16,10 +16,11 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 import uuid
-import pyodbc
 from ..database import StoredProcedures
+from .session_cache import session_cache
 import os
 from .logging_config import security_logger as logger
+from .request_context import record_stage
 
 # to get a string like this run:
 # openssl rand -hex 32
@@ -28,10 +29,15 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 BYPASS_DB_SESSION = os.getenv("BYPASS_DB_SESSION", "false").lower() in ("1", "true", "yes")
 
+# Hashes made with any other round count are flagged by verify_and_update and
+# replaced on the user's next successful login (see core/password_hashing.py)
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256"],
     default="pbkdf2_sha256",
-    pbkdf2_sha256__default_rounds=29000
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS
 )
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -67,6 +73,7 @@ class SessionManager:
             cls.revoked_sessions.add(sid)
             if sid in cls.active_sessions:
                 cls.active_sessions.remove(sid)
+            session_cache.invalidate(sid)
 
     @classmethod
     def is_active(cls, sid: Optional[str]) -> bool:
@@ -76,52 +83,50 @@ class SessionManager:
 def _db_session_is_active(sid: Optional[str]) -> bool:
     if not sid:
         return False
-    last_err = None
-    for server in StoredProcedures._candidate_servers():
-        try:
-            conn_str = StoredProcedures._build_conn_str(server)
-            conn = pyodbc.connect(conn_str)
-            cur = conn.cursor()
-            cur.execute("SELECT revoked_at, expires_at FROM sessions WHERE session_id = ?", (sid,))
-            row = cur.fetchone()
-            try:
-                cur.close()
-                conn.close()
-            except Exception:
-                pass
-            if row is None:
-                return False
-            revoked_at, expires_at = row[0], row[1]
-            if revoked_at is not None:
-                return False
-            # Expiry check
-            try:
-                # If expired, deny
-                if expires_at is not None and expires_at < datetime.utcnow():
-                    return False
-            except Exception:
-                pass
-            # Touch session asynchronously (best-effort)
-            try:
-                from ..database import StoredProcedures as _SP
-                _SP.touch_session(sid)
-            except Exception:
-                pass
-            return True
-        except Exception as e:
-            last_err = e
-            continue
-    # If we couldn't reach DB, deny by default for safety
-    logger.warning(f"Session DB check failed: {last_err}")
-    return False
+    cached = session_cache.get(sid)
+    if cached is not None:
+        return cached
+    try:
+        row = StoredProcedures.get_session(sid)
+    except Exception as e:
+        # If we couldn't reach DB, deny by default for safety (and don't cache the outage)
+        logger.warning(f"Session DB check failed: {e}")
+        return False
+    if row is None:
+        session_cache.put(sid, False)
+        return False
+    revoked_at, expires_at = row
+    if revoked_at is not None:
+        session_cache.put(sid, False)
+        return False
+    # Expiry check
+    try:
+        # If expired, deny
+        if expires_at is not None and expires_at < datetime.utcnow():
+            session_cache.put(sid, False)
+            return False
+    except Exception:
+        pass
+    session_cache.put(sid, True, expires_at)
+    # Touch session (best-effort)
+    try:
+        StoredProcedures.touch_session(sid)
+    except Exception:
+        pass
+    return True
 
 
 def verify_token(token: str):
+    with record_stage("auth"):
+        return _verify_token(token)
+
+
+def _verify_token(token: str):
     try:
-        logger.info(f"Verifying token: {token}")
         decoded = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.info(f"Token decoded successfully: {decoded}")
         sid = decoded.get('sid')
+        # Never log the token or its claims; user id and session id are enough to trace a request
+        logger.debug("Token verified for user_id=%s sid=%s", decoded.get('user_id'), sid)
 
         # When bypassing DB session checks (dev hot-reload), still enforce in-memory revocation
         if BYPASS_DB_SESSION:
@@ -139,8 +144,8 @@ def verify_token(token: str):
                 raise HTTPException(status_code=401, detail="Session expired or logged out", headers={"X-Error-Code": "SESSION_EXPIRED"})
         return decoded
     except jwt.ExpiredSignatureError:
-        logger.error("Token has expired")
+        logger.info("Token has expired")
         raise HTTPException(status_code=401, detail="Token has expired", headers={"X-Error-Code": "TOKEN_EXPIRED"})
     except jwt.JWTError as e:
-        logger.error(f"Invalid token: {e}")
+        logger.warning("Invalid token: %s", e)
         raise HTTPException(status_code=401, detail="Invalid token", headers={"X-Error-Code": "INVALID_TOKEN"})
@@ -0,0 +1,102 @@
+"""
+In-process cache of verified session state for verify_token.
+
+Example usage:
+
+from ..core.session_cache import session_cache
+
+active = session_cache.get(sid)
+if active is None:
+    active = lookup(sid)
+    session_cache.put(sid, active, expires_at)
+
+StoredProcedures.revoke_session invalidates the sid after the revocation
+commits, so every logout path in this process takes effect at once.
+``invalidate`` leaves a revoked marker for one TTL that ``put(sid, True)``
+can't overwrite: a verify that read the session row before the revoke
+committed can't cache it as active afterwards. The TTL bounds staleness from
+revocations made by other processes.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+# Verified-session cache: bounds cross-process staleness (e.g. logout on another worker)
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "15"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+
+
+class SessionCache:
+    """Bounded LRU of DB session verdicts keyed by sid, each valid for a short TTL.
+
+    A hit costs no DB round-trip. Entries never outlive the session's own
+    expires_at, and revocations in this process invalidate them immediately.
+    """
+
+    def __init__(self, ttl: float = SESSION_CACHE_TTL, max_size: int = SESSION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # sid -> (active, valid_until, revoked)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sid: str) -> Optional[bool]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[sid]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sid)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, sid: str, active: bool, expires_at: Optional[datetime] = None):
+        if self.ttl <= 0:
+            return
+        ttl = self.ttl
+        if active and expires_at is not None:
+            try:
+                ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+            except Exception:
+                pass
+            if ttl <= 0:
+                return
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(sid)
+            if active and entry is not None and entry[2] and entry[1] > now:
+                # Revoked while this verdict was being looked up
+                return
+            self._store(sid, (active, now + ttl, False))
+
+    def invalidate(self, sid: Optional[str]):
+        """Forget the verdict for ``sid`` and refuse to cache it as active for one TTL."""
+        if not sid:
+            return
+        with self._lock:
+            if self.ttl > 0:
+                self._store(sid, (False, time.monotonic() + self.ttl, True))
+            else:
+                self._entries.pop(sid, None)
+
+    def _store(self, sid: str, entry: tuple):
+        """Caller holds the lock."""
+        self._entries[sid] = entry
+        self._entries.move_to_end(sid)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses}
+
+
+session_cache = SessionCache()
@@ -0,0 +1,123 @@
+"""
+Write-behind coalescing of session activity touches.
+
+Instead of one ``UPDATE sessions`` per authenticated request, touches are
+recorded in memory (latest touch per session wins) and flushed periodically as a
+single set-based statement. The sliding expiry stays accurate to within the
+flush interval, and pending touches are flushed on shutdown.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+from .logging_config import db_logger as logger
+
+TOUCH_FLUSH_INTERVAL = float(os.getenv("SESSION_TOUCH_FLUSH_INTERVAL", "30"))
+TOUCH_MAX_PENDING = int(os.getenv("SESSION_TOUCH_MAX_PENDING", "5000"))
+
+
+class SessionTouchBuffer:
+    def __init__(self,
+                 flush_fn: Callable[[Dict[str, float]], int],
+                 interval: float = TOUCH_FLUSH_INTERVAL,
+                 max_pending: int = TOUCH_MAX_PENDING):
+        """
+        Args:
+            flush_fn: receives {session_id: seconds_since_touch} and persists it
+            interval: maximum delay (seconds) before a touch reaches the DB
+            max_pending: flush early once this many distinct sessions are pending
+        """
+        self._flush_fn = flush_fn
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = {}  # session_id -> monotonic time of latest touch
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.touches = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.flush_failures = 0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, name="session-touch-flusher", daemon=True)
+                    self._thread.start()
+
+    def record(self, session_id: str):
+        if not session_id:
+            return
+        if self.interval <= 0:
+            # Write-behind disabled: persist immediately
+            self._flush_fn({session_id: 0.0})
+            return
+        self._ensure_started()
+        with self._lock:
+            self._pending[session_id] = time.monotonic()
+            self.touches += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def discard(self, session_id: str):
+        """Drop a pending touch (e.g. the session was revoked)."""
+        with self._lock:
+            self._pending.pop(session_id, None)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            now = time.monotonic()
+            ages = {sid: max(0.0, now - ts) for sid, ts in batch.items()}
+            try:
+                self._flush_fn(ages)
+            except Exception as e:
+                self.flush_failures += 1
+                logger.warning(f"Session touch flush failed for {len(batch)} sessions: {e}")
+                # Re-queue, keeping any newer touch recorded meanwhile
+                with self._lock:
+                    for sid, ts in batch.items():
+                        if self._pending.get(sid, 0) < ts:
+                            self._pending[sid] = ts
+                return 0
+            self.flushes += 1
+            self.rows_flushed += len(batch)
+            return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Session touch flusher error: {e}")
+
+    def close(self):
+        """Stop the flusher thread and persist anything still pending."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "flush_failures": self.flush_failures,
+            "interval": self.interval,
+        }
@@ -0,0 +1,45 @@
+"""
+In-memory ring buffer of recent SQL errors with asynchronous append-only persistence.
+
+Recording is O(1) under a lock, so concurrent failures from any thread can't
+corrupt or lose entries; /debug/sql-errors reads straight from memory and the
+JSONL file is written by a background sink thread.
+"""
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+from .file_sink import JsonlSink
+
+SQL_ERROR_RING_SIZE = int(os.getenv("SQL_ERROR_RING_SIZE", "200"))
+SQL_ERROR_LOG_MAX_BYTES = int(os.getenv("SQL_ERROR_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+
+
+class SqlErrorLog:
+    def __init__(self, path: str, capacity: int = SQL_ERROR_RING_SIZE):
+        self._ring = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.sink = JsonlSink(path, max_bytes=SQL_ERROR_LOG_MAX_BYTES)
+
+    def record(self, entry: dict):
+        with self._lock:
+            self._ring.append(entry)
+            self.total += 1
+        self.sink.write(entry)
+
+    def recent(self, limit: int = 50) -> list:
+        with self._lock:
+            items = list(self._ring)
+        return items[-limit:] if limit else items
+
+    def clear(self):
+        with self._lock:
+            self._ring.clear()
+
+    def close(self):
+        self.sink.close()
+
+
+sql_error_log = SqlErrorLog(str(Path(os.getcwd()) / "sql_error_log.jsonl"))
@@ -0,0 +1,101 @@
+"""
+Static file serving with cache validators, precompressed variants and long-lived caching.
+
+Example usage:
+
+from .core.static_files import CachedStaticFiles
+
+app.mount("/uploads", CachedStaticFiles(directory=uploads_path), name="uploads")
+
+On top of Starlette's StaticFiles (Last-Modified, 304 on If-None-Match /
+If-Modified-Since, single and multi-part Range requests):
+
+- Content-addressed blobs (blobs/<aa>/<bb>/<sha256>...) and fingerprinted
+  assets (name.<hash>.js) are immutable: their ETag is the content hash and
+  they are cached for a year. Everything else is ``no-cache``, so browsers
+  revalidate and get a 304 instead of re-downloading.
+- If ``<file>.br`` / ``<file>.gz`` exists next to a compressible file and the
+  client accepts that encoding, the precompressed variant is served.
+- Bodies are sent in STATIC_CHUNK_SIZE pieces. Starlette hands the file to the
+  server for zero-copy sending when the server supports ``http.response.pathsend``.
+  Behind nginx, set STATIC_SENDFILE_HEADER=X-Accel-Redirect and
+  STATIC_SENDFILE_PREFIX to an ``internal`` location aliasing the same
+  directory so nginx sends the file with sendfile(2) itself.
+"""
+import os
+import re
+import stat as stat_module
+from mimetypes import guess_type
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+
+STATIC_CHUNK_SIZE = int(os.getenv("STATIC_CHUNK_SIZE", str(256 * 1024)))
+STATIC_IMMUTABLE_MAX_AGE = int(os.getenv("STATIC_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+STATIC_SENDFILE_HEADER = os.getenv("STATIC_SENDFILE_HEADER", "")
+STATIC_SENDFILE_PREFIX = os.getenv("STATIC_SENDFILE_PREFIX", "")
+
+_BLOB = re.compile(r"^blobs/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(\.[A-Za-z0-9]+)?$")
+_FINGERPRINTED = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+
+
+class _ChunkedFileResponse(FileResponse):
+    chunk_size = STATIC_CHUNK_SIZE
+
+
+def _accepted_encodings(request_headers: Headers) -> set:
+    accepted = set()
+    for part in request_headers.get("accept-encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(token.lower())
+    return accepted
+
+
+class CachedStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        rel_path = self.get_path(scope).replace(os.sep, "/")
+        media_type = guess_type(str(full_path))[0] or "text/plain"
+        headers = {"Vary": "Accept-Encoding"}
+
+        # Serve a precompressed sibling when the client accepts it
+        path, file_stat, suffix = str(full_path), stat_result, ""
+        if media_type.startswith(_COMPRESSIBLE):
+            accepted = _accepted_encodings(request_headers)
+            for encoding, variant_suffix in _ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    variant_stat = os.stat(path + variant_suffix)
+                except OSError:
+                    continue
+                if stat_module.S_ISREG(variant_stat.st_mode):
+                    path, file_stat, suffix = path + variant_suffix, variant_stat, variant_suffix
+                    headers["Content-Encoding"] = encoding
+                    break
+
+        blob = _BLOB.match(rel_path)
+        if blob or _FINGERPRINTED.search(rel_path):
+            headers["Cache-Control"] = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            headers["Cache-Control"] = "no-cache"
+
+        if STATIC_SENDFILE_HEADER and STATIC_SENDFILE_PREFIX:
+            # The proxy serves the file (validators, ranges, sendfile); we only pick it and set headers
+            headers[STATIC_SENDFILE_HEADER] = STATIC_SENDFILE_PREFIX.rstrip("/") + "/" + rel_path + suffix
+            return Response(status_code=status_code, media_type=media_type, headers=headers)
+
+        response = _ChunkedFileResponse(path, status_code=status_code, stat_result=file_stat,
+                                        media_type=media_type, headers=headers)
+        if blob:
+            # Strong validator: the content hash, distinct per encoding
+            encoding = headers.get("Content-Encoding")
+            response.headers["etag"] = f'"{blob.group(1)}{"-" + encoding if encoding else ""}"'
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
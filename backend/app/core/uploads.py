@@ -0,0 +1,169 @@
+"""
+Streaming file uploads with constant memory per request.
+
+Example usage:
+
+from ..core.uploads import discard_temp, stream_to_temp, upload_slot
+
+async with upload_slot():
+    info = await stream_to_temp(f, tmp_dir, safe_name)  # {"tmp_path", "size", "sha256"}
+try:
+    ...  # register the file, then commit_temp(info["tmp_path"], final_path)
+except BaseException:
+    await discard_temp(info["tmp_path"])
+    raise
+
+(core/blob_store.py wraps this as stage_upload / place_blob for property documents.)
+
+Each upload is copied in UPLOAD_CHUNK_SIZE pieces into a temp file, hashed as
+it goes and renamed into place only once it is complete and registered, so
+readers never see a partial file and a failed or oversized upload leaves
+nothing behind. Disk writes run on the I/O executor. At most
+UPLOAD_MAX_CONCURRENT files are written at once; further uploads wait up to
+UPLOAD_QUEUE_TIMEOUT seconds for a slot and then get a 503.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, UploadFile
+
+from .async_db import run_blocking
+from .logging_config import get_logger
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_MAX_CONCURRENT = int(os.getenv("UPLOAD_MAX_CONCURRENT", "4"))
+UPLOAD_QUEUE_TIMEOUT = float(os.getenv("UPLOAD_QUEUE_TIMEOUT", "30"))
+
+performance_logger = get_logger('performance')
+
+
+class UploadStats:
+    def __init__(self):
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected_too_large = 0
+        self.rejected_busy = 0
+        self.failed = 0
+        self.bytes_written = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "max_concurrent": UPLOAD_MAX_CONCURRENT,
+            "max_file_bytes": UPLOAD_MAX_FILE_BYTES,
+            "chunk_size": UPLOAD_CHUNK_SIZE,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected_too_large": self.rejected_too_large,
+            "rejected_busy": self.rejected_busy,
+            "failed": self.failed,
+            "bytes_written": self.bytes_written,
+        }
+
+
+upload_stats = UploadStats()
+_slots = asyncio.Semaphore(UPLOAD_MAX_CONCURRENT)
+
+
+@asynccontextmanager
+async def upload_slot():
+    """Hold one of the UPLOAD_MAX_CONCURRENT write slots, or raise 503 if none frees up in time."""
+    upload_stats.waiting += 1
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=UPLOAD_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        upload_stats.rejected_busy += 1
+        raise HTTPException(status_code=503, detail="Too many uploads in progress, try again shortly",
+                            headers={"Retry-After": "5"})
+    finally:
+        upload_stats.waiting -= 1
+    upload_stats.active += 1
+    try:
+        yield
+    finally:
+        upload_stats.active -= 1
+        _slots.release()
+
+
+def _open_temp(dest_dir: str):
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".upload-", suffix=".part", dir=dest_dir)
+    return os.fdopen(fd, "wb"), tmp_path
+
+
+def _sync(out):
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+
+
+def _replace(tmp_path: str, final_path: str):
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(tmp_path, final_path)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _discard(out, tmp_path: str):
+    try:
+        out.close()
+    finally:
+        _remove(tmp_path)
+
+
+async def stream_to_temp(upload: UploadFile, dest_dir: str, file_name: str,
+                         max_bytes: int = UPLOAD_MAX_FILE_BYTES) -> dict:
+    """
+    Stream ``upload`` into a fsynced temp file in ``dest_dir``; raises 413 once it
+    exceeds ``max_bytes``. The caller must ``commit_temp`` or ``discard_temp`` it.
+    """
+    started = time.perf_counter()
+    hasher = hashlib.sha256()
+    size = 0
+    out, tmp_path = await run_blocking(_open_temp, dest_dir)
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                upload_stats.rejected_too_large += 1
+                raise HTTPException(status_code=413,
+                                    detail=f"{file_name} exceeds the upload limit of {max_bytes} bytes")
+            hasher.update(chunk)
+            await run_blocking(out.write, chunk)
+        await run_blocking(_sync, out)
+    except BaseException as e:
+        await run_blocking(_discard, out, tmp_path)
+        if not isinstance(e, HTTPException):
+            upload_stats.failed += 1
+        raise
+    finally:
+        await upload.close()
+
+    upload_stats.completed += 1
+    upload_stats.bytes_written += size
+    performance_logger.info(f"Upload {file_name}: {size} bytes in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return {"tmp_path": tmp_path, "size": size, "sha256": hasher.hexdigest()}
+
+
+async def commit_temp(tmp_path: str, final_path: str):
+    """Atomically move a completed temp file into place."""
+    await run_blocking(_replace, tmp_path, final_path)
+
+
+async def discard_temp(tmp_path: str):
+    await run_blocking(_remove, tmp_path)
+
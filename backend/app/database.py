@@ -4,10 +4,16 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .core.logging_config import db_logger as logger
+from .core.db_pool import ConnectionPool
+from .core.db_endpoints import EndpointResolver
+from .core.session_touch import SessionTouchBuffer
+from .core.sql_error_log import sql_error_log
+from .core.owner_cache import owner_kpi_cache
+from .core.session_cache import session_cache
+from .core.request_context import count_sp_call, current_request_id
 from .ai_error_tracker import track_error
+from .schemas.property import normalize_property_status
 from datetime import datetime
-from pathlib import Path
-import json
 import traceback
 
 # SQL Server connection parameters (configurable via environment variables)
@@ -52,6 +58,11 @@ else:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def _lower_status(value):
+    """Lease and payment statuses are stored lower-case (e.g. 'active', 'completed')."""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -112,61 +123,88 @@ class StoredProcedures:
                 uniq.append(s)
         return uniq
     @staticmethod
+    def _open_connection():
+        """Open a new raw connection, starting with the last known good server."""
+        global LAST_USED_SERVER
+        last_error = None
+        for server in endpoint_resolver.connect_order():
+            try:
+                conn_str = StoredProcedures._build_conn_str(server)
+                logger.debug("Connecting to SQL Server using: %s", server)
+                conn = pyodbc.connect(conn_str)
+            except Exception as ce:
+                last_error = ce
+                endpoint_resolver.mark_failure(server, ce)
+                continue
+            endpoint_resolver.mark_success(server)
+            LAST_USED_SERVER = server
+            return conn
+        raise last_error or Exception("Database connection failed")
+
+    @staticmethod
+    def _probe_server(server: str):
+        """Background health probe used by the endpoint resolver."""
+        conn = pyodbc.connect(StoredProcedures._build_conn_str(server), timeout=5)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def connection():
+        """Check out a pooled connection: ``with StoredProcedures.connection() as conn: ...``"""
+        return db_pool.connection()
+
+    @staticmethod
+    def pool_stats():
+        return db_pool.stats()
+
+    @staticmethod
     def execute_sp(sp_name, params=None):
         """
         Execute a stored procedure and return the first result set as a list of dicts.
         """
-        conn = None
-        cursor = None
+        count_sp_call()
         try:
-            # Try primary and fallback servers
-            last_error = None
-            for server in StoredProcedures._candidate_servers():
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
                 try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    logger.debug(f"Connecting to SQL Server using: {server}")
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
-                    global LAST_USED_SERVER
-                    LAST_USED_SERVER = server
-                    break
-                except Exception as ce:
-                    last_error = ce
-                    # Reduce noise: these failures are expected while trying fallbacks
-                    logger.info(f"Connection attempt failed for server '{server}'; trying next. Details: {ce}")
-                    continue
-            if cursor is None:
-                raise last_error or Exception("Database connection failed")
-
-            # Trace SP execution details
-            logger.debug(f"Executing SP {sp_name} with params: {params}")
-            logger.debug(f"Parameter count: {len(params) if params else 0}")
-            if params:
-                # Use proper parameterized queries instead of string concatenation
-                placeholders = ', '.join(['?'] * len(params))
-                sql = f"EXEC {sp_name} {placeholders}"
-                cursor.execute(sql, params)
-            else:
-                cursor.execute(f"EXEC {sp_name}")
-
-            # If there is a result set, fetch and map to dicts BEFORE any commit
-            results = None
-            if cursor.description:
-                columns = [col[0] for col in cursor.description]
-                rows = cursor.fetchall()
-                results = [dict(zip(columns, row)) for row in rows]
-
-            # consume any remaining result sets (ignore errors if none)
-            try:
-                while cursor.nextset():
-                    # Intentionally not touching results further
-                    pass
-            except Exception:
-                pass
-
-            # Commit after consuming result sets
-            conn.commit()
-            logger.debug(f"SP {sp_name} executed successfully; results: {results}")
+                    # Trace SP execution details
+                    logger.debug("Executing SP %s with %d params: %s", sp_name, len(params) if params else 0, params)
+                    if params:
+                        # Use proper parameterized queries instead of string concatenation
+                        placeholders = ', '.join(['?'] * len(params))
+                        sql = f"EXEC {sp_name} {placeholders}"
+                        cursor.execute(sql, params)
+                    else:
+                        cursor.execute(f"EXEC {sp_name}")
+
+                    # If there is a result set, fetch and map to dicts BEFORE any commit
+                    results = None
+                    if cursor.description:
+                        columns = [col[0] for col in cursor.description]
+                        rows = cursor.fetchall()
+                        results = [dict(zip(columns, row)) for row in rows]
+
+                    # consume any remaining result sets (ignore errors if none)
+                    try:
+                        while cursor.nextset():
+                            # Intentionally not touching results further
+                            pass
+                    except Exception:
+                        pass
+
+                    # Commit after consuming result sets
+                    conn.commit()
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+            logger.debug("SP %s returned %s rows", sp_name, len(results) if results is not None else "no")
             return results
 
         except Exception as e:
@@ -201,51 +239,22 @@ class StoredProcedures:
             except Exception:
                 pass
             raise
-        finally:
-            try:
-                if cursor is not None:
-                    cursor.close()
-            except Exception:
-                pass
-            try:
-                if conn is not None:
-                    conn.close()
-            except Exception:
-                pass
 
     @staticmethod
     def _log_sql_error(error: Exception, sp_name: str, params):
-        """Write SQL errors to a dedicated JSONL-like log file for quick triage."""
+        """Record a SQL error in the in-memory ring buffer (persisted asynchronously as JSONL)."""
         try:
-            log_path = Path(os.getcwd()) / "sql_error_log.json"
-            entry = {
+            sql_error_log.record({
                 "timestamp": datetime.utcnow().isoformat() + "Z",
+                "request_id": current_request_id(),
                 "stored_procedure": sp_name,
                 "params": params,
                 "error_type": type(error).__name__,
                 "error_message": str(error),
                 "error_args": getattr(error, 'args', None),
                 "server": LAST_USED_SERVER,
-                "traceback": traceback.format_exc(),
-            }
-
-            # Read-existing or init
-            if log_path.exists():
-                try:
-                    with open(log_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                except Exception:
-                    data = {"errors": []}
-            else:
-                data = {"errors": []}
-
-            data.setdefault("errors", []).append(entry)
-            # Keep last 200 entries
-            if len(data["errors"]) > 200:
-                data["errors"] = data["errors"][-200:]
-
-            with open(log_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+                "traceback": "".join(traceback.format_exception(type(error), error, error.__traceback__)),
+            })
         except Exception as e:
                 logger.error(f"_log_sql_error failed: {e}")
 
@@ -261,7 +270,7 @@ class StoredProcedures:
         try:
             last_error = None
             used = None
-            for server in StoredProcedures._candidate_servers():
+            for server in endpoint_resolver.connect_order():
                 try:
                     conn_str = StoredProcedures._build_conn_str(server)
                     conn = pyodbc.connect(conn_str, timeout=5)
@@ -271,9 +280,11 @@ class StoredProcedures:
                     info["status"] = "ok"
                     info["version"] = row.version if row else "unknown"
                     used = server
+                    endpoint_resolver.mark_success(server)
                     break
                 except Exception as ce:
                     last_error = ce
+                    endpoint_resolver.mark_failure(server, ce)
                     continue
             if used:
                 info["effective_server"] = used
@@ -304,18 +315,20 @@ class StoredProcedures:
                 conn.close()
             except Exception:
                 pass
+        info["pool"] = db_pool.stats()
+        info["endpoints"] = endpoint_resolver.state()
         return info
 
     # User Management
     @staticmethod
     def create_user(email, username, hashed_password, full_name, role):
         try:
-            logger.info(f"Executing sp_CreateUser with params: email={email}, username={username}, role={role}")
+            logger.debug("Executing sp_CreateUser for username=%s role=%s", username, role)
             result = StoredProcedures.execute_sp(
                 "sp_CreateUser",
                 [email, username, hashed_password, full_name, role]
             )
-            logger.info(f"sp_CreateUser result: {result}")
+            logger.info("sp_CreateUser created user_id=%s", result[0].get('UserId') if result else None)
             return result
         except Exception as e:
             logger.error(f"Error creating user: {e}")
@@ -324,80 +337,91 @@ class StoredProcedures:
     # Session Management (direct SQL for simplicity)
     @staticmethod
     def create_session(session_id: str, user_id: int):
-        conn = None
         try:
-            # Use the same connection routine
-            for server in StoredProcedures._candidate_servers():
-                try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "INSERT INTO sessions (session_id, user_id, created_at, expires_at, last_seen) VALUES (?, ?, GETDATE(), DATEADD(MINUTE, 30, GETDATE()), GETDATE())",
-                        (session_id, user_id)
-                    )
-                    conn.commit()
-                    return True
-                except Exception:
-                    continue
-            raise Exception("Failed to create session")
-        finally:
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO sessions (session_id, user_id, created_at, expires_at, last_seen) VALUES (?, ?, GETDATE(), DATEADD(MINUTE, 30, GETDATE()), GETDATE())",
+                    (session_id, user_id)
+                )
+                conn.commit()
+                cursor.close()
+                return True
+        except Exception as e:
+            raise Exception("Failed to create session") from e
 
     @staticmethod
     def revoke_session(session_id: str):
-        conn = None
+        session_touches.discard(session_id)
         try:
-            for server in StoredProcedures._candidate_servers():
-                try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "UPDATE sessions SET revoked_at = GETDATE(), last_seen = GETDATE() WHERE session_id = ?",
-                        (session_id,)
-                    )
-                    conn.commit()
-                    return True
-                except Exception:
-                    continue
-            raise Exception("Failed to revoke session")
-        finally:
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE sessions SET revoked_at = GETDATE(), last_seen = GETDATE() WHERE session_id = ?",
+                    (session_id,)
+                )
+                conn.commit()
+                cursor.close()
+            # After the commit, so no verify that starts later reads the row as active; the
+            # revoked marker stops verifies already past their read from caching it as active
+            session_cache.invalidate(session_id)
+            return True
+        except Exception as e:
+            raise Exception("Failed to revoke session") from e
 
     @staticmethod
     def touch_session(session_id: str):
-        """Update last_seen and extend expiry on activity (sliding window)."""
-        conn = None
+        """Record activity for a session; last_seen/expires_at are written behind in batches."""
         try:
-            for server in StoredProcedures._candidate_servers():
-                try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
+            session_touches.record(session_id)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def touch_sessions(ages: dict):
+        """Set-based sliding-expiry update for many sessions at once.
+
+        ``ages`` maps session_id -> seconds elapsed since that session's last touch, so
+        last_seen is reconstructed against the DB server clock.
+        """
+        items = list(ages.items())
+        updated = 0
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                # Stay well under SQL Server's 2100 parameter limit (2 params per row)
+                for i in range(0, len(items), 900):
+                    chunk = items[i:i + 900]
+                    values = ", ".join(["(?, ?)"] * len(chunk))
+                    params = []
+                    for sid, age in chunk:
+                        params.extend([sid, int(age)])
                     cursor.execute(
-                        "UPDATE sessions SET last_seen = GETDATE(), expires_at = DATEADD(MINUTE, 30, GETDATE()) WHERE session_id = ? AND revoked_at IS NULL",
-                        (session_id,)
+                        "UPDATE s SET last_seen = DATEADD(SECOND, -v.age, GETDATE()), "
+                        "expires_at = DATEADD(MINUTE, 30, DATEADD(SECOND, -v.age, GETDATE())) "
+                        f"FROM sessions s JOIN (VALUES {values}) AS v(session_id, age) "
+                        "ON s.session_id = v.session_id WHERE s.revoked_at IS NULL",
+                        params
                     )
-                    conn.commit()
-                    return True
+                    updated += max(cursor.rowcount, 0)
+                conn.commit()
+            finally:
+                try:
+                    cursor.close()
                 except Exception:
-                    continue
-            return False
-        finally:
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
+                    pass
+        return updated
+
+    @staticmethod
+    def get_session(session_id: str):
+        """Return (revoked_at, expires_at) for a session, or None if it does not exist."""
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT revoked_at, expires_at FROM sessions WHERE session_id = ?", (session_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            return (row[0], row[1]) if row is not None else None
 
     @staticmethod
     def update_user(user_id, email, username, full_name, role):
@@ -422,8 +446,9 @@ class StoredProcedures:
     @staticmethod
     def create_property(owner_id, title, address, property_type, bedrooms,
                        bathrooms, area, rent_amount, deposit_amount, description, status):
+        status = normalize_property_status(status)
         try:
-            return StoredProcedures.execute_sp(
+            result = StoredProcedures.execute_sp(
                 "sp_CreateProperty",
                 [owner_id, title, address, property_type, bedrooms,
                  bathrooms, area, rent_amount, deposit_amount, description, status]
@@ -435,15 +460,19 @@ class StoredProcedures:
                 "does not exist" in msg or 
                 "too many arguments specified" in msg):
                 # Fallback to direct insert
-                return StoredProcedures._direct_insert_property(owner_id, title, address, property_type, bedrooms,
-                                                                bathrooms, area, rent_amount, deposit_amount, description, status)
-            raise
+                result = StoredProcedures._direct_insert_property(owner_id, title, address, property_type, bedrooms,
+                                                                  bathrooms, area, rent_amount, deposit_amount, description, status)
+            else:
+                raise
+        StoredProcedures.invalidate_owner_kpis(owner_id=owner_id)
+        return result
 
     @staticmethod
     def update_property(property_id, title, address, property_type, bedrooms,
                        bathrooms, area, rent_amount, deposit_amount, description, status):
+        status = normalize_property_status(status)
         try:
-            return StoredProcedures.execute_sp(
+            result = StoredProcedures.execute_sp(
                 "sp_UpdateProperty",
                 [property_id, title, address, property_type, bedrooms,
                  bathrooms, area, rent_amount, deposit_amount, description, status]
@@ -453,171 +482,156 @@ class StoredProcedures:
             if ("could not find stored procedure" in msg or 
                 "does not exist" in msg or 
                 "too many arguments specified" in msg):
-                return StoredProcedures._direct_update_property(property_id, title, address, property_type, bedrooms,
-                                                                bathrooms, area, rent_amount, deposit_amount, description, status)
-            raise
+                result = StoredProcedures._direct_update_property(property_id, title, address, property_type, bedrooms,
+                                                                  bathrooms, area, rent_amount, deposit_amount, description, status)
+            else:
+                raise
+        StoredProcedures.invalidate_owner_kpis(property_id=property_id)
+        return result
 
     @staticmethod
     def delete_property(property_id):
+        # The property row is gone after the delete, so resolve its owner first
+        owner_ids = StoredProcedures.kpi_owners(property_id=property_id)
         try:
-            return StoredProcedures.execute_sp("sp_DeleteProperty", [property_id])
+            result = StoredProcedures.execute_sp("sp_DeleteProperty", [property_id])
         except Exception as e:
             msg = str(e).lower()
             if "could not find stored procedure" in msg or "does not exist" in msg:
-                return StoredProcedures._direct_delete_property(property_id)
-            raise
+                result = StoredProcedures._direct_delete_property(property_id)
+            else:
+                raise
+        StoredProcedures.invalidate_owner_kpis(owner_ids=owner_ids)
+        StoredProcedures.drop_kpi_rollup_property(property_id)
+        return result
+
+    @staticmethod
+    def list_owner_properties_page(owner_id: int, offset: int = 0, limit: int = 25):
+        """Return (rows, total) for one page of the owner's properties, projected
+        to the summary columns. Paging and counting happen in SQL."""
+        rows = StoredProcedures.execute_sp("sp_ListOwnerPropertiesPage", [owner_id, offset, limit]) or []
+        if rows:
+            total = int(rows[0].get('total_count') or 0)
+        elif offset > 0:
+            _, total = StoredProcedures.list_owner_properties_page(owner_id, 0, 1)
+        else:
+            total = 0
+        for row in rows:
+            row.pop('total_count', None)
+        return rows, total
 
     @staticmethod
     def _direct_insert_property(owner_id, title, address, property_type, bedrooms,
                                 bathrooms, area, rent_amount, deposit_amount, description, status):
         """Fallback insert into properties when SP is missing."""
-        conn = None
-        try:
-            # Connect using same candidate servers
-            last_error = None
-            for server in StoredProcedures._candidate_servers():
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                # First check if deposit_amount column exists
                 try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
-                    break
-                except Exception as ce:
-                    last_error = ce
-                    continue
-            if conn is None:
-                raise last_error or Exception("Database connection failed")
+                    cursor.execute("SELECT COL_LENGTH('properties', 'deposit_amount')")
+                    has_deposit_col = cursor.fetchone()[0] is not None
+                except Exception:
+                    has_deposit_col = False
 
-            # First check if deposit_amount column exists
-            try:
-                cursor.execute("SELECT COL_LENGTH('properties', 'deposit_amount')")
-                has_deposit_col = cursor.fetchone()[0] is not None
-            except Exception:
-                has_deposit_col = False
+                if has_deposit_col:
+                    sql = (
+                        "INSERT INTO properties (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, deposit_amount, description, status, created_at) "
+                        "OUTPUT Inserted.id as PropertyId "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE())"
+                    )
+                    cursor.execute(sql, (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, deposit_amount, description, status))
+                else:
+                    # Fallback without deposit_amount column
+                    sql = (
+                        "INSERT INTO properties (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, description, status, created_at) "
+                        "OUTPUT Inserted.id as PropertyId "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE())"
+                    )
+                    cursor.execute(sql, (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, description, status))
 
-            if has_deposit_col:
-                sql = (
-                    "INSERT INTO properties (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, deposit_amount, description, status, created_at) "
-                    "OUTPUT Inserted.id as PropertyId "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE())"
-                )
-                cursor.execute(sql, (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, deposit_amount, description, status))
-            else:
-                # Fallback without deposit_amount column
-                sql = (
-                    "INSERT INTO properties (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, description, status, created_at) "
-                    "OUTPUT Inserted.id as PropertyId "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE())"
-                )
-                cursor.execute(sql, (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount, description, status))
-            
-            row = cursor.fetchone()
-            conn.commit()
-            return [{"PropertyId": row.PropertyId if row else None}]
-        finally:
-            try:
-                cursor.close()
-            except Exception:
-                pass
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
+                row = cursor.fetchone()
+                conn.commit()
+                return [{"PropertyId": row.PropertyId if row else None}]
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
 
     @staticmethod
     def _direct_update_property(property_id, title, address, property_type, bedrooms,
                                 bathrooms, area, rent_amount, deposit_amount, description, status):
-        conn = None
-        try:
-            for server in StoredProcedures._candidate_servers():
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                # Check if deposit_amount column exists
                 try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
-                    break
+                    cursor.execute("SELECT COL_LENGTH('properties', 'deposit_amount')")
+                    has_deposit_col = cursor.fetchone()[0] is not None
                 except Exception:
-                    continue
-            if conn is None:
-                raise Exception("Database connection failed")
-            
-            # Check if deposit_amount column exists
-            try:
-                cursor.execute("SELECT COL_LENGTH('properties', 'deposit_amount')")
-                has_deposit_col = cursor.fetchone()[0] is not None
-            except Exception:
-                has_deposit_col = False
+                    has_deposit_col = False
 
-            if has_deposit_col:
-                sql = (
-                    "UPDATE properties SET title=?, address=?, property_type=?, bedrooms=?, bathrooms=?, area=?, rent_amount=?, deposit_amount=?, description=?, status=?, updated_at=GETDATE() WHERE id=?"
-                )
-                cursor.execute(sql, (title, address, property_type, bedrooms, bathrooms, area, rent_amount, deposit_amount, description, status, property_id))
-            else:
-                # Fallback without deposit_amount column
-                sql = (
-                    "UPDATE properties SET title=?, address=?, property_type=?, bedrooms=?, bathrooms=?, area=?, rent_amount=?, description=?, status=?, updated_at=GETDATE() WHERE id=?"
-                )
-                cursor.execute(sql, (title, address, property_type, bedrooms, bathrooms, area, rent_amount, description, status, property_id))
-            
-            affected = cursor.rowcount
-            conn.commit()
-            return [{"AffectedRows": affected}]
-        finally:
-            try:
-                cursor.close()
-            except Exception:
-                pass
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
+                if has_deposit_col:
+                    sql = (
+                        "UPDATE properties SET title=?, address=?, property_type=?, bedrooms=?, bathrooms=?, area=?, rent_amount=?, deposit_amount=?, description=?, status=?, updated_at=GETDATE() WHERE id=?"
+                    )
+                    cursor.execute(sql, (title, address, property_type, bedrooms, bathrooms, area, rent_amount, deposit_amount, description, status, property_id))
+                else:
+                    # Fallback without deposit_amount column
+                    sql = (
+                        "UPDATE properties SET title=?, address=?, property_type=?, bedrooms=?, bathrooms=?, area=?, rent_amount=?, description=?, status=?, updated_at=GETDATE() WHERE id=?"
+                    )
+                    cursor.execute(sql, (title, address, property_type, bedrooms, bathrooms, area, rent_amount, description, status, property_id))
+
+                affected = cursor.rowcount
+                conn.commit()
+                return [{"AffectedRows": affected}]
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
 
     @staticmethod
     def _direct_delete_property(property_id):
-        conn = None
-        try:
-            for server in StoredProcedures._candidate_servers():
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("UPDATE properties SET status='deleted', updated_at=GETDATE() WHERE id=?", (property_id,))
+                affected = cursor.rowcount
+                conn.commit()
+                return [{"AffectedRows": affected}]
+            finally:
                 try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
-                    break
+                    cursor.close()
                 except Exception:
-                    continue
-            if conn is None:
-                raise Exception("Database connection failed")
-            cursor.execute("UPDATE properties SET status='deleted', updated_at=GETDATE() WHERE id=?", (property_id,))
-            affected = cursor.rowcount
-            conn.commit()
-            return [{"AffectedRows": affected}]
-        finally:
-            try:
-                cursor.close()
-            except Exception:
-                pass
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
+                    pass
 
     # Payment Management
     @staticmethod
     def create_payment(property_id, tenant_id, amount, payment_type,
                       payment_method, payment_status, payment_date):
-        return StoredProcedures.execute_sp(
+        payment_status = _lower_status(payment_status)
+        result = StoredProcedures.execute_sp(
             "sp_CreatePayment",
             [property_id, tenant_id, amount, payment_type,
              payment_method, payment_status, payment_date]
         )
+        StoredProcedures.invalidate_owner_kpis(property_id=property_id)
+        StoredProcedures.refresh_kpi_rollup(property_id, payment_date)
+        return result
 
     @staticmethod
     def update_payment_status(payment_id, payment_status):
-        return StoredProcedures.execute_sp(
+        payment_status = _lower_status(payment_status)
+        result = StoredProcedures.execute_sp(
             "sp_UpdatePaymentStatus",
             [payment_id, payment_status]
         )
+        StoredProcedures.invalidate_owner_kpis(payment_id=payment_id)
+        StoredProcedures.refresh_kpi_rollup_for(payment_id=payment_id)
+        return result
 
     # Utility Management
     @staticmethod
@@ -644,13 +658,6 @@ class StoredProcedures:
             [owner_id, start_date, end_date]
         )
 
-    @staticmethod
-    def get_payment_report(owner_id=None, start_date=None, end_date=None):
-        return StoredProcedures.execute_sp(
-            "sp_GetPaymentReport",
-            [owner_id, start_date, end_date]
-        )
-
     @staticmethod
     def get_utility_consumption_report(property_id=None, utility_type=None,
                                      start_date=None, end_date=None):
@@ -704,10 +711,12 @@ class StoredProcedures:
 
     # Property documents
     @staticmethod
-    def add_property_document(property_id, file_name, file_path, content_type=None):
+    def add_property_document(property_id, file_name, file_path, content_type=None,
+                              blob_sha256=None, storage_path=None, size_bytes=None):
+        """Add a document row; with ``blob_sha256`` it also takes a reference on the stored blob."""
         return StoredProcedures.execute_sp(
             "sp_AddPropertyDocument",
-            [property_id, file_name, file_path, content_type]
+            [property_id, file_name, file_path, content_type, blob_sha256, storage_path, size_bytes]
         )
 
     @staticmethod
@@ -724,11 +733,27 @@ class StoredProcedures:
             [document_id]
         )
 
+    @staticmethod
+    def collect_document_blobs(grace_minutes=1440, dry_run=False):
+        """Reconcile blob ref counts and remove (or with dry_run, list) blobs unreferenced for grace_minutes."""
+        return StoredProcedures.execute_sp(
+            "sp_CollectDocumentBlobs",
+            [grace_minutes, 1 if dry_run else 0]
+        ) or []
+
+    @staticmethod
+    def document_blob_exists(sha256):
+        rows = StoredProcedures.execute_query(
+            "SELECT 1 AS present FROM dbo.document_blobs WHERE sha256 = ?", [sha256]
+        )
+        return bool(rows)
+
     # Leases
     @staticmethod
     def create_lease(tenant_id, unit_id, start_date, end_date, rent_amount, deposit_amount, status="active"):
+        status = _lower_status(status)
         try:
-            return StoredProcedures.execute_sp(
+            result = StoredProcedures.execute_sp(
                 "sp_CreateLease",
                 [tenant_id, unit_id, start_date, end_date, rent_amount, deposit_amount, status]
             )
@@ -742,8 +767,12 @@ class StoredProcedures:
                     "VALUES (?, ?, ?, ?, ?, ?, ?, GETDATE())"
                 )
                 result = StoredProcedures.execute_query(query, [tenant_id, unit_id, start_date, end_date, rent_amount, deposit_amount, status])
-                return [{"LeaseId": result[0]["LeaseId"]}] if result else None
-            raise
+                result = [{"LeaseId": result[0]["LeaseId"]}] if result else None
+            else:
+                raise
+        StoredProcedures.invalidate_owner_kpis(property_id=unit_id)
+        StoredProcedures.refresh_kpi_rollup(unit_id)
+        return result
 
     @staticmethod
     def get_lease(lease_id):
@@ -751,10 +780,14 @@ class StoredProcedures:
 
     @staticmethod
     def update_lease(lease_id, start_date=None, end_date=None, rent_amount=None, deposit_amount=None, status=None):
-        return StoredProcedures.execute_sp(
+        status = _lower_status(status)
+        result = StoredProcedures.execute_sp(
             "sp_UpdateLease",
             [lease_id, start_date, end_date, rent_amount, deposit_amount, status]
         )
+        StoredProcedures.invalidate_owner_kpis(lease_id=lease_id)
+        StoredProcedures.refresh_kpi_rollup_for(lease_id=lease_id)
+        return result
 
     @staticmethod
     def list_leases(tenant_id=None, unit_id=None):
@@ -763,6 +796,265 @@ class StoredProcedures:
             [tenant_id, unit_id]
         )
 
+    # Keyset pages: rows ordered by (created_at DESC, id DESC); pass limit + 1 to
+    # detect a following page and the last row's (created_at, id) as the cursor.
+    @staticmethod
+    def list_properties_page(owner_id: int, limit: int, after_key=None, after_id=None):
+        return StoredProcedures.execute_sp(
+            "sp_ListPropertiesPage", [owner_id, limit, after_key, after_id]
+        ) or []
+
+    @staticmethod
+    def list_payments_page(owner_id=None, tenant_id=None, limit: int = 50, after_key=None, after_id=None):
+        return StoredProcedures.execute_sp(
+            "sp_ListPaymentsPage", [owner_id, tenant_id, limit, after_key, after_id]
+        ) or []
+
+    @staticmethod
+    def list_leases_page(tenant_id=None, unit_id=None, limit: int = 50, after_key=None, after_id=None):
+        return StoredProcedures.execute_sp(
+            "sp_ListLeasesPage", [tenant_id, unit_id, limit, after_key, after_id]
+        ) or []
+
+    # Owner dashboard KPIs
+    _OWNER_OF = {
+        "property": "SELECT owner_id FROM properties WHERE id = ?",
+        "lease": "SELECT p.owner_id FROM leases l INNER JOIN properties p ON p.id = l.unit_id WHERE l.id = ?",
+        "payment": "SELECT p.owner_id FROM payments pay INNER JOIN properties p ON p.id = pay.property_id WHERE pay.id = ?",
+        "invitation": "SELECT owner_id FROM lease_invitations WHERE id = ?",
+    }
+
+    @staticmethod
+    def kpi_owners(property_id=None, lease_id=None, payment_id=None, invitation_id=None):
+        """Owner ids whose KPIs a write to this row affects, or None if they can't be resolved."""
+        for kind, row_id in (("property", property_id), ("lease", lease_id),
+                             ("payment", payment_id), ("invitation", invitation_id)):
+            if row_id is None:
+                continue
+            try:
+                rows = StoredProcedures.execute_query(StoredProcedures._OWNER_OF[kind], [row_id])
+            except Exception as e:
+                logger.warning(f"Could not resolve owner of {kind} {row_id} for KPI invalidation: {e}")
+                return None
+            return [row.get('owner_id') for row in rows or []]
+        return []
+
+    @staticmethod
+    def invalidate_owner_kpis(owner_id=None, property_id=None, lease_id=None, payment_id=None, invitation_id=None,
+                              owner_ids=None):
+        """Drop cached KPIs for the owner affected by a write.
+
+        Call after the write has committed. A read that started earlier holds an
+        older generation, so its result is not stored; reads that start later see
+        the new rows. Deletes resolve the owner with kpi_owners() before the row
+        disappears and pass ``owner_ids``. If the owner can't be resolved the
+        whole cache is cleared rather than risk serving stale KPIs.
+        """
+        if owner_id is not None:
+            owner_ids = [owner_id]
+        elif owner_ids is None:
+            owner_ids = StoredProcedures.kpi_owners(property_id, lease_id, payment_id, invitation_id)
+        if owner_ids is None:
+            owner_kpi_cache.clear()
+            return
+        for oid in owner_ids:
+            owner_kpi_cache.invalidate(oid)
+
+    @staticmethod
+    def get_owner_kpis(owner_id: int) -> dict:
+        """All owner dashboard aggregates in a single round-trip."""
+        try:
+            rows = StoredProcedures.execute_sp("sp_GetOwnerKpis", [owner_id])
+        except Exception as e:
+            msg = str(e).lower()
+            if ("could not find stored procedure" in msg) or ("does not exist" in msg):
+                today = datetime.now().date()
+                month_start = today.replace(day=1)
+                next_month = (month_start.replace(year=month_start.year + 1, month=1)
+                              if month_start.month == 12 else month_start.replace(month=month_start.month + 1))
+                query = (
+                    "SELECT pr.total_properties, pr.available_properties, pr.occupied_properties, "
+                    "ls.active_tenants, ls.monthly_revenue, "
+                    "pm.pending_amount, pm.collected_this_month, pm.billed_this_month "
+                    "FROM (SELECT COUNT(*) AS total_properties, "
+                    "SUM(CASE WHEN p.status IN ('Available', 'vacant') THEN 1 ELSE 0 END) AS available_properties, "
+                    "SUM(CASE WHEN p.status IN ('Occupied', 'rented') THEN 1 ELSE 0 END) AS occupied_properties "
+                    "FROM properties p WHERE p.owner_id = ?) pr "
+                    "CROSS JOIN (SELECT COUNT(DISTINCT l.tenant_id) AS active_tenants, "
+                    "COALESCE(SUM(l.rent_amount), 0) AS monthly_revenue "
+                    "FROM leases l INNER JOIN properties p ON p.id = l.unit_id "
+                    "WHERE p.owner_id = ? AND l.status = 'active' "
+                    "AND (l.end_date IS NULL OR l.end_date > GETDATE())) ls "
+                    "CROSS JOIN (SELECT "
+                    "COALESCE(SUM(CASE WHEN pay.payment_status IN ('pending', 'failed') THEN pay.amount ELSE 0 END), 0) AS pending_amount, "
+                    "COALESCE(SUM(CASE WHEN pay.payment_date >= ? AND pay.payment_date < ? "
+                    "AND pay.payment_status = 'completed' THEN pay.amount ELSE 0 END), 0) AS collected_this_month, "
+                    "COALESCE(SUM(CASE WHEN pay.payment_date >= ? AND pay.payment_date < ? "
+                    "THEN pay.amount ELSE 0 END), 0) AS billed_this_month "
+                    "FROM payments pay INNER JOIN properties p ON p.id = pay.property_id "
+                    "WHERE p.owner_id = ?) pm"
+                )
+                rows = StoredProcedures.execute_query(
+                    query, [owner_id, owner_id, month_start, next_month, month_start, next_month, owner_id]
+                )
+            else:
+                raise
+        return rows[0] if rows else {}
+
+    # Monthly KPI rollup (kpi_monthly_rollup). Cells are recomputed after each
+    # payment/lease write; failures only log, since rebuild_kpi_rollup() reconciles.
+    _kpi_rollup_available = True
+
+    @staticmethod
+    def refresh_kpi_rollup(property_id, month=None):
+        """Recompute the (property, month) rollup cell; month defaults to the current month."""
+        if not StoredProcedures._kpi_rollup_available or property_id is None:
+            return
+        if isinstance(month, str):
+            try:
+                month = datetime.fromisoformat(month)
+            except ValueError:
+                month = None
+        month = month or datetime.now()
+        try:
+            StoredProcedures.execute_sp("sp_RefreshKpiRollup", [property_id, month.replace(day=1)])
+        except Exception as e:
+            msg = str(e).lower()
+            if ("could not find stored procedure" in msg) or ("does not exist" in msg):
+                # Rollup not installed in this database; stop trying until a rebuild succeeds
+                StoredProcedures._kpi_rollup_available = False
+            logger.warning(f"KPI rollup refresh failed for property {property_id}: {e}")
+
+    @staticmethod
+    def refresh_kpi_rollup_for(payment_id=None, lease_id=None, invitation_id=None):
+        """Refresh the rollup cell touched by a payment (its month) or a lease/invitation (current month)."""
+        if not StoredProcedures._kpi_rollup_available:
+            return
+        try:
+            if payment_id is not None:
+                rows = StoredProcedures.execute_query(
+                    "SELECT property_id, COALESCE(payment_date, created_at) AS report_date FROM payments WHERE id = ?",
+                    [payment_id]
+                )
+                for row in rows or []:
+                    StoredProcedures.refresh_kpi_rollup(row['property_id'], row.get('report_date'))
+            if lease_id is not None:
+                rows = StoredProcedures.execute_query("SELECT unit_id FROM leases WHERE id = ?", [lease_id])
+                for row in rows or []:
+                    StoredProcedures.refresh_kpi_rollup(row['unit_id'])
+            if invitation_id is not None:
+                rows = StoredProcedures.execute_query(
+                    "SELECT property_id FROM lease_invitations WHERE id = ?", [invitation_id]
+                )
+                for row in rows or []:
+                    StoredProcedures.refresh_kpi_rollup(row['property_id'])
+        except Exception as e:
+            logger.warning(f"KPI rollup refresh lookup failed (payment={payment_id}, lease={lease_id}, "
+                           f"invitation={invitation_id}): {e}")
+
+    @staticmethod
+    def drop_kpi_rollup_property(property_id):
+        if not StoredProcedures._kpi_rollup_available:
+            return
+        try:
+            StoredProcedures.execute_query("DELETE FROM kpi_monthly_rollup WHERE property_id = ?", [property_id])
+        except Exception as e:
+            logger.warning(f"KPI rollup cleanup failed for property {property_id}: {e}")
+
+    @staticmethod
+    def rebuild_kpi_rollup(owner_id=None) -> int:
+        """Recompute the rollup from payments and leases (all owners, or one)."""
+        result = StoredProcedures.execute_sp("sp_RebuildKpiRollup", [owner_id])
+        StoredProcedures._kpi_rollup_available = True
+        owner_kpi_cache.clear()
+        return int(result[0]['RollupRows']) if result else 0
+
+    @staticmethod
+    def get_kpi_rollup(owner_id=None, start_month=None, end_month=None):
+        """Per-month totals (collected/pending/failed amounts and counts, active lease rent)."""
+        try:
+            return StoredProcedures.execute_sp("sp_GetKpiRollup", [owner_id, start_month, end_month]) or []
+        except Exception as e:
+            msg = str(e).lower()
+            if not (("could not find stored procedure" in msg) or ("does not exist" in msg)):
+                raise
+        # Rollup not installed: aggregate payments directly (same shape, full scan).
+        # Like the rollup, payments without a payment_date count in the month they were recorded.
+        report_date = "CAST(COALESCE(pay.payment_date, pay.created_at) AS DATE)"
+        clauses, params = [], []
+        if owner_id is not None:
+            clauses.append("p.owner_id = ?")
+            params.append(owner_id)
+        if start_month is not None:
+            clauses.append(f"{report_date} >= ?")
+            params.append(start_month)
+        if end_month is not None:
+            clauses.append(f"{report_date} < DATEADD(MONTH, 1, ?)")
+            params.append(end_month)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        query = (
+            f"SELECT DATEFROMPARTS(YEAR({report_date}), MONTH({report_date}), 1) AS month_start, "
+            "COALESCE(SUM(CASE WHEN pay.payment_status = 'completed' THEN pay.amount END), 0) AS collected_amount, "
+            "COALESCE(SUM(CASE WHEN pay.payment_status = 'pending' THEN pay.amount END), 0) AS pending_amount, "
+            "COALESCE(SUM(CASE WHEN pay.payment_status = 'failed' THEN pay.amount END), 0) AS failed_amount, "
+            "COUNT(*) AS payment_count, "
+            "SUM(CASE WHEN pay.payment_status = 'completed' THEN 1 ELSE 0 END) AS completed_count, "
+            "SUM(CASE WHEN pay.payment_status = 'pending' THEN 1 ELSE 0 END) AS pending_count, "
+            "SUM(CASE WHEN pay.payment_status = 'failed' THEN 1 ELSE 0 END) AS failed_count, "
+            "0 AS active_lease_rent, 0 AS active_leases "
+            "FROM payments pay INNER JOIN properties p ON p.id = pay.property_id "
+            f"{where}"
+            f"GROUP BY DATEFROMPARTS(YEAR({report_date}), MONTH({report_date}), 1) "
+            "ORDER BY month_start"
+        )
+        return StoredProcedures.execute_query(query, params) or []
+
+    @staticmethod
+    def get_payment_report(owner_id=None, start_date=None, end_date=None):
+        """Payment report for an exact, inclusive date range: (per-month totals, mix fields).
+
+        Whole months come from the rollup and only the partial first/last months
+        are aggregated from payments, so the cost is O(months). The mix fields are
+        the non-additive ones (distinct properties/tenants, most common type).
+        """
+        params = [owner_id, start_date, end_date]
+        months = StoredProcedures.execute_sp("sp_GetPaymentReportMonths", params) or []
+        mix = StoredProcedures.execute_sp("sp_GetPaymentReportMix", params) if months else None
+        return months, (mix[0] if mix else {})
+
+    # Sort keys accepted by list_owner_leases (sp_ListOwnerLeases orders by the same columns)
+    OWNER_LEASE_SORTS = {
+        "start_date": "l.start_date",
+        "end_date": "l.end_date",
+        "rent_amount": "l.rent_amount",
+        "status": "l.status",
+        "created_at": "l.created_at",
+        "property_title": "p.title",
+        "tenant_name": "u.full_name",
+    }
+
+    @staticmethod
+    def list_owner_leases(owner_id: int, offset: int = 0, limit: int = None,
+                          sort_by: str = "start_date", sort_dir: str = "desc"):
+        """Return (rows, total) for all leases on the owner's properties, with
+        property title and tenant name/email joined in a single query."""
+        if sort_by not in StoredProcedures.OWNER_LEASE_SORTS:
+            raise ValueError(f"Unsupported sort key: {sort_by}")
+        sort_dir = "asc" if str(sort_dir).lower() == "asc" else "desc"
+        rows = StoredProcedures.execute_sp(
+            "sp_ListOwnerLeases", [owner_id, offset, limit, sort_by, sort_dir]
+        ) or []
+        if rows:
+            total = int(rows[0].get('total_count') or 0)
+        elif offset > 0:
+            # Page past the end: ask for the first row just to learn the total
+            _, total = StoredProcedures.list_owner_leases(owner_id, 0, 1, sort_by, sort_dir)
+        else:
+            total = 0
+        for row in rows:
+            row.pop('total_count', None)
+        return rows, total
+
     @staticmethod
     def get_active_lease_by_property(property_id: int):
         """Return active lease rows for a property. Falls back to direct SQL if SP is missing."""
@@ -817,45 +1109,33 @@ class StoredProcedures:
         """
         Execute a raw SQL query and return the result.
         """
-        conn = None
-        cursor = None
         try:
-            # Try primary and fallback servers
-            last_error = None
-            for server in StoredProcedures._candidate_servers():
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
                 try:
-                    conn_str = StoredProcedures._build_conn_str(server)
-                    logger.debug(f"Connecting to SQL Server using: {server}")
-                    conn = pyodbc.connect(conn_str)
-                    cursor = conn.cursor()
-                    global LAST_USED_SERVER
-                    LAST_USED_SERVER = server
-                    break
-                except Exception as ce:
-                    last_error = ce
-                    logger.warning(f"Connection attempt failed for server '{server}': {ce}")
-                    continue
-            if cursor is None:
-                raise last_error or Exception("Database connection failed")
+                    # Execute the query
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+
+                    upper = query.strip().upper()
+                    # For SELECT queries, fetch results BEFORE any commit to avoid invalidating cursor
+                    if upper.startswith('SELECT'):
+                        columns = [column[0] for column in cursor.description]
+                        rows = cursor.fetchall()
+                        # No commit needed for pure SELECT; return rows as list of dicts
+                        return [dict(zip(columns, row)) for row in rows]
+                    else:
+                        # Commit the transaction for UPDATE/INSERT/DDL queries and return affected rows
+                        conn.commit()
+                        return cursor.rowcount
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
 
-            # Execute the query
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            upper = query.strip().upper()
-            # For SELECT queries, fetch results BEFORE any commit to avoid invalidating cursor
-            if upper.startswith('SELECT'):
-                columns = [column[0] for column in cursor.description]
-                rows = cursor.fetchall()
-                # No commit needed for pure SELECT; return rows as list of dicts
-                return [dict(zip(columns, row)) for row in rows]
-            else:
-                # Commit the transaction for UPDATE/INSERT/DDL queries and return affected rows
-                conn.commit()
-                return cursor.rowcount
-                
         except Exception as e:
             logger.error(f"Error executing query '{query}' with params {params}: {str(e)}")
             try:
@@ -874,14 +1154,13 @@ class StoredProcedures:
             except Exception:
                 pass
             raise
-        finally:
-            try:
-                if cursor is not None:
-                    cursor.close()
-            except Exception:
-                pass
-            try:
-                if conn is not None:
-                    conn.close()
-            except Exception:
-                pass
+
+
+# Sticky server selection shared by the pool and diagnostics
+endpoint_resolver = EndpointResolver(StoredProcedures._candidate_servers, StoredProcedures._probe_server)
+
+# Shared connection pool for every direct pyodbc access in the backend
+db_pool = ConnectionPool(StoredProcedures._open_connection)
+
+# Write-behind buffer for session activity (see StoredProcedures.touch_session)
+session_touches = SessionTouchBuffer(StoredProcedures.touch_sessions)
@@ -1,46 +1,5 @@
-from backend.app.core.logging_config import get_logger, log_exception
-from fastapi import FastAPI, HTTPException, Request, APIRouter
-from fastapi.exceptions import ResponseValidationError
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import traceback
-import logging
-from datetime import datetime
-import json
-from pathlib import Path
-import os
-from .ai_error_tracker import track_error, ai_tracker
-from .database import StoredProcedures
-from .routers import auth as auth_router
-from .routers import properties as properties_router
-from .routers import payments as payments_router
-from .routers import tenants as tenants_router
-
-app = FastAPI()
-
-app_logger = get_logger('app')
-api_logger = get_logger('api')
-performance_logger = get_logger('performance')
-user_activity_logger = get_logger('user_activity')
-background_tasks_logger = get_logger('background_tasks')
-
-app_logger.info('FastAPI application starting')
-
-@app.middleware('http')
-async def log_requests(request, call_next):
-    import time
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
-    performance_logger.info(f"{request.method} {request.url.path} {response.status_code} {duration:.3f}s")
-    return response
-
-@app.exception_handler(Exception)
-async def global_exception_handler(request, exc):
-    log_exception(app_logger, f"Unhandled exception for {request.url}", exc)
-    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
-from fastapi import FastAPI, HTTPException, Request, APIRouter
+from backend.app.core.logging_config import get_logger, log_levels, set_log_level, log_pipeline, rotating_file_handler, LOG_LEVEL, LOG_LEVEL_API
+from fastapi import FastAPI, HTTPException, Request, APIRouter, Depends
 from fastapi.exceptions import ResponseValidationError
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -53,6 +12,7 @@ from pathlib import Path
 import os
 from .ai_error_tracker import track_error, ai_tracker
 from .database import StoredProcedures
+from .core.sql_error_log import sql_error_log
 from .routers import auth as auth_router
 from .routers import properties as properties_router
 from .routers import payments as payments_router
@@ -65,70 +25,59 @@ from .routers import maintenance as maintenance_router
 from .routers import logs as logs_router
 from .routers import reports as reports_router
 from .routers import lookups as lookups_router
+from .core.async_db import run_db, run_blocking, shutdown_executors
+from .core.loop_monitor import loop_monitor
+from .core.response_cache import public_cache
+from .core.uploads import upload_stats
+from .core.password_hashing import password_hasher
+from .core.rate_limit import login_limiter
+from .core.access_log import AccessLogMiddleware, TimedJSONResponse
+from .core.dependencies import get_current_user
+
+app_logger = get_logger('app')
+api_logger = get_logger('api')
+performance_logger = get_logger('performance')
+user_activity_logger = get_logger('user_activity')
+background_tasks_logger = get_logger('background_tasks')
+
+app_logger.info('FastAPI application starting')
 
 # Configure logging first
 # Create logs directory if it doesn't exist
 log_dir = Path(__file__).parent.parent.parent / 'logs'
 log_dir.mkdir(exist_ok=True)
 
-# Set up file handlers for different log files
-debug_handler = logging.FileHandler(log_dir / 'debug.log')
-python_error_handler = logging.FileHandler(log_dir / 'python_errors.log')
-console_handler = logging.StreamHandler()
-
-# Set format for logs
-log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-debug_handler.setFormatter(log_format)
-python_error_handler.setFormatter(log_format)
-console_handler.setFormatter(log_format)
-
-# Configure logging levels
+# Root-level files; written by the logging pipeline's listener thread, rotated instead of truncated
+log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
+                               defaults={'request_id': '-'})
+debug_handler = rotating_file_handler(log_dir / 'debug.log', log_format)
+python_error_handler = rotating_file_handler(log_dir / 'python_errors.log', log_format)
 debug_handler.setLevel(logging.DEBUG)
 python_error_handler.setLevel(logging.ERROR)  # Only capture errors and above
-console_handler.setLevel(logging.INFO)
+log_pipeline.add_handler(debug_handler)
+log_pipeline.add_handler(python_error_handler)
 
-# Configure root logger
-logging.basicConfig(
-    level=logging.DEBUG,
-    handlers=[debug_handler, python_error_handler, console_handler]
-)
+# Root logger level; its only handler is the pipeline's queue handler
+logging.getLogger().setLevel(LOG_LEVEL)
 
 logger = logging.getLogger(__name__)
 
-# Function to clear all logs
+# Reset the AI and SQL error stores on startup; text logs rotate instead of being cleared
 def clear_logs():
-    # Clear error tracking files (JSON)
-    error_files = ['ai_error_log.json', 'sql_error_log.json']
-    root_dir = Path(__file__).parent.parent.parent
-    
-    # Clear JSON error logs
-    for file_name in error_files:
-        file_path = root_dir / file_name
-        if file_path.exists():
-            try:
-                empty_log = {"errors": []}
-                with open(file_path, 'w') as f:
-                    json.dump(empty_log, f, indent=2)
-                logger.info(f"Cleared error log file: {file_name}")
-            except Exception as e:
-                logger.error(f"Failed to clear error log {file_name}: {e}")
-    
-    # Clear text log files
-    log_files = ['debug.log', 'python_errors.log']
-    for file_name in log_files:
-        file_path = log_dir / file_name
-        try:
-            # Create or clear the file
-            with open(file_path, 'w') as f:
-                f.write(f"Log file cleared at {datetime.now().isoformat()}\n")
-            logger.info(f"Cleared log file: {file_name}")
-        except Exception as e:
-            logger.error(f"Failed to clear log {file_name}: {e}")
+    # AI error log segments, index and counters
+    try:
+        ai_tracker.clear()
+        logger.info("Cleared AI error log segments")
+    except Exception as e:
+        logger.error(f"Failed to clear AI error log: {e}")
+
+    # Clear SQL error ring buffer (its JSONL file is append-only and rotated)
+    sql_error_log.clear()
 
 # Clear all logs on startup
 clear_logs()
 
-app = FastAPI(title="Property Management System API", debug=True)
+app = FastAPI(title="Property Management System API", debug=True, default_response_class=TimedJSONResponse)
 
 # Enable CORS
 app.add_middleware(
@@ -173,7 +122,8 @@ async def response_validation_exception_handler(request: Request, exc: ResponseV
         "path": str(request.url),
         "method": request.method,
         "timestamp": datetime.now().isoformat(),
-        "ai_tracking_id": error_data.get("timestamp")
+        "ai_tracking_id": error_data.get("timestamp"),
+        "request_id": error_data.get("request_id")
     }
     logger.error(f"ResponseValidationError: {error_details}")
     return JSONResponse(
@@ -181,7 +131,7 @@ async def response_validation_exception_handler(request: Request, exc: ResponseV
         content={
             "detail": f"Response validation error: {str(exc)}",
             "debug_info": error_details,
-            "ai_suggestions": error_data.get("suggested_fixes", [])
+            "ai_suggestions": ai_tracker.suggest_fixes(exc)
         }
     )
 
@@ -200,7 +150,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
     
-    # Track error for AI analysis
+    # Track error for AI analysis (enqueue only; written by the tracker thread)
     error_data = track_error(
         error=exc,
         context=f"Unhandled exception in {request.method} {request.url.path}",
@@ -221,7 +171,8 @@ async def global_exception_handler(request: Request, exc: Exception):
         "path": str(request.url),
         "method": request.method,
         "timestamp": datetime.now().isoformat(),
-        "ai_tracking_id": error_data.get("timestamp")  # Reference to AI log
+        "ai_tracking_id": error_data.get("timestamp"),  # Reference to AI log
+        "request_id": error_data.get("request_id")  # Matches X-Request-ID and the access log
     }
     
     logger.error(f"Unhandled exception: {error_details}")
@@ -231,32 +182,10 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={
             "detail": f"Internal server error: {str(exc)}",
             "debug_info": error_details,
-            "ai_suggestions": error_data.get("suggested_fixes", [])
+            "ai_suggestions": ai_tracker.suggest_fixes(exc)
         }
     )
 
-# Request logging middleware with AI error context
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = datetime.now()
-    logger.info(f"Request started: {request.method} {request.url}")
-    
-    try:
-        response = await call_next(request)
-        process_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"Request completed: {request.method} {request.url} - {response.status_code} in {process_time:.3f}s")
-        return response
-    except Exception as e:
-        # Track middleware errors
-        track_error(
-            error=e,
-            context=f"Request middleware error for {request.method} {request.url.path}",
-            user_action="Processing HTTP request",
-            endpoint=str(request.url.path),
-            severity="ERROR"
-        )
-        raise
-
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -264,9 +193,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Error-Code"]
+    expose_headers=["X-Error-Code", "X-Next-Cursor", "ETag", "Content-Range", "Accept-Ranges", "X-Request-ID"]
 )
 
+# Outermost: one JSON access record per request (request ID, route, status, bytes, stage timings)
+app.add_middleware(AccessLogMiddleware)
+
 @app.get("/")
 async def root():
     logger.info("Root endpoint accessed")
@@ -290,24 +222,61 @@ async def get_error_summary():
             endpoint="/debug/errors"
         )
         raise HTTPException(status_code=500, detail=f"Failed to get error summary: {str(e)}")
+
 @app.get("/debug/sql-errors")
 async def get_sql_errors():
+    # Served from the in-memory ring buffer; no disk access
+    errors = sql_error_log.recent(50)
+    return {"count": len(errors), "total": sql_error_log.total, "errors": errors}
+
+@app.get("/debug/public-cache")
+async def get_public_cache_stats():
+    return public_cache.stats()
+
+@app.get("/debug/uploads")
+async def get_upload_stats():
+    """Upload slots in use/waiting, size-limit and busy rejections, bytes written."""
+    return upload_stats.as_dict()
+
+@app.get("/debug/password-hashing")
+async def get_password_hashing_stats():
+    """Hashing pool queue depth, waits and rejections; sustained queueing means login bursts exceed the workers."""
+    return password_hasher.stats()
+
+@app.get("/debug/login-limiter")
+async def get_login_limiter_stats():
+    """Login attempts allowed and throttled (per IP / per account) and shared-backend failures."""
+    return login_limiter.stats()
+
+@app.get("/debug/log-levels")
+async def get_log_levels():
+    """Effective level per module, plus how many DEBUG records sampling has dropped."""
+    return log_levels()
+
+@app.get("/debug/log-pipeline")
+async def get_log_pipeline_stats():
+    """Records waiting for the listener thread and records dropped because the queue was full."""
+    return log_pipeline.stats()
+
+@app.put("/debug/log-levels/{name}")
+async def update_log_level(name: str, level: str, current_user: dict = Depends(get_current_user)):
+    """Raise or lower one module's level at runtime, e.g. PUT /debug/log-levels/database?level=DEBUG.
+    Disabled unless LOG_LEVEL_API=1: DEBUG on a hot module can fill the disk."""
+    if not LOG_LEVEL_API:
+        raise HTTPException(
+            status_code=403,
+            detail="Runtime log level changes are disabled",
+            headers={"X-Error-Code": "LOG_LEVEL_API_DISABLED"}
+        )
     try:
-        log_path = Path(os.getcwd()) / "sql_error_log.json"
-        if not log_path.exists():
-            return {"errors": []}
-        with open(log_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        # Return last 50 for brevity
-        errors = data.get("errors", [])[-50:]
-        return {"count": len(errors), "errors": errors}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return {"logger": name, "level": set_log_level(name, level)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/debug/db-connection")
 async def db_connection_check():
     try:
-        info = StoredProcedures.test_connection()
+        info = await run_db(StoredProcedures.test_connection)
         if info.get("status") != "ok":
             raise HTTPException(status_code=500, detail=info)
         return info
@@ -323,6 +292,17 @@ async def db_connection_check():
         )
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/debug/db-pool")
+async def db_pool_stats():
+    """Connection pool metrics (checkouts, waits, created/destroyed) for sizing under load."""
+    from .database import session_touches
+    return {**StoredProcedures.pool_stats(), "session_touches": session_touches.stats()}
+
+@app.get("/debug/loop-lag")
+async def loop_lag_stats():
+    """Event loop lag; sustained lag means something is blocking inside an async route."""
+    return loop_monitor.stats()
+
 @app.get("/debug/test-error")
 async def test_error():
     """Endpoint to test AI error tracking"""
@@ -374,19 +354,39 @@ api_router.include_router(lookups_router.router)
 
 
 # Register click logger router at root (not under /api)
-from .core.click_logger import router as click_logger_router
-from .core.frontend_error_logger import router as frontend_error_logger_router
+from .core.click_logger import router as click_logger_router, click_sink
+from .core.frontend_error_logger import router as frontend_error_logger_router, frontend_error_sink
 app.include_router(click_logger_router)
 app.include_router(frontend_error_logger_router)
 
 # Mount the API router
 app.include_router(api_router)
 
-# Serve uploaded files
+@app.on_event("startup")
+async def start_loop_monitor():
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+def close_db_pool():
+    from .database import db_pool, session_touches
+    loop_monitor.stop()
+    click_sink.close()
+    frontend_error_sink.close()
+    shutdown_executors()
+    password_hasher.shutdown()
+    # Flush write-behind session touches while the pool is still open
+    session_touches.close()
+    db_pool.close()
+    ai_tracker.close()
+    sql_error_log.close()
+
+# Serve uploaded files (ETag/304, Range, precompressed variants; blobs are cached as immutable)
 import os
-uploads_path = os.path.join(os.getcwd(), "uploads")
+from .core.blob_store import UPLOADS_ROOT
+from .core.static_files import CachedStaticFiles
+uploads_path = UPLOADS_ROOT
 os.makedirs(uploads_path, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=uploads_path), name="uploads")
+app.mount("/uploads", CachedStaticFiles(directory=uploads_path), name="uploads")
 
 if __name__ == "__main__":
     import uvicorn
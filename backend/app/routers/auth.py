@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from typing import List
 from ..database import StoredProcedures
 from ..schemas import user as user_schema
 from ..core import security
 from ..core.dependencies import require_owner_access
+from ..core.owner_cache import owner_kpi_cache
+from ..core.async_db import adb
+from ..core.password_hashing import password_hasher
+from ..core.rate_limit import login_limiter
 from backend.app.core.logging_config import get_logger, log_exception
 import logging
 import pyodbc
@@ -27,11 +31,11 @@ router = APIRouter(
 )
 
 @router.post("/register")
-def register(user_data: user_schema.UserCreate):
+async def register(user_data: user_schema.UserCreate):
     try:
         # Check if email already exists
         try:
-            existing = StoredProcedures.execute_sp("sp_GetUserByEmail", [user_data.email])
+            existing = await adb.execute_sp("sp_GetUserByEmail", [user_data.email])
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
@@ -44,11 +48,11 @@ def register(user_data: user_schema.UserCreate):
             # Non-fatal: if lookup fails, proceed and rely on unique constraint handling
             logging.warning("sp_GetUserByEmail check failed during registration; continuing to create user")
 
-        # Hash the password
-        hashed_password = security.get_password_hash(user_data.password)
+        # Hash the password on the dedicated hashing pool
+        hashed_password = await password_hasher.hash(user_data.password)
 
         # Create new user using stored procedure
-        result = StoredProcedures.create_user(
+        result = await adb.create_user(
             email=user_data.email,
             username=user_data.username,
             hashed_password=hashed_password,
@@ -63,9 +67,9 @@ def register(user_data: user_schema.UserCreate):
 
         # Create role-specific profile shell
         if user_data.role == 'owner':
-            StoredProcedures.create_owner_profile(user_id)
+            await adb.create_owner_profile(user_id)
         elif user_data.role == 'renter':
-            StoredProcedures.create_renter_profile(user_id)
+            await adb.create_renter_profile(user_id)
         return {
             "id": user_id,
             "email": user_data.email,
@@ -99,31 +103,41 @@ def register(user_data: user_schema.UserCreate):
         raise HTTPException(status_code=400, detail=str(e), headers={"X-Error-Code": "UNKNOWN_REGISTER_ERROR"})
 
 @router.post("/login")
-def login(user_data: user_schema.UserLogin):
+async def login(user_data: user_schema.UserLogin, request: Request):
+    # Throttle by client IP and by account before any DB or hashing work
+    await login_limiter.check(request, user_data.email)
+
     # Get user by email using stored procedure
-    result = StoredProcedures.execute_sp("sp_GetUserByEmail", [user_data.email])
-    
+    result = await adb.execute_sp("sp_GetUserByEmail", [user_data.email])
+
+    # Unknown email and wrong password get the same response (and similar timing),
+    # so the endpoint can't be used to discover which accounts exist
+    invalid_credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+        headers={"X-Error-Code": "INVALID_CREDENTIALS"}
+    )
     if not result:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Email address not found",
-            headers={"X-Error-Code": "EMAIL_NOT_FOUND"}
-        )
-    
+        await password_hasher.verify_unknown_user(user_data.password)
+        raise invalid_credentials
+
     user = result[0]
     # Always verify securely against hashed password; plaintext storage is not supported.
-    if not security.verify_password(user_data.password, user['hashed_password']):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid password",
-            headers={"X-Error-Code": "INVALID_PASSWORD"}
-        )
+    valid, new_hash = await password_hasher.verify_and_update(user_data.password, user['hashed_password'])
+    if not valid:
+        raise invalid_credentials
+    if new_hash:
+        # Stored hash used different rounds than configured; upgrade it (best-effort)
+        try:
+            await adb.set_user_password_hashed(int(user['id']), new_hash)
+        except Exception as e:
+            log_auth_error(f"Password rehash failed for user {user['id']}", e)
     
     # Start a session and create access token including user id, role, and session id (sid)
     sid = security.SessionManager.start_session()
     # Persist session in DB (best-effort)
     try:
-        StoredProcedures.create_session(sid, int(user['id']))
+        await adb.create_session(sid, int(user['id']))
     except Exception:
         pass
     token_data = {"sub": user['email'], "user_id": user['id'], "role": user['role'], "sid": sid}
@@ -164,96 +178,37 @@ def get_owner_analytics(current_user: dict = Depends(require_owner_access)):
     Returns KPIs: total properties, active tenants, monthly revenue, occupancy rate, etc.
     """
     owner_id = current_user['user_id']
-    
+
+    cached = owner_kpi_cache.get(owner_id)
+    if cached is not None:
+        return cached
+
     try:
-        # Get all properties for owner
-        properties = StoredProcedures.execute_sp("sp_GetAllProperties", [owner_id]) or []
-        total_properties = len(properties)
-        
-        # Count available and occupied properties
-        available_properties = sum(1 for p in properties if p.get('status', '').lower() in ['available', 'vacant'])
-        occupied_properties = sum(1 for p in properties if p.get('status', '').lower() in ['occupied', 'rented'])
-        
-        # Calculate occupancy rate
+        generation = owner_kpi_cache.generation(owner_id)
+        kpis = StoredProcedures.get_owner_kpis(owner_id)
+
+        total_properties = int(kpis.get('total_properties') or 0)
+        occupied_properties = int(kpis.get('occupied_properties') or 0)
         occupancy_rate = (occupied_properties / total_properties * 100) if total_properties > 0 else 0
-        
-        # Get active tenants (leases)
-        try:
-            from ..database import get_db_connection
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Count active tenants
-            cursor.execute("""
-                SELECT COUNT(DISTINCT tenant_id) 
-                FROM leases 
-                WHERE property_id IN (
-                    SELECT id FROM properties WHERE owner_id = ?
-                ) AND is_active = 1
-            """, (owner_id,))
-            active_tenants = cursor.fetchone()[0] or 0
-            
-            # Calculate monthly revenue (sum of rent from active leases)
-            cursor.execute("""
-                SELECT COALESCE(SUM(rent_amount), 0) 
-                FROM leases 
-                WHERE property_id IN (
-                    SELECT id FROM properties WHERE owner_id = ?
-                ) AND is_active = 1
-            """, (owner_id,))
-            monthly_revenue = float(cursor.fetchone()[0] or 0)
-            
-            # Get pending payments
-            cursor.execute("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM payments p
-                JOIN leases l ON p.lease_id = l.id
-                WHERE l.property_id IN (
-                    SELECT id FROM properties WHERE owner_id = ?
-                ) AND p.payment_status IN ('pending', 'failed')
-            """, (owner_id,))
-            pending_amount = float(cursor.fetchone()[0] or 0)
-            
-            # Calculate collection rate (completed payments / total expected)
-            cursor.execute("""
-                SELECT 
-                    COALESCE(SUM(CASE WHEN payment_status = 'completed' THEN amount ELSE 0 END), 0) as collected,
-                    COALESCE(SUM(amount), 0) as total
-                FROM payments p
-                JOIN leases l ON p.lease_id = l.id
-                WHERE l.property_id IN (
-                    SELECT id FROM properties WHERE owner_id = ?
-                ) AND MONTH(p.payment_date) = MONTH(GETDATE())
-                  AND YEAR(p.payment_date) = YEAR(GETDATE())
-            """, (owner_id,))
-            row = cursor.fetchone()
-            collected = float(row[0] or 0)
-            total = float(row[1] or 0)
-            collection_rate = (collected / total * 100) if total > 0 else 0
-            
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            print(f"Error fetching tenant/payment stats: {e}")
-            active_tenants = 0
-            monthly_revenue = 0
-            pending_amount = 0
-            collection_rate = 0
-        
-        return {
+
+        billed = float(kpis.get('billed_this_month') or 0)
+        collected = float(kpis.get('collected_this_month') or 0)
+        collection_rate = (collected / billed * 100) if billed > 0 else 0
+
+        result = {
             "totalProperties": total_properties,
-            "availableProperties": available_properties,
+            "availableProperties": int(kpis.get('available_properties') or 0),
             "occupiedProperties": occupied_properties,
             "occupancyRate": round(occupancy_rate, 1),
-            "activeTenants": active_tenants,
-            "monthlyRevenue": round(monthly_revenue, 2),
-            "pendingAmount": round(pending_amount, 2),
+            "activeTenants": int(kpis.get('active_tenants') or 0),
+            "monthlyRevenue": round(float(kpis.get('monthly_revenue') or 0), 2),
+            "pendingAmount": round(float(kpis.get('pending_amount') or 0), 2),
             "collectionRate": round(collection_rate, 1)
         }
+        owner_kpi_cache.put(owner_id, result, generation)
+        return result
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        log_auth_error(f"Failed to fetch owner analytics for owner {owner_id}", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch owner analytics: {str(e)}",
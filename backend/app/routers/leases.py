@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Query, HTTPException, Depends
+from fastapi import APIRouter, Query, HTTPException, Depends, Response
 from typing import Optional
 import logging
 from ..schemas import lease as lease_schema
 from ..database import StoredProcedures
 from ..core.dependencies import get_current_user, require_owner_access
+from ..core.pagination import CURSOR_MAX_LIMIT, decode_cursor, set_next_cursor
 
 router = APIRouter(
     prefix="/leases",
@@ -28,6 +29,8 @@ def create_lease(payload: lease_schema.LeaseCreate):
         lease_id = int(result[0].get('LeaseId', 0))
         if lease_id == 0:
             raise HTTPException(status_code=400, detail="Failed to obtain new lease ID")
+        StoredProcedures.invalidate_owner_kpis(property_id=payload.property_id)
+        StoredProcedures.refresh_kpi_rollup(payload.property_id)
             
         lease = StoredProcedures.get_lease(lease_id)
         if not lease:
@@ -72,39 +75,41 @@ def create_lease(payload: lease_schema.LeaseCreate):
 
 
 @router.get("/all")
-def get_all_owner_leases(current_user: dict = Depends(require_owner_access)):
-    """Get all leases for properties owned by the current user"""
+def get_all_owner_leases(
+    page: Optional[int] = Query(default=None, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    sort: str = Query("start_date"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    current_user: dict = Depends(require_owner_access)
+):
+    """Get all leases for properties owned by the current user.
+
+    Leases are fetched in one set-based query with property title and tenant
+    name/email joined in. Without ``page`` the full list is returned (as before);
+    with ``page`` the response is ``{page, page_size, total, items}``.
+    """
+    if sort not in StoredProcedures.OWNER_LEASE_SORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort field: {sort}")
     try:
-        # Fetch properties owned by the user
-        properties_result = StoredProcedures.execute_sp("sp_GetAllProperties", [current_user['user_id']])
-        if not properties_result:
-            return []
-
-        property_ids = [str(prop['id']) for prop in properties_result]
-
-        # Get all leases for these properties
-        all_leases = []
-        for property_id in property_ids:
-            leases_result = StoredProcedures.execute_sp("sp_GetLeasesByProperty", [property_id])
-            if leases_result:
-                for lease in leases_result:
-                    # Get property details inline from the already fetched list
-                    pid = lease.get('property_id') or lease.get('unit_id')
-                    property_info = next((p for p in properties_result if p['id'] == pid), {})
-
-                    # Get tenant details
-                    tenant_result = StoredProcedures.execute_sp("sp_GetUserById", [lease['tenant_id']])
-                    tenant_info = tenant_result[0] if tenant_result else {}
-
-                    lease_with_details = {
-                        **lease,
-                        'property_title': property_info.get('title', 'Unknown Property'),
-                        'tenant_name': tenant_info.get('full_name') or f"{tenant_info.get('first_name', '')} {tenant_info.get('last_name', '')}".strip(),
-                        'tenant_email': tenant_info.get('email', 'Unknown Email')
-                    }
-                    all_leases.append(lease_with_details)
-
-        return all_leases
+        if page is None:
+            rows, _ = StoredProcedures.list_owner_leases(
+                current_user['user_id'], sort_by=sort, sort_dir=order
+            )
+        else:
+            rows, total = StoredProcedures.list_owner_leases(
+                current_user['user_id'], offset=(page - 1) * page_size, limit=page_size,
+                sort_by=sort, sort_dir=order
+            )
+        for lease in rows:
+            if not lease.get('property_title'):
+                lease['property_title'] = 'Unknown Property'
+            if not lease.get('tenant_name'):
+                lease['tenant_name'] = ''
+            if not lease.get('tenant_email'):
+                lease['tenant_email'] = 'Unknown Email'
+        if page is None:
+            return rows
+        return {"page": page, "page_size": page_size, "total": total, "items": rows}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve leases: {str(e)}")
@@ -128,7 +133,16 @@ def update_lease(lease_id: int, payload: lease_schema.LeaseUpdate):
 
 
 @router.get("/")
-def list_leases(tenant_id: Optional[int] = Query(default=None), unit_id: Optional[int] = Query(default=None), current_user: dict = Depends(get_current_user)):
+def list_leases(
+    response: Response,
+    tenant_id: Optional[int] = Query(default=None),
+    unit_id: Optional[int] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1, le=CURSOR_MAX_LIMIT),
+    after: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """List leases. Pass ``limit`` (and then ``after`` from the ``X-Next-Cursor``
+    header) to page through them newest-first; without them the full list is returned."""
     # Role-based filtering
     if current_user['role'] == 'renter':
         # Renters can only see their own leases
@@ -137,8 +151,14 @@ def list_leases(tenant_id: Optional[int] = Query(default=None), unit_id: Optiona
         # Owners can see leases for their properties (add property ownership check if needed)
         pass
     
-    result = StoredProcedures.list_leases(tenant_id=tenant_id, unit_id=unit_id)
-    return result or []
+    if limit is None and after is None:
+        result = StoredProcedures.list_leases(tenant_id=tenant_id, unit_id=unit_id)
+        return result or []
+
+    limit = limit or 50
+    after_key, after_id = decode_cursor(after)
+    rows = StoredProcedures.list_leases_page(tenant_id, unit_id, limit + 1, after_key, after_id)
+    return set_next_cursor(response, rows, limit, "created_at")
 
 @router.get("/current")
 def get_current_lease(current_user: dict = Depends(get_current_user)):
@@ -390,6 +410,8 @@ def approve_invitation(invitation_id: int, current_user: dict = Depends(get_curr
                 raise HTTPException(status_code=400, detail="Invitation not found or not pending")
         except Exception:
             pass
+        StoredProcedures.invalidate_owner_kpis(invitation_id=invitation_id)
+        StoredProcedures.refresh_kpi_rollup_for(invitation_id=invitation_id)
         return {"status": "approved"}
     except HTTPException:
         raise
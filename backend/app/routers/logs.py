@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import JSONResponse
-from pathlib import Path
-import json
 from datetime import datetime
 from ..ai_error_tracker import track_error
+from ..core.frontend_error_logger import frontend_error_sink
 
 router = APIRouter(prefix="/logs", tags=["Logs"])
 
-_LOG_PATH = Path(__file__).parent.parent.parent / "logs" / "frontend_errors.log"
+
+class FrontendClientError(Exception):
+    pass
 
 
 @router.post("/error")
@@ -30,18 +31,12 @@ async def log_single_error(request: Request):
         **(data if isinstance(data, dict) else {"raw": data})
     }
 
-    try:
-        _LOG_PATH.parent.mkdir(exist_ok=True)
-        with open(_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to persist log: {e}")
+    if not frontend_error_sink.write(entry):
+        raise HTTPException(status_code=503, detail="Log queue full; entry dropped")
 
     # Forward minimal info to AI tracker (best effort, never fails request)
     try:
         msg = entry.get("message") or entry.get("title") or "Frontend error"
-        class FrontendClientError(Exception):
-            pass
         track_error(
             error=FrontendClientError(msg),
             context=entry.get("title", "frontend"),
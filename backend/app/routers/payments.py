@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from typing import List, Optional
 from ..database import StoredProcedures
 from ..schemas import payment as payment_schema
 from ..core.dependencies import get_current_user, require_owner_access
+from ..core.pagination import CURSOR_MAX_LIMIT, decode_cursor, set_next_cursor
 from datetime import datetime
 
 router = APIRouter(
@@ -11,8 +12,18 @@ router = APIRouter(
 )
 
 @router.get("/")
-def list_payments(current_user: dict = Depends(get_current_user)):
-    """List payments filtered by role: owners see their properties' payments; renters see their own."""
+def list_payments(
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=CURSOR_MAX_LIMIT),
+    after: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """List payments filtered by role: owners see their properties' payments; renters see their own.
+
+    Pass ``limit`` (and then ``after`` from the ``X-Next-Cursor`` header) to page
+    through the list newest-first; without them the full list is returned.
+    """
+    after_key, after_id = decode_cursor(after)
     try:
         owner_id = None
         tenant_id = None
@@ -21,8 +32,13 @@ def list_payments(current_user: dict = Depends(get_current_user)):
         elif current_user['role'] == 'renter':
             tenant_id = current_user['user_id']
 
-        rows = StoredProcedures.execute_sp("sp_ListPayments", [owner_id, tenant_id])
-        return rows or []
+        if limit is None and after is None:
+            rows = StoredProcedures.execute_sp("sp_ListPayments", [owner_id, tenant_id])
+            return rows or []
+
+        limit = limit or 50
+        rows = StoredProcedures.list_payments_page(owner_id, tenant_id, limit + 1, after_key, after_id)
+        return set_next_cursor(response, rows, limit, "created_at")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
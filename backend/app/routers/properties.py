@@ -11,11 +11,15 @@ def log_property_error(msg, exc=None):
     else:
         api_logger.error(msg)
 import os
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Request, Depends, Query
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Request, Depends, Query, Response
 from typing import List, Optional
 from ..database import StoredProcedures
 from ..schemas import property as property_schema
 from ..core.dependencies import get_current_user, require_owner_access
+from ..core.async_db import adb
+from ..core.pagination import CURSOR_MAX_LIMIT, decode_cursor, set_next_cursor
+from ..core.uploads import discard_temp, upload_slot
+from ..core.blob_store import blob_abspath, blob_url_path, place_blob, stage_upload
 from datetime import datetime
 
 router = APIRouter(
@@ -25,13 +29,26 @@ router = APIRouter(
 
 @router.get("/", response_model=List[property_schema.PropertySummary])
 def list_properties(
+    response: Response,
     summary: bool = True,
+    limit: Optional[int] = Query(default=None, ge=1, le=CURSOR_MAX_LIMIT),
+    after: Optional[str] = None,
     current_user: dict = Depends(require_owner_access)
 ):
-    """Get properties for authenticated owner. Use summary=false for full details."""
+    """Get properties for authenticated owner. Use summary=false for full details.
+
+    Pass ``limit`` (and then ``after`` from the ``X-Next-Cursor`` header) to page
+    through the list newest-first; without them the full list is returned.
+    """
     # Return only properties owned by the authenticated user
-    result = StoredProcedures.execute_sp("sp_GetAllProperties", [current_user['user_id']])
-    properties = result or []
+    if limit is None and after is None:
+        result = StoredProcedures.execute_sp("sp_GetAllProperties", [current_user['user_id']])
+        properties = result or []
+    else:
+        limit = limit or 50
+        after_key, after_id = decode_cursor(after)
+        rows = StoredProcedures.list_properties_page(current_user['user_id'], limit + 1, after_key, after_id)
+        properties = set_next_cursor(response, rows, limit, "created_at")
     
     # Return lightweight summary by default for better performance
     if summary and properties:
@@ -66,14 +83,13 @@ def list_properties_summary(
 ):
     """Lightweight paged property list for performance-sensitive views.
     Returns only essential fields and omits large text / unused numeric columns.
+    Projection, paging and the total count are done in SQL.
     """
-    rows = StoredProcedures.execute_sp("sp_GetAllProperties", [current_user['user_id']]) or []
-    total = len(rows)
-    start = (page - 1) * page_size
-    end = start + page_size
-    slice_rows = rows[start:end]
+    rows, total = StoredProcedures.list_owner_properties_page(
+        current_user['user_id'], offset=(page - 1) * page_size, limit=page_size
+    )
     essentials = []
-    for r in slice_rows:
+    for r in rows:
         essentials.append({
             "id": r.get("id"),
             "title": r.get("title"),
@@ -81,7 +97,7 @@ def list_properties_summary(
             "city": r.get("city"),
             "state": r.get("state"),
             "status": r.get("status"),
-            "monthly_rent": r.get("monthly_rent") or r.get("rent_amount"),
+            "monthly_rent": r.get("monthly_rent"),
             "property_type": r.get("property_type"),
             "updated_at": r.get("updated_at"),
         })
@@ -168,25 +184,36 @@ def delete_property(property_id: int, current_user: dict = Depends(require_owner
         raise HTTPException(status_code=404, detail="Property not found")
     return {"message": "Property deleted successfully"}
 
-# Property Documents
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(os.getcwd(), "uploads", "property_docs"))
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Property Documents (content-addressed; see core/blob_store.py)
 
 @router.post("/{property_id}/documents")
 async def upload_property_documents(property_id: int, files: List[UploadFile] = File(...), current_user: dict = Depends(require_owner_access)):
-    # Verify property ownership
-    existing = StoredProcedures.execute_sp("sp_GetProperty", [property_id])
+    # Verify property ownership (DB and disk work runs off the event loop)
+    existing = await adb.execute_sp("sp_GetProperty", [property_id])
     if not existing or existing[0]['owner_id'] != current_user['user_id']:
         raise HTTPException(status_code=404, detail="Property not found or access denied")
         
     saved = []
     for f in files:
         safe_name = f.filename.replace('..', '').replace('/', '_').replace('\\', '_')
-        file_path = os.path.join(UPLOAD_DIR, safe_name)
-        with open(file_path, 'wb') as out:
-            out.write(await f.read())
-        StoredProcedures.add_property_document(property_id, safe_name, file_path, f.content_type)
-        saved.append({"file_name": safe_name})
+        # Streamed to disk in chunks; memory use doesn't grow with file size, and
+        # content that is already stored is referenced instead of written again
+        async with upload_slot():
+            staged = await stage_upload(f, safe_name)
+        rows = None
+        try:
+            # Take the blob reference before reusing its file, so GC can't remove it in between
+            rows = await adb.add_property_document(property_id, safe_name, blob_abspath(staged["storage_path"]),
+                                                   f.content_type, staged["sha256"], staged["storage_path"],
+                                                   staged["size"])
+            blob = await place_blob(staged, rows[0].get("StoragePath") if rows else None)
+        except BaseException:
+            await discard_temp(staged["tmp_path"])
+            if rows:
+                await adb.delete_property_document(rows[0]["DocumentId"])
+            raise
+        saved.append({"file_name": safe_name, "size": blob["size"], "sha256": blob["sha256"],
+                      "deduplicated": blob["deduplicated"]})
     return {"uploaded": len(saved), "files": saved}
 
 @router.get("/{property_id}/documents")
@@ -213,10 +240,13 @@ def list_property_documents(property_id: int, request: Request, current_user: di
         
     docs = StoredProcedures.list_property_documents(property_id) or []
     # Build absolute URL to backend's uploads so it works when frontend is served from a different origin
-    base = str(request.base_url).rstrip('/') + '/uploads/property_docs/'
+    base = str(request.base_url).rstrip('/') + '/uploads/'
     for d in docs:
-        fname = os.path.basename(d.get('file_path', ''))
-        d['url'] = base + fname
+        if d.get('storage_path'):
+            d['url'] = base + blob_url_path(d['storage_path'])
+        else:
+            # Documents uploaded before the blob store live under property_docs/ by name
+            d['url'] = base + 'property_docs/' + os.path.basename(d.get('file_path', ''))
     return docs
 
 @router.delete("/documents/{document_id}")
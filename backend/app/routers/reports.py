@@ -67,7 +67,7 @@ def occupancy(owner_id: Optional[int] = Query(default=None), start_date: Optiona
 
 @router.get("/payments")
 def payments(owner_id: Optional[int] = Query(default=None), start_date: Optional[str] = Query(default=None), end_date: Optional[str] = Query(default=None)):
-    """Return payment report using sp_GetPaymentReport."""
+    """Return payment report for an exact date range from the monthly KPI rollup (O(months) rows)."""
     from ..database import StoredProcedures
     # Convert date strings to date objects if provided
     import datetime
@@ -79,54 +79,49 @@ def payments(owner_id: Optional[int] = Query(default=None), start_date: Optional
         except Exception:
             return None
 
-    params = [owner_id, parse_date(start_date), parse_date(end_date)]
+    start = parse_date(start_date)
+    end = parse_date(end_date)
     try:
-        from ..database import StoredProcedures
-        results = StoredProcedures.execute_sp("sp_GetPaymentReport", params)
-        
-        # First resultset has the summary
-        if not results or not results[0] or not results[0][0]:
-            return JSONResponse(status_code=200, content={
-                "monthlyRevenue": 0,
-                "totalPayments": 0,
-                "pendingAmount": 0,
-                "averagePayment": 0,
-                "mostCommonType": "rent",
-                "totalPropertiesWithPayments": 0,
-                "totalPayingTenants": 0,
-                "completedPayments": 0,
-                "pendingPayments": 0,
-                "failedPayments": 0
-            })
-
-        try:
-            # Get the summary row from first result set
-            summary = results[0][0]  # First row of first result set
-            
-            # Convert pyodbc Row to dict for easier access
-            summary_dict = {}
-            for key in summary.cursor_description:
-                col_name = key[0]
-                summary_dict[col_name] = getattr(summary, col_name, None)
-
-            return JSONResponse(status_code=200, content={
-                "monthlyRevenue": float(summary_dict.get("monthly_revenue", 0) or 0),
-                "totalPayments": int(summary_dict.get("completed_payments", 0) or 0) + int(summary_dict.get("pending_payments", 0) or 0),
-                "pendingAmount": float(summary_dict.get("pending_amount", 0) or 0),
-                "averagePayment": float(summary_dict.get("average_payment", 0) or 0),
-                "mostCommonType": summary_dict.get("most_common_payment_type", "rent") or "rent",
-                "totalPropertiesWithPayments": int(summary_dict.get("total_properties_with_payments", 0) or 0),
-                "totalPayingTenants": int(summary_dict.get("total_paying_tenants", 0) or 0),
-                "completedPayments": int(summary_dict.get("completed_payments", 0) or 0),
-                "pendingPayments": int(summary_dict.get("pending_payments", 0) or 0),
-                "failedPayments": int(summary_dict.get("failed_payments", 0) or 0)
-            })
-        except Exception as e:
-            import logging
-            logging.error(f"Error processing payment report: {e}")
-            logging.error(f"Summary object type: {type(summary)}")
-            logging.error(f"Summary object: {summary}")
-            raise
+        months, extras = StoredProcedures.get_payment_report(owner_id, start, end)
+
+        def total(key, cast=float):
+            return sum(cast(m.get(key) or 0) for m in months)
+
+        def month_key(d):
+            return d.strftime("%Y-%m") if hasattr(d, "strftime") else str(d)[:7]
+
+        # "Monthly" revenue is the month containing end_date (or the current month)
+        report_month = month_key(end or datetime.date.today())
+        current = next((m for m in months if month_key(m.get("month_start")) == report_month), {})
+
+        completed = total("completed_count", int)
+        pending = total("pending_count", int)
+        payment_count = total("payment_count", int)
+        billed = total("collected_amount") + total("pending_amount") + total("failed_amount")
+
+        return JSONResponse(status_code=200, content={
+            "monthlyRevenue": float(current.get("collected_amount") or 0),
+            "totalPayments": completed + pending,
+            "pendingAmount": total("pending_amount"),
+            "averagePayment": round(billed / payment_count, 2) if payment_count else 0,
+            "mostCommonType": extras.get("most_common_payment_type") or "rent",
+            "totalPropertiesWithPayments": int(extras.get("total_properties_with_payments") or 0),
+            "totalPayingTenants": int(extras.get("total_paying_tenants") or 0),
+            "completedPayments": completed,
+            "pendingPayments": pending,
+            "failedPayments": total("failed_count", int),
+            "monthly": [
+                {
+                    "month": month_key(m["month_start"]),
+                    "collected": float(m.get("collected_amount") or 0),
+                    "pending": float(m.get("pending_amount") or 0),
+                    "failed": float(m.get("failed_amount") or 0),
+                    "payments": int(m.get("payment_count") or 0),
+                    "activeLeaseRent": float(m.get("active_lease_rent") or 0),
+                }
+                for m in months
+            ]
+        })
     except Exception as e:
         return JSONResponse(status_code=500, content={
             "detail": str(e),
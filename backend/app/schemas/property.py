@@ -2,6 +2,26 @@ from pydantic import BaseModel, validator
 from typing import Optional
 from datetime import datetime
 
+# Stored (canonical) spelling of each property status, keyed by its lower-cased form.
+# Every write path stores these exact values so SQL can filter with plain,
+# index-friendly equality instead of LOWER(status).
+PROPERTY_STATUS_MAP = {
+    'available': 'Available',
+    'occupied': 'Occupied',
+    'under maintenance': 'Under Maintenance',
+    'vacant': 'vacant',
+    'rented': 'rented',
+    'maintenance': 'maintenance'
+}
+PROPERTY_STATUSES = list(PROPERTY_STATUS_MAP.values())
+
+
+def normalize_property_status(v):
+    if v is None:
+        return v
+    return PROPERTY_STATUS_MAP.get(str(v).strip().lower(), str(v).strip())
+
+
 class PropertyBase(BaseModel):
     # Basic Property Information
     title: str
@@ -57,18 +77,9 @@ class PropertyBase(BaseModel):
     @validator('status')
     def validate_status(cls, v):
         # Normalize to proper case for consistency
-        status_map = {
-            'available': 'Available',
-            'occupied': 'Occupied', 
-            'under maintenance': 'Under Maintenance',
-            'vacant': 'vacant',
-            'rented': 'rented',
-            'maintenance': 'maintenance'
-        }
-        normalized = status_map.get(v.lower() if v else '', v)
-        valid_statuses = ['Available', 'Occupied', 'Under Maintenance', 'vacant', 'rented', 'maintenance']
-        if normalized not in valid_statuses:
-            raise ValueError(f'Status must be one of: {", ".join(valid_statuses)}')
+        normalized = normalize_property_status(v)
+        if normalized not in PROPERTY_STATUSES:
+            raise ValueError(f'Status must be one of: {", ".join(PROPERTY_STATUSES)}')
         return normalized
 
     @validator('furnishing_type')
@@ -0,0 +1,185 @@
+-- Content-addressed storage for property documents: blob metadata with reference
+-- counts, and the property document SPs that maintain them.
+USE [Re-own];
+GO
+
+IF OBJECT_ID('dbo.document_blobs','U') IS NULL
+BEGIN
+    CREATE TABLE dbo.document_blobs (
+        sha256 CHAR(64) NOT NULL PRIMARY KEY,
+        storage_path NVARCHAR(300) NOT NULL,   -- relative to BLOB_DIR, e.g. ab/cd/<sha256>.pdf
+        size_bytes BIGINT NOT NULL,
+        content_type NVARCHAR(100) NULL,
+        ref_count INT NOT NULL DEFAULT 0,
+        created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        released_at DATETIME2 NULL              -- when ref_count last dropped to zero
+    );
+    CREATE INDEX IX_document_blobs_released ON dbo.document_blobs(released_at) WHERE ref_count = 0;
+END
+GO
+
+IF OBJECT_ID('dbo.property_documents','U') IS NULL
+BEGIN
+    CREATE TABLE dbo.property_documents (
+        id INT IDENTITY(1,1) PRIMARY KEY,
+        property_id INT NOT NULL,
+        file_name NVARCHAR(255) NOT NULL,
+        file_path NVARCHAR(500) NOT NULL,
+        content_type NVARCHAR(100) NULL,
+        uploaded_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+END
+GO
+
+IF COL_LENGTH('dbo.property_documents', 'blob_sha256') IS NULL
+    ALTER TABLE dbo.property_documents ADD blob_sha256 CHAR(64) NULL;
+GO
+IF COL_LENGTH('dbo.property_documents', 'size_bytes') IS NULL
+    ALTER TABLE dbo.property_documents ADD size_bytes BIGINT NULL;
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_property_documents_property' AND object_id = OBJECT_ID('dbo.property_documents'))
+    CREATE INDEX IX_property_documents_property ON dbo.property_documents(property_id);
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_property_documents_blob' AND object_id = OBJECT_ID('dbo.property_documents'))
+    CREATE INDEX IX_property_documents_blob ON dbo.property_documents(blob_sha256) WHERE blob_sha256 IS NOT NULL;
+GO
+
+-- Add a document row; with @BlobSha256 the blob is registered (first upload) or
+-- its ref_count incremented (re-upload of the same content) in the same transaction.
+-- Returns the new DocumentId and the blob's StoragePath (an earlier upload of the
+-- same content may have stored it under a different extension).
+IF OBJECT_ID('dbo.sp_AddPropertyDocument','P') IS NOT NULL DROP PROCEDURE dbo.sp_AddPropertyDocument;
+GO
+CREATE PROCEDURE dbo.sp_AddPropertyDocument
+    @PropertyId INT,
+    @FileName NVARCHAR(255),
+    @FilePath NVARCHAR(500),
+    @ContentType NVARCHAR(100) = NULL,
+    @BlobSha256 CHAR(64) = NULL,
+    @StoragePath NVARCHAR(300) = NULL,
+    @SizeBytes BIGINT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    DECLARE @DocumentId INT;
+    BEGIN TRANSACTION;
+
+    IF @BlobSha256 IS NOT NULL
+    BEGIN
+        UPDATE dbo.document_blobs WITH (UPDLOCK, HOLDLOCK)
+        SET ref_count = ref_count + 1, released_at = NULL
+        WHERE sha256 = @BlobSha256;
+        IF @@ROWCOUNT = 0
+            INSERT INTO dbo.document_blobs (sha256, storage_path, size_bytes, content_type, ref_count)
+            VALUES (@BlobSha256, @StoragePath, COALESCE(@SizeBytes, 0), @ContentType, 1);
+    END
+
+    INSERT INTO dbo.property_documents (property_id, file_name, file_path, content_type, blob_sha256, size_bytes)
+    VALUES (@PropertyId, @FileName, @FilePath, @ContentType, @BlobSha256, @SizeBytes);
+    SET @DocumentId = SCOPE_IDENTITY();
+
+    COMMIT TRANSACTION;
+    SELECT @DocumentId AS DocumentId,
+           (SELECT storage_path FROM dbo.document_blobs WHERE sha256 = @BlobSha256) AS StoragePath;
+END
+GO
+
+IF OBJECT_ID('dbo.sp_ListPropertyDocuments','P') IS NOT NULL DROP PROCEDURE dbo.sp_ListPropertyDocuments;
+GO
+CREATE PROCEDURE dbo.sp_ListPropertyDocuments
+    @PropertyId INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SELECT d.*, b.storage_path
+    FROM dbo.property_documents d
+    LEFT JOIN dbo.document_blobs b ON b.sha256 = d.blob_sha256
+    WHERE d.property_id = @PropertyId
+    ORDER BY d.id DESC;
+END
+GO
+
+IF OBJECT_ID('dbo.sp_GetPropertyDocument','P') IS NOT NULL DROP PROCEDURE dbo.sp_GetPropertyDocument;
+GO
+CREATE PROCEDURE dbo.sp_GetPropertyDocument
+    @DocumentId INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SELECT d.*, b.storage_path
+    FROM dbo.property_documents d
+    LEFT JOIN dbo.document_blobs b ON b.sha256 = d.blob_sha256
+    WHERE d.id = @DocumentId;
+END
+GO
+
+-- Delete a document row and release its blob reference. The blob file itself is
+-- removed later by backend/scripts/gc_blobs.py once it has been unreferenced
+-- for the grace period.
+IF OBJECT_ID('dbo.sp_DeletePropertyDocument','P') IS NOT NULL DROP PROCEDURE dbo.sp_DeletePropertyDocument;
+GO
+CREATE PROCEDURE dbo.sp_DeletePropertyDocument
+    @DocumentId INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    DECLARE @Sha CHAR(64), @Affected INT;
+    BEGIN TRANSACTION;
+
+    SELECT @Sha = blob_sha256 FROM dbo.property_documents WITH (UPDLOCK) WHERE id = @DocumentId;
+    DELETE FROM dbo.property_documents WHERE id = @DocumentId;
+    SET @Affected = @@ROWCOUNT;
+
+    IF @Affected > 0 AND @Sha IS NOT NULL
+        UPDATE dbo.document_blobs
+        SET ref_count = CASE WHEN ref_count > 0 THEN ref_count - 1 ELSE 0 END,
+            released_at = CASE WHEN ref_count <= 1 THEN SYSUTCDATETIME() ELSE NULL END
+        WHERE sha256 = @Sha;
+
+    COMMIT TRANSACTION;
+    SELECT @Affected AS AffectedRows,
+           (SELECT ref_count FROM dbo.document_blobs WHERE sha256 = @Sha) AS BlobRefCount;
+END
+GO
+
+-- Garbage collection: re-derive ref_count from property_documents (covers rows
+-- removed by property deletes or direct SQL), then delete and return blobs
+-- that have been unreferenced for longer than @GraceMinutes
+IF OBJECT_ID('dbo.sp_CollectDocumentBlobs','P') IS NOT NULL DROP PROCEDURE dbo.sp_CollectDocumentBlobs;
+GO
+CREATE PROCEDURE dbo.sp_CollectDocumentBlobs
+    @GraceMinutes INT = 1440,
+    @DryRun BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    BEGIN TRANSACTION;
+
+    UPDATE b
+    SET ref_count = COALESCE(d.cnt, 0),
+        released_at = CASE WHEN COALESCE(d.cnt, 0) = 0 THEN COALESCE(b.released_at, SYSUTCDATETIME()) ELSE NULL END
+    FROM dbo.document_blobs b WITH (UPDLOCK, HOLDLOCK)
+    LEFT JOIN (
+        SELECT blob_sha256, COUNT(*) AS cnt
+        FROM dbo.property_documents
+        WHERE blob_sha256 IS NOT NULL
+        GROUP BY blob_sha256
+    ) d ON d.blob_sha256 = b.sha256
+    WHERE b.ref_count <> COALESCE(d.cnt, 0)
+       OR (COALESCE(d.cnt, 0) = 0 AND b.released_at IS NULL);
+
+    IF @DryRun = 1
+        SELECT sha256, storage_path, size_bytes
+        FROM dbo.document_blobs
+        WHERE ref_count = 0 AND released_at < DATEADD(MINUTE, -@GraceMinutes, SYSUTCDATETIME());
+    ELSE
+        DELETE FROM dbo.document_blobs
+        OUTPUT DELETED.sha256, DELETED.storage_path, DELETED.size_bytes
+        WHERE ref_count = 0 AND released_at < DATEADD(MINUTE, -@GraceMinutes, SYSUTCDATETIME());
+
+    COMMIT TRANSACTION;
+END
+GO
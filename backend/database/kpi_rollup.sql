@@ -0,0 +1,346 @@
+-- Monthly KPI rollup: per owner / property / month payment and lease aggregates
+USE [Re-own];
+GO
+
+IF OBJECT_ID('dbo.kpi_monthly_rollup','U') IS NULL
+BEGIN
+    CREATE TABLE dbo.kpi_monthly_rollup (
+        owner_id INT NOT NULL,
+        property_id INT NOT NULL,
+        month_start DATE NOT NULL,
+        collected_amount DECIMAL(18,2) NOT NULL DEFAULT 0,
+        pending_amount DECIMAL(18,2) NOT NULL DEFAULT 0,
+        failed_amount DECIMAL(18,2) NOT NULL DEFAULT 0,
+        payment_count INT NOT NULL DEFAULT 0,
+        completed_count INT NOT NULL DEFAULT 0,
+        pending_count INT NOT NULL DEFAULT 0,
+        failed_count INT NOT NULL DEFAULT 0,
+        active_lease_rent DECIMAL(18,2) NOT NULL DEFAULT 0,
+        active_leases INT NOT NULL DEFAULT 0,
+        updated_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_kpi_monthly_rollup PRIMARY KEY (owner_id, month_start, property_id)
+    );
+    CREATE INDEX IX_kpi_monthly_rollup_month ON dbo.kpi_monthly_rollup(month_start) INCLUDE (collected_amount, payment_count, completed_count);
+    CREATE INDEX IX_kpi_monthly_rollup_property ON dbo.kpi_monthly_rollup(property_id, month_start);
+END
+GO
+
+-- Payments without a payment_date are bucketed by the day they were recorded,
+-- so they still count towards totals instead of silently dropping out
+IF COL_LENGTH('dbo.payments', 'report_date') IS NULL
+    ALTER TABLE dbo.payments ADD report_date AS CAST(COALESCE(payment_date, created_at) AS DATE) PERSISTED;
+GO
+
+-- Lets a single (property, month) cell, or the partial edge month of a report, be read with an index seek
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_payments_property_report_date' AND object_id = OBJECT_ID('dbo.payments'))
+    CREATE INDEX IX_payments_property_report_date ON dbo.payments(property_id, report_date)
+        INCLUDE (amount, payment_status, tenant_id, payment_type);
+GO
+
+-- Payment counts per owner / property / month / tenant / type: the non-additive
+-- report fields (distinct tenants and properties, most common type) come from here
+IF OBJECT_ID('dbo.kpi_monthly_payment_mix','U') IS NULL
+BEGIN
+    CREATE TABLE dbo.kpi_monthly_payment_mix (
+        owner_id INT NOT NULL,
+        property_id INT NOT NULL,
+        month_start DATE NOT NULL,
+        tenant_id INT NULL,
+        payment_type NVARCHAR(50) NULL,
+        payment_count INT NOT NULL
+    );
+    CREATE CLUSTERED INDEX CIX_kpi_monthly_payment_mix ON dbo.kpi_monthly_payment_mix(owner_id, month_start, property_id);
+    CREATE INDEX IX_kpi_monthly_payment_mix_property ON dbo.kpi_monthly_payment_mix(property_id, month_start);
+END
+GO
+
+-- Recompute one (property, month) cell from the base tables. Called by the
+-- backend after every payment or lease write that touches the cell, so the
+-- cost is proportional to that property's activity in that month.
+IF OBJECT_ID('dbo.sp_RefreshKpiRollup','P') IS NOT NULL DROP PROCEDURE dbo.sp_RefreshKpiRollup;
+GO
+CREATE PROCEDURE dbo.sp_RefreshKpiRollup
+    @PropertyId INT,
+    @MonthStart DATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET @MonthStart = DATEFROMPARTS(YEAR(@MonthStart), MONTH(@MonthStart), 1);
+    DECLARE @NextMonth DATE = DATEADD(MONTH, 1, @MonthStart);
+    DECLARE @OwnerId INT = (SELECT owner_id FROM dbo.properties WHERE id = @PropertyId);
+
+    IF @OwnerId IS NULL
+    BEGIN
+        DELETE FROM dbo.kpi_monthly_rollup WHERE property_id = @PropertyId AND month_start = @MonthStart;
+        DELETE FROM dbo.kpi_monthly_payment_mix WHERE property_id = @PropertyId AND month_start = @MonthStart;
+        RETURN;
+    END
+
+    MERGE dbo.kpi_monthly_rollup WITH (HOLDLOCK) AS t
+    USING (
+        SELECT @OwnerId AS owner_id, @PropertyId AS property_id, @MonthStart AS month_start,
+               pa.collected_amount, pa.pending_amount, pa.failed_amount,
+               pa.payment_count, pa.completed_count, pa.pending_count, pa.failed_count,
+               ls.active_lease_rent, ls.active_leases
+        FROM (
+            SELECT COALESCE(SUM(CASE WHEN payment_status = 'completed' THEN amount END), 0) AS collected_amount,
+                   COALESCE(SUM(CASE WHEN payment_status = 'pending' THEN amount END), 0) AS pending_amount,
+                   COALESCE(SUM(CASE WHEN payment_status = 'failed' THEN amount END), 0) AS failed_amount,
+                   COUNT(*) AS payment_count,
+                   COALESCE(SUM(CASE WHEN payment_status = 'completed' THEN 1 ELSE 0 END), 0) AS completed_count,
+                   COALESCE(SUM(CASE WHEN payment_status = 'pending' THEN 1 ELSE 0 END), 0) AS pending_count,
+                   COALESCE(SUM(CASE WHEN payment_status = 'failed' THEN 1 ELSE 0 END), 0) AS failed_count
+            FROM dbo.payments
+            WHERE property_id = @PropertyId AND report_date >= @MonthStart AND report_date < @NextMonth
+        ) pa
+        CROSS JOIN (
+            SELECT COALESCE(SUM(rent_amount), 0) AS active_lease_rent, COUNT(*) AS active_leases
+            FROM dbo.leases
+            WHERE unit_id = @PropertyId AND status = 'active'
+              AND start_date < @NextMonth AND (end_date IS NULL OR end_date >= @MonthStart)
+        ) ls
+    ) AS s
+    ON t.owner_id = s.owner_id AND t.month_start = s.month_start AND t.property_id = s.property_id
+    WHEN MATCHED THEN UPDATE SET
+        collected_amount = s.collected_amount, pending_amount = s.pending_amount, failed_amount = s.failed_amount,
+        payment_count = s.payment_count, completed_count = s.completed_count,
+        pending_count = s.pending_count, failed_count = s.failed_count,
+        active_lease_rent = s.active_lease_rent, active_leases = s.active_leases,
+        updated_at = SYSUTCDATETIME()
+    WHEN NOT MATCHED THEN INSERT
+        (owner_id, property_id, month_start, collected_amount, pending_amount, failed_amount,
+         payment_count, completed_count, pending_count, failed_count, active_lease_rent, active_leases)
+    VALUES
+        (s.owner_id, s.property_id, s.month_start, s.collected_amount, s.pending_amount, s.failed_amount,
+         s.payment_count, s.completed_count, s.pending_count, s.failed_count, s.active_lease_rent, s.active_leases);
+
+    -- A cell can also move owners if the property changed hands
+    DELETE FROM dbo.kpi_monthly_rollup
+    WHERE property_id = @PropertyId AND month_start = @MonthStart AND owner_id <> @OwnerId;
+
+    -- Replace the cell's mix rows; the range lock keeps concurrent refreshes from duplicating them
+    SET XACT_ABORT ON;
+    BEGIN TRANSACTION;
+    DELETE FROM dbo.kpi_monthly_payment_mix WITH (UPDLOCK, HOLDLOCK)
+    WHERE property_id = @PropertyId AND month_start = @MonthStart;
+    INSERT INTO dbo.kpi_monthly_payment_mix (owner_id, property_id, month_start, tenant_id, payment_type, payment_count)
+    SELECT @OwnerId, @PropertyId, @MonthStart, tenant_id, payment_type, COUNT(*)
+    FROM dbo.payments
+    WHERE property_id = @PropertyId AND report_date >= @MonthStart AND report_date < @NextMonth
+    GROUP BY tenant_id, payment_type;
+    COMMIT TRANSACTION;
+END
+GO
+
+-- Rebuild the rollup from scratch (all owners, or one). Every month with
+-- payments gets a cell, plus the current month for every property.
+IF OBJECT_ID('dbo.sp_RebuildKpiRollup','P') IS NOT NULL DROP PROCEDURE dbo.sp_RebuildKpiRollup;
+GO
+CREATE PROCEDURE dbo.sp_RebuildKpiRollup
+    @OwnerId INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    DECLARE @CurrentMonth DATE = DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1);
+
+    BEGIN TRANSACTION;
+
+    DELETE FROM dbo.kpi_monthly_rollup WHERE (@OwnerId IS NULL OR owner_id = @OwnerId);
+    DELETE FROM dbo.kpi_monthly_payment_mix WHERE (@OwnerId IS NULL OR owner_id = @OwnerId);
+
+    ;WITH cells AS (
+        SELECT pay.property_id, DATEFROMPARTS(YEAR(pay.report_date), MONTH(pay.report_date), 1) AS month_start
+        FROM dbo.payments pay
+        INNER JOIN dbo.properties p ON p.id = pay.property_id
+        WHERE (@OwnerId IS NULL OR p.owner_id = @OwnerId)
+        UNION
+        SELECT p.id, @CurrentMonth
+        FROM dbo.properties p
+        WHERE (@OwnerId IS NULL OR p.owner_id = @OwnerId)
+    )
+    INSERT INTO dbo.kpi_monthly_rollup
+        (owner_id, property_id, month_start, collected_amount, pending_amount, failed_amount,
+         payment_count, completed_count, pending_count, failed_count, active_lease_rent, active_leases)
+    SELECT p.owner_id, c.property_id, c.month_start,
+           pa.collected_amount, pa.pending_amount, pa.failed_amount,
+           pa.payment_count, pa.completed_count, pa.pending_count, pa.failed_count,
+           ls.active_lease_rent, ls.active_leases
+    FROM cells c
+    INNER JOIN dbo.properties p ON p.id = c.property_id
+    CROSS APPLY (
+        SELECT COALESCE(SUM(CASE WHEN payment_status = 'completed' THEN amount END), 0) AS collected_amount,
+               COALESCE(SUM(CASE WHEN payment_status = 'pending' THEN amount END), 0) AS pending_amount,
+               COALESCE(SUM(CASE WHEN payment_status = 'failed' THEN amount END), 0) AS failed_amount,
+               COUNT(*) AS payment_count,
+               COALESCE(SUM(CASE WHEN payment_status = 'completed' THEN 1 ELSE 0 END), 0) AS completed_count,
+               COALESCE(SUM(CASE WHEN payment_status = 'pending' THEN 1 ELSE 0 END), 0) AS pending_count,
+               COALESCE(SUM(CASE WHEN payment_status = 'failed' THEN 1 ELSE 0 END), 0) AS failed_count
+        FROM dbo.payments
+        WHERE property_id = c.property_id
+          AND report_date >= c.month_start AND report_date < DATEADD(MONTH, 1, c.month_start)
+    ) pa
+    CROSS APPLY (
+        SELECT COALESCE(SUM(rent_amount), 0) AS active_lease_rent, COUNT(*) AS active_leases
+        FROM dbo.leases
+        WHERE unit_id = c.property_id AND status = 'active'
+          AND start_date < DATEADD(MONTH, 1, c.month_start)
+          AND (end_date IS NULL OR end_date >= c.month_start)
+    ) ls;
+
+    INSERT INTO dbo.kpi_monthly_payment_mix (owner_id, property_id, month_start, tenant_id, payment_type, payment_count)
+    SELECT p.owner_id, pay.property_id, DATEFROMPARTS(YEAR(pay.report_date), MONTH(pay.report_date), 1),
+           pay.tenant_id, pay.payment_type, COUNT(*)
+    FROM dbo.payments pay
+    INNER JOIN dbo.properties p ON p.id = pay.property_id
+    WHERE (@OwnerId IS NULL OR p.owner_id = @OwnerId)
+    GROUP BY p.owner_id, pay.property_id, DATEFROMPARTS(YEAR(pay.report_date), MONTH(pay.report_date), 1),
+             pay.tenant_id, pay.payment_type;
+
+    COMMIT TRANSACTION;
+    SELECT COUNT(*) AS RollupRows FROM dbo.kpi_monthly_rollup WHERE (@OwnerId IS NULL OR owner_id = @OwnerId);
+END
+GO
+
+-- Per-month totals for an owner (or everyone) over an optional month range
+IF OBJECT_ID('dbo.sp_GetKpiRollup','P') IS NOT NULL DROP PROCEDURE dbo.sp_GetKpiRollup;
+GO
+CREATE PROCEDURE dbo.sp_GetKpiRollup
+    @OwnerId INT = NULL,
+    @StartMonth DATE = NULL,
+    @EndMonth DATE = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SELECT month_start,
+           SUM(collected_amount) AS collected_amount,
+           SUM(pending_amount) AS pending_amount,
+           SUM(failed_amount) AS failed_amount,
+           SUM(payment_count) AS payment_count,
+           SUM(completed_count) AS completed_count,
+           SUM(pending_count) AS pending_count,
+           SUM(failed_count) AS failed_count,
+           SUM(active_lease_rent) AS active_lease_rent,
+           SUM(active_leases) AS active_leases
+    FROM dbo.kpi_monthly_rollup
+    WHERE (@OwnerId IS NULL OR owner_id = @OwnerId)
+      AND (@StartMonth IS NULL OR month_start >= @StartMonth)
+      AND (@EndMonth IS NULL OR month_start <= @EndMonth)
+    GROUP BY month_start
+    ORDER BY month_start
+    OPTION (RECOMPILE);
+END
+GO
+
+-- Payment report for an exact date range (@StartDate..@EndDate, inclusive; either may be NULL).
+-- Whole months are read from the rollup; only the partial first and last months are
+-- aggregated from payments, so the cost is O(months) plus at most two months of rows.
+-- Edge months keep their month-level active lease figures from the rollup.
+IF OBJECT_ID('dbo.sp_GetPaymentReportMonths','P') IS NOT NULL DROP PROCEDURE dbo.sp_GetPaymentReportMonths;
+GO
+CREATE PROCEDURE dbo.sp_GetPaymentReportMonths
+    @OwnerId INT = NULL,
+    @StartDate DATE = NULL,
+    @EndDate DATE = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @EndExclusive DATE = DATEADD(DAY, 1, @EndDate);
+    DECLARE @StartMonth DATE = DATEFROMPARTS(YEAR(@StartDate), MONTH(@StartDate), 1);
+    DECLARE @EndMonth DATE = DATEFROMPARTS(YEAR(@EndDate), MONTH(@EndDate), 1);
+    -- [@FirstFull, @AfterLastFull) is the run of whole months inside the range (may be empty)
+    DECLARE @FirstFull DATE = CASE WHEN @StartDate = @StartMonth THEN @StartMonth ELSE DATEADD(MONTH, 1, @StartMonth) END;
+    DECLARE @AfterLastFull DATE = CASE WHEN DAY(@EndExclusive) = 1 THEN @EndExclusive ELSE @EndMonth END;
+
+    SELECT month_start,
+           SUM(collected_amount) AS collected_amount,
+           SUM(pending_amount) AS pending_amount,
+           SUM(failed_amount) AS failed_amount,
+           SUM(payment_count) AS payment_count,
+           SUM(completed_count) AS completed_count,
+           SUM(pending_count) AS pending_count,
+           SUM(failed_count) AS failed_count,
+           SUM(active_lease_rent) AS active_lease_rent,
+           SUM(active_leases) AS active_leases
+    FROM (
+        -- Whole months, payments and leases
+        SELECT month_start, collected_amount, pending_amount, failed_amount, payment_count,
+               completed_count, pending_count, failed_count, active_lease_rent, active_leases
+        FROM dbo.kpi_monthly_rollup
+        WHERE (@OwnerId IS NULL OR owner_id = @OwnerId)
+          AND (@FirstFull IS NULL OR month_start >= @FirstFull)
+          AND (@AfterLastFull IS NULL OR month_start < @AfterLastFull)
+        UNION ALL
+        -- Partial edge months: leases from the rollup cell
+        SELECT month_start, 0, 0, 0, 0, 0, 0, 0, active_lease_rent, active_leases
+        FROM dbo.kpi_monthly_rollup
+        WHERE (@OwnerId IS NULL OR owner_id = @OwnerId)
+          AND (month_start = @StartMonth OR month_start = @EndMonth)
+          AND NOT ((@FirstFull IS NULL OR month_start >= @FirstFull)
+                   AND (@AfterLastFull IS NULL OR month_start < @AfterLastFull))
+        UNION ALL
+        -- Partial edge months: payments from the base table, exact dates
+        SELECT DATEFROMPARTS(YEAR(pay.report_date), MONTH(pay.report_date), 1),
+               CASE WHEN pay.payment_status = 'completed' THEN pay.amount ELSE 0 END,
+               CASE WHEN pay.payment_status = 'pending' THEN pay.amount ELSE 0 END,
+               CASE WHEN pay.payment_status = 'failed' THEN pay.amount ELSE 0 END,
+               1,
+               CASE WHEN pay.payment_status = 'completed' THEN 1 ELSE 0 END,
+               CASE WHEN pay.payment_status = 'pending' THEN 1 ELSE 0 END,
+               CASE WHEN pay.payment_status = 'failed' THEN 1 ELSE 0 END,
+               0, 0
+        FROM dbo.payments pay
+        INNER JOIN dbo.properties p ON p.id = pay.property_id
+        WHERE (@OwnerId IS NULL OR p.owner_id = @OwnerId)
+          AND (@StartDate IS NULL OR pay.report_date >= @StartDate)
+          AND (@EndDate IS NULL OR pay.report_date < @EndExclusive)
+          AND ((@FirstFull IS NOT NULL AND pay.report_date < @FirstFull)
+               OR (@AfterLastFull IS NOT NULL AND pay.report_date >= @AfterLastFull))
+    ) cells
+    GROUP BY month_start
+    ORDER BY month_start
+    OPTION (RECOMPILE);
+END
+GO
+
+-- Non-additive report fields for the same exact range: distinct properties and tenants
+-- with payments and the most common payment type, from the mix rollup plus the edge months
+IF OBJECT_ID('dbo.sp_GetPaymentReportMix','P') IS NOT NULL DROP PROCEDURE dbo.sp_GetPaymentReportMix;
+GO
+CREATE PROCEDURE dbo.sp_GetPaymentReportMix
+    @OwnerId INT = NULL,
+    @StartDate DATE = NULL,
+    @EndDate DATE = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @EndExclusive DATE = DATEADD(DAY, 1, @EndDate);
+    DECLARE @StartMonth DATE = DATEFROMPARTS(YEAR(@StartDate), MONTH(@StartDate), 1);
+    DECLARE @EndMonth DATE = DATEFROMPARTS(YEAR(@EndDate), MONTH(@EndDate), 1);
+    DECLARE @FirstFull DATE = CASE WHEN @StartDate = @StartMonth THEN @StartMonth ELSE DATEADD(MONTH, 1, @StartMonth) END;
+    DECLARE @AfterLastFull DATE = CASE WHEN DAY(@EndExclusive) = 1 THEN @EndExclusive ELSE @EndMonth END;
+    DECLARE @mix TABLE (property_id INT, tenant_id INT NULL, payment_type NVARCHAR(50) NULL, payment_count INT);
+
+    INSERT INTO @mix (property_id, tenant_id, payment_type, payment_count)
+    SELECT property_id, tenant_id, payment_type, payment_count
+    FROM dbo.kpi_monthly_payment_mix
+    WHERE (@OwnerId IS NULL OR owner_id = @OwnerId)
+      AND (@FirstFull IS NULL OR month_start >= @FirstFull)
+      AND (@AfterLastFull IS NULL OR month_start < @AfterLastFull)
+    UNION ALL
+    SELECT pay.property_id, pay.tenant_id, pay.payment_type, 1
+    FROM dbo.payments pay
+    INNER JOIN dbo.properties p ON p.id = pay.property_id
+    WHERE (@OwnerId IS NULL OR p.owner_id = @OwnerId)
+      AND (@StartDate IS NULL OR pay.report_date >= @StartDate)
+      AND (@EndDate IS NULL OR pay.report_date < @EndExclusive)
+      AND ((@FirstFull IS NOT NULL AND pay.report_date < @FirstFull)
+           OR (@AfterLastFull IS NOT NULL AND pay.report_date >= @AfterLastFull))
+    OPTION (RECOMPILE);
+
+    SELECT (SELECT COUNT(DISTINCT property_id) FROM @mix) AS total_properties_with_payments,
+           (SELECT COUNT(DISTINCT tenant_id) FROM @mix) AS total_paying_tenants,
+           (SELECT TOP 1 payment_type FROM @mix GROUP BY payment_type ORDER BY SUM(payment_count) DESC)
+               AS most_common_payment_type;
+END
+GO
@@ -0,0 +1,71 @@
+-- Migration: canonical status values + covering indexes for hot list/report queries
+-- Safe to re-run. Apply after stored_procedures_perf.sql.
+USE [Re-own];
+GO
+
+-- 1. Normalize stored statuses so queries can use plain equality (sargable)
+--    instead of LOWER(status). The backend writes these same spellings:
+--    properties -> schemas.property.PROPERTY_STATUS_MAP, leases/payments -> lower-case.
+IF OBJECT_ID('dbo.properties','U') IS NOT NULL
+BEGIN
+    UPDATE p SET status = n.status
+    FROM dbo.properties p
+    CROSS APPLY (
+        SELECT CASE LOWER(LTRIM(RTRIM(p.status)))
+                   WHEN 'available' THEN 'Available'
+                   WHEN 'occupied' THEN 'Occupied'
+                   WHEN 'under maintenance' THEN 'Under Maintenance'
+                   WHEN 'vacant' THEN 'vacant'
+                   WHEN 'rented' THEN 'rented'
+                   WHEN 'maintenance' THEN 'maintenance'
+                   ELSE LTRIM(RTRIM(p.status))
+               END AS status
+    ) n
+    WHERE p.status COLLATE Latin1_General_BIN <> n.status COLLATE Latin1_General_BIN;
+    PRINT CONCAT('properties.status normalized: ', @@ROWCOUNT);
+END
+GO
+IF OBJECT_ID('dbo.leases','U') IS NOT NULL
+BEGIN
+    UPDATE dbo.leases SET status = LOWER(LTRIM(RTRIM(status)))
+    WHERE status COLLATE Latin1_General_BIN <> LOWER(LTRIM(RTRIM(status))) COLLATE Latin1_General_BIN;
+    PRINT CONCAT('leases.status normalized: ', @@ROWCOUNT);
+END
+GO
+IF OBJECT_ID('dbo.payments','U') IS NOT NULL
+BEGIN
+    UPDATE dbo.payments SET payment_status = LOWER(LTRIM(RTRIM(payment_status)))
+    WHERE payment_status COLLATE Latin1_General_BIN <> LOWER(LTRIM(RTRIM(payment_status))) COLLATE Latin1_General_BIN;
+    PRINT CONCAT('payments.payment_status normalized: ', @@ROWCOUNT);
+END
+GO
+
+-- 2. Covering indexes for the hot query shapes
+-- Owner lists, KPIs and keyset pages: WHERE owner_id = ? ORDER BY created_at DESC, id DESC
+IF OBJECT_ID('dbo.properties','U') IS NOT NULL
+   AND NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_properties_owner_created' AND object_id = OBJECT_ID('dbo.properties'))
+    CREATE INDEX IX_properties_owner_created ON dbo.properties(owner_id, created_at DESC, id DESC);
+GO
+
+-- /public/available: WHERE status = 'Available' ORDER BY created_at DESC (covers the projected columns)
+IF OBJECT_ID('dbo.properties','U') IS NOT NULL
+   AND NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_properties_status_created' AND object_id = OBJECT_ID('dbo.properties'))
+BEGIN
+    -- Deployments differ on the rent column name
+    DECLARE @rent SYSNAME = CASE WHEN COL_LENGTH('dbo.properties', 'rent_amount') IS NOT NULL THEN 'rent_amount' ELSE 'monthly_rent' END;
+    EXEC (N'CREATE INDEX IX_properties_status_created ON dbo.properties(status, created_at DESC) '
+        + N'INCLUDE (owner_id, title, address, property_type, bedrooms, bathrooms, area, ' + QUOTENAME(@rent) + N')');
+END
+GO
+
+-- Active lease lookups and KPI/rollup joins: WHERE unit_id = ? AND status = 'active'
+IF OBJECT_ID('dbo.leases','U') IS NOT NULL
+   AND NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_leases_unit_status' AND object_id = OBJECT_ID('dbo.leases'))
+    CREATE INDEX IX_leases_unit_status ON dbo.leases(unit_id, status) INCLUDE (tenant_id, start_date, end_date, rent_amount);
+GO
+
+-- Monthly collections / rollup rebuild: WHERE payment_status = ? AND payment_date range
+IF OBJECT_ID('dbo.payments','U') IS NOT NULL
+   AND NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_payments_date_status' AND object_id = OBJECT_ID('dbo.payments'))
+    CREATE INDEX IX_payments_date_status ON dbo.payments(payment_date, payment_status) INCLUDE (amount, property_id);
+GO
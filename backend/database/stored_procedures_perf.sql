@@ -0,0 +1,226 @@
+-- Set-based read procedures for list/report endpoints
+USE [Re-own];
+GO
+
+-- Owner lease listing: one query joining leases, properties and tenants,
+-- paged and sorted server-side. total_count carries the unpaged row count.
+IF OBJECT_ID('dbo.sp_ListOwnerLeases','P') IS NOT NULL DROP PROCEDURE dbo.sp_ListOwnerLeases;
+GO
+CREATE PROCEDURE dbo.sp_ListOwnerLeases
+    @OwnerId INT,
+    @Offset INT = 0,
+    @Limit INT = NULL,
+    @SortBy NVARCHAR(30) = 'start_date',
+    @SortDir NVARCHAR(4) = 'desc'
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SELECT l.*,
+           p.title AS property_title,
+           u.full_name AS tenant_name,
+           u.email AS tenant_email,
+           COUNT(*) OVER () AS total_count
+    FROM dbo.leases l
+    INNER JOIN dbo.properties p ON p.id = l.unit_id
+    LEFT JOIN dbo.users u ON u.id = l.tenant_id
+    WHERE p.owner_id = @OwnerId
+    ORDER BY
+        CASE WHEN @SortBy = 'start_date' AND @SortDir = 'asc' THEN l.start_date END ASC,
+        CASE WHEN @SortBy = 'start_date' AND @SortDir <> 'asc' THEN l.start_date END DESC,
+        CASE WHEN @SortBy = 'end_date' AND @SortDir = 'asc' THEN l.end_date END ASC,
+        CASE WHEN @SortBy = 'end_date' AND @SortDir <> 'asc' THEN l.end_date END DESC,
+        CASE WHEN @SortBy = 'rent_amount' AND @SortDir = 'asc' THEN l.rent_amount END ASC,
+        CASE WHEN @SortBy = 'rent_amount' AND @SortDir <> 'asc' THEN l.rent_amount END DESC,
+        CASE WHEN @SortBy = 'status' AND @SortDir = 'asc' THEN l.status END ASC,
+        CASE WHEN @SortBy = 'status' AND @SortDir <> 'asc' THEN l.status END DESC,
+        CASE WHEN @SortBy = 'created_at' AND @SortDir = 'asc' THEN l.created_at END ASC,
+        CASE WHEN @SortBy = 'created_at' AND @SortDir <> 'asc' THEN l.created_at END DESC,
+        CASE WHEN @SortBy = 'property_title' AND @SortDir = 'asc' THEN p.title END ASC,
+        CASE WHEN @SortBy = 'property_title' AND @SortDir <> 'asc' THEN p.title END DESC,
+        CASE WHEN @SortBy = 'tenant_name' AND @SortDir = 'asc' THEN u.full_name END ASC,
+        CASE WHEN @SortBy = 'tenant_name' AND @SortDir <> 'asc' THEN u.full_name END DESC,
+        l.id DESC
+    OFFSET @Offset ROWS FETCH NEXT COALESCE(@Limit, 2147483647) ROWS ONLY;
+END
+GO
+
+-- Supports the owner -> properties -> leases join and owner property pages
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_properties_owner_created' AND object_id = OBJECT_ID('dbo.properties'))
+    CREATE INDEX IX_properties_owner_created ON dbo.properties(owner_id, created_at DESC, id DESC);
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_leases_unit_status' AND object_id = OBJECT_ID('dbo.leases'))
+    CREATE INDEX IX_leases_unit_status ON dbo.leases(unit_id, status) INCLUDE (tenant_id, start_date, end_date, rent_amount);
+GO
+
+-- Owner property summary page: projection, paging and total count in SQL so
+-- the cost of a page is proportional to @Limit rather than the portfolio.
+IF OBJECT_ID('dbo.sp_ListOwnerPropertiesPage','P') IS NOT NULL DROP PROCEDURE dbo.sp_ListOwnerPropertiesPage;
+GO
+CREATE PROCEDURE dbo.sp_ListOwnerPropertiesPage
+    @OwnerId INT,
+    @Offset INT = 0,
+    @Limit INT = 25
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SELECT p.id, p.title, p.address, p.status,
+           p.monthly_rent, p.property_type, p.updated_at,
+           COUNT(*) OVER () AS total_count
+    FROM dbo.properties p
+    WHERE p.owner_id = @OwnerId
+    ORDER BY p.id DESC
+    OFFSET @Offset ROWS FETCH NEXT @Limit ROWS ONLY;
+END
+GO
+
+-- Keyset pages for the owner/renter list endpoints. Rows are ordered by
+-- (created_at DESC, id DESC); pass the last row's (created_at, id) as
+-- (@AfterKey, @AfterId) to get the next page. @Limit is page size + 1 so the
+-- caller can tell whether another page exists.
+IF OBJECT_ID('dbo.sp_ListPropertiesPage','P') IS NOT NULL DROP PROCEDURE dbo.sp_ListPropertiesPage;
+GO
+CREATE PROCEDURE dbo.sp_ListPropertiesPage
+    @OwnerId INT,
+    @Limit INT,
+    @AfterKey DATETIME2 = NULL,
+    @AfterId INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SELECT TOP (@Limit) p.*
+    FROM dbo.properties p
+    WHERE p.owner_id = @OwnerId
+      AND (@AfterId IS NULL
+           OR p.created_at < @AfterKey
+           OR (p.created_at = @AfterKey AND p.id < @AfterId))
+    ORDER BY p.created_at DESC, p.id DESC;
+END
+GO
+
+-- Owner pages cannot seek one index in (created_at, id) order because owner_id
+-- lives on properties. Instead take the first @Limit rows of each owner property
+-- from IX_payments_property_created and merge them: cost grows with the number
+-- of properties times the page size, not with the owner's payment history.
+IF OBJECT_ID('dbo.sp_ListPaymentsPage','P') IS NOT NULL DROP PROCEDURE dbo.sp_ListPaymentsPage;
+GO
+CREATE PROCEDURE dbo.sp_ListPaymentsPage
+    @OwnerId INT = NULL,
+    @TenantId INT = NULL,
+    @Limit INT,
+    @AfterKey DATETIME2 = NULL,
+    @AfterId INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF @OwnerId IS NOT NULL
+    BEGIN
+        SELECT TOP (@Limit) pay.*
+        FROM dbo.properties p
+        CROSS APPLY (
+            SELECT TOP (@Limit) x.*
+            FROM dbo.payments x
+            WHERE x.property_id = p.id
+              AND (@TenantId IS NULL OR x.tenant_id = @TenantId)
+              AND (@AfterId IS NULL
+                   OR x.created_at < @AfterKey
+                   OR (x.created_at = @AfterKey AND x.id < @AfterId))
+            ORDER BY x.created_at DESC, x.id DESC
+        ) pay
+        WHERE p.owner_id = @OwnerId
+        ORDER BY pay.created_at DESC, pay.id DESC
+        OPTION (RECOMPILE);
+        RETURN;
+    END
+
+    SELECT TOP (@Limit) pay.*
+    FROM dbo.payments pay
+    WHERE (@TenantId IS NULL OR pay.tenant_id = @TenantId)
+      AND EXISTS (SELECT 1 FROM dbo.properties p WHERE p.id = pay.property_id)
+      AND (@AfterId IS NULL
+           OR pay.created_at < @AfterKey
+           OR (pay.created_at = @AfterKey AND pay.id < @AfterId))
+    ORDER BY pay.created_at DESC, pay.id DESC
+    OPTION (RECOMPILE);
+END
+GO
+
+IF OBJECT_ID('dbo.sp_ListLeasesPage','P') IS NOT NULL DROP PROCEDURE dbo.sp_ListLeasesPage;
+GO
+CREATE PROCEDURE dbo.sp_ListLeasesPage
+    @TenantId INT = NULL,
+    @UnitId INT = NULL,
+    @Limit INT,
+    @AfterKey DATETIME2 = NULL,
+    @AfterId INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SELECT TOP (@Limit) l.*
+    FROM dbo.leases l
+    WHERE (@TenantId IS NULL OR l.tenant_id = @TenantId)
+      AND (@UnitId IS NULL OR l.unit_id = @UnitId)
+      AND (@AfterId IS NULL
+           OR l.created_at < @AfterKey
+           OR (l.created_at = @AfterKey AND l.id < @AfterId))
+    ORDER BY l.created_at DESC, l.id DESC
+    OPTION (RECOMPILE);
+END
+GO
+
+-- Seek indexes matching the keyset order of each list
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_payments_property_created' AND object_id = OBJECT_ID('dbo.payments'))
+    CREATE INDEX IX_payments_property_created ON dbo.payments(property_id, created_at DESC, id DESC);
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_payments_tenant_created' AND object_id = OBJECT_ID('dbo.payments'))
+    CREATE INDEX IX_payments_tenant_created ON dbo.payments(tenant_id, created_at DESC, id DESC);
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_leases_tenant_created' AND object_id = OBJECT_ID('dbo.leases'))
+    CREATE INDEX IX_leases_tenant_created ON dbo.leases(tenant_id, created_at DESC, id DESC);
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_leases_created' AND object_id = OBJECT_ID('dbo.leases'))
+    CREATE INDEX IX_leases_created ON dbo.leases(created_at DESC, id DESC);
+GO
+
+-- Owner dashboard KPIs in one statement: one pass over the owner's properties,
+-- their active leases, and their payments (all seeks on the indexes above).
+IF OBJECT_ID('dbo.sp_GetOwnerKpis','P') IS NOT NULL DROP PROCEDURE dbo.sp_GetOwnerKpis;
+GO
+CREATE PROCEDURE dbo.sp_GetOwnerKpis
+    @OwnerId INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @MonthStart DATE = DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1);
+    DECLARE @NextMonth DATE = DATEADD(MONTH, 1, @MonthStart);
+
+    SELECT pr.total_properties, pr.available_properties, pr.occupied_properties,
+           ls.active_tenants, ls.monthly_revenue,
+           pm.pending_amount, pm.collected_this_month, pm.billed_this_month
+    FROM (
+        SELECT COUNT(*) AS total_properties,
+               SUM(CASE WHEN p.status IN ('Available', 'vacant') THEN 1 ELSE 0 END) AS available_properties,
+               SUM(CASE WHEN p.status IN ('Occupied', 'rented') THEN 1 ELSE 0 END) AS occupied_properties
+        FROM dbo.properties p
+        WHERE p.owner_id = @OwnerId
+    ) pr
+    CROSS JOIN (
+        SELECT COUNT(DISTINCT l.tenant_id) AS active_tenants,
+               COALESCE(SUM(l.rent_amount), 0) AS monthly_revenue
+        FROM dbo.leases l
+        INNER JOIN dbo.properties p ON p.id = l.unit_id
+        WHERE p.owner_id = @OwnerId
+          AND l.status = 'active'
+          AND (l.end_date IS NULL OR l.end_date > GETDATE())
+    ) ls
+    CROSS JOIN (
+        SELECT COALESCE(SUM(CASE WHEN pay.payment_status IN ('pending', 'failed') THEN pay.amount ELSE 0 END), 0) AS pending_amount,
+               COALESCE(SUM(CASE WHEN pay.payment_date >= @MonthStart AND pay.payment_date < @NextMonth
+                                  AND pay.payment_status = 'completed' THEN pay.amount ELSE 0 END), 0) AS collected_this_month,
+               COALESCE(SUM(CASE WHEN pay.payment_date >= @MonthStart AND pay.payment_date < @NextMonth
+                                 THEN pay.amount ELSE 0 END), 0) AS billed_this_month
+        FROM dbo.payments pay
+        INNER JOIN dbo.properties p ON p.id = pay.property_id
+        WHERE p.owner_id = @OwnerId
+    ) pm;
+END
+GO
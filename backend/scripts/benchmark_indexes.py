@@ -0,0 +1,227 @@
+"""
+Before/after benchmark for backend/database/migrate_status_indexes.sql.
+
+Seeds scratch copies of properties, leases and payments into a
+``bench`` schema (the application tables are never touched), then:
+
+  before: mixed-case statuses, no secondary indexes, LOWER(status) filters
+  after:  statuses normalized, the migration's indexes created, plain equality
+
+For each hot query shape it prints the median time over --repeat runs and the
+physical plan operators (e.g. Clustered Index Scan -> Index Seek).
+
+Run from the repository root (uses the same DB_* environment variables as the app):
+
+    python -m backend.scripts.benchmark_indexes
+    python -m backend.scripts.benchmark_indexes --properties 50000 --repeat 30 --keep
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+
+from backend.app.database import StoredProcedures, db_pool
+
+SCHEMA = "bench"
+
+SETUP = [
+    f"IF SCHEMA_ID('{SCHEMA}') IS NULL EXEC('CREATE SCHEMA {SCHEMA}')",
+    f"""CREATE TABLE {SCHEMA}.properties (
+        id INT IDENTITY(1,1) PRIMARY KEY, owner_id INT NOT NULL, title NVARCHAR(200) NOT NULL,
+        address NVARCHAR(500) NOT NULL, property_type NVARCHAR(50) NOT NULL, status NVARCHAR(50) NOT NULL,
+        bedrooms INT NULL, bathrooms DECIMAL(10,2) NULL, area DECIMAL(10,2) NULL, rent_amount DECIMAL(10,2) NULL,
+        description NVARCHAR(MAX) NULL, created_at DATETIME2 NOT NULL)""",
+    f"""CREATE TABLE {SCHEMA}.leases (
+        id INT IDENTITY(1,1) PRIMARY KEY, tenant_id INT NOT NULL, unit_id INT NOT NULL,
+        start_date DATE NOT NULL, end_date DATE NULL, rent_amount DECIMAL(10,2) NOT NULL,
+        status NVARCHAR(20) NOT NULL, created_at DATETIME2 NOT NULL)""",
+    f"""CREATE TABLE {SCHEMA}.payments (
+        id INT IDENTITY(1,1) PRIMARY KEY, property_id INT NOT NULL, tenant_id INT NOT NULL,
+        amount DECIMAL(10,2) NOT NULL, payment_type NVARCHAR(20) NOT NULL, payment_status NVARCHAR(20) NOT NULL,
+        payment_date DATE NULL, created_at DATETIME2 NOT NULL)""",
+]
+
+# Set-based seeding from a numbers CTE; statuses deliberately use inconsistent casing
+SEED = [
+    f""";WITH n AS (SELECT TOP (?) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+                   FROM sys.all_objects a CROSS JOIN sys.all_objects b)
+        INSERT INTO {SCHEMA}.properties (owner_id, title, address, property_type, status, bedrooms, bathrooms,
+                                         area, rent_amount, description, created_at)
+        SELECT i % ? + 1, CONCAT('Property ', i), CONCAT(i, ' Bench Street'), 'Flat',
+               CHOOSE(i % 6 + 1, 'Available', 'available', 'AVAILABLE ', 'Occupied', 'rented', 'maintenance'),
+               i % 4 + 1, 1, 650, 500 + i % 1500, REPLICATE(N'x', 400), DATEADD(MINUTE, -i, SYSUTCDATETIME())
+        FROM n""",
+    f""";WITH n AS (SELECT TOP (?) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+                   FROM sys.all_objects a CROSS JOIN sys.all_objects b)
+        INSERT INTO {SCHEMA}.leases (tenant_id, unit_id, start_date, end_date, rent_amount, status, created_at)
+        SELECT i % 5000 + 1, (i - 1) % (SELECT COUNT(*) FROM {SCHEMA}.properties) + 1,
+               DATEADD(DAY, -(i % 900), CAST(GETDATE() AS DATE)), NULL, 500 + i % 1500,
+               CHOOSE(i % 4 + 1, 'active', 'Active', 'terminated', 'expired'), DATEADD(MINUTE, -i, SYSUTCDATETIME())
+        FROM n""",
+    f""";WITH n AS (SELECT TOP (?) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+                   FROM sys.all_objects a CROSS JOIN sys.all_objects b)
+        INSERT INTO {SCHEMA}.payments (property_id, tenant_id, amount, payment_type, payment_status, payment_date, created_at)
+        SELECT (i - 1) % (SELECT COUNT(*) FROM {SCHEMA}.properties) + 1, i % 5000 + 1, 500 + i % 1500, 'rent',
+               CHOOSE(i % 5 + 1, 'completed', 'Completed', 'COMPLETED', 'pending', 'failed'),
+               DATEADD(DAY, -(i % 1095), CAST(GETDATE() AS DATE)), DATEADD(MINUTE, -i, SYSUTCDATETIME())
+        FROM n""",
+]
+
+# Same statements as migrate_status_indexes.sql, pointed at the bench tables
+MIGRATE = [
+    f"""UPDATE {SCHEMA}.properties SET status = CASE LOWER(LTRIM(RTRIM(status)))
+            WHEN 'available' THEN 'Available' WHEN 'occupied' THEN 'Occupied'
+            WHEN 'under maintenance' THEN 'Under Maintenance' ELSE LOWER(LTRIM(RTRIM(status))) END""",
+    f"UPDATE {SCHEMA}.leases SET status = LOWER(LTRIM(RTRIM(status)))",
+    f"UPDATE {SCHEMA}.payments SET payment_status = LOWER(LTRIM(RTRIM(payment_status)))",
+    f"CREATE INDEX IX_properties_owner_created ON {SCHEMA}.properties(owner_id, created_at DESC, id DESC)",
+    f"""CREATE INDEX IX_properties_status_created ON {SCHEMA}.properties(status, created_at DESC)
+        INCLUDE (owner_id, title, address, property_type, bedrooms, bathrooms, area, rent_amount)""",
+    f"""CREATE INDEX IX_leases_unit_status ON {SCHEMA}.leases(unit_id, status)
+        INCLUDE (tenant_id, start_date, end_date, rent_amount)""",
+    f"CREATE INDEX IX_payments_date_status ON {SCHEMA}.payments(payment_date, payment_status) INCLUDE (amount, property_id)",
+]
+
+# name -> (before SQL, after SQL, params). The "before" shapes are what the code ran previously.
+QUERIES = {
+    "public_available": (
+        f"""SELECT TOP 12 p.id, p.title, p.address, p.property_type, p.bedrooms, p.bathrooms, p.area,
+                   p.rent_amount, p.status, p.created_at
+            FROM {SCHEMA}.properties p WHERE LOWER(p.status) = 'available' ORDER BY p.created_at DESC""",
+        f"""SELECT TOP 12 p.id, p.title, p.address, p.property_type, p.bedrooms, p.bathrooms, p.area,
+                   p.rent_amount, p.status, p.created_at
+            FROM {SCHEMA}.properties p WHERE p.status = 'Available' ORDER BY p.created_at DESC""",
+        [],
+    ),
+    "owner_properties_page": (
+        f"SELECT TOP 26 id, title, status, created_at FROM {SCHEMA}.properties WHERE owner_id = ? ORDER BY created_at DESC, id DESC",
+        f"SELECT TOP 26 id, title, status, created_at FROM {SCHEMA}.properties WHERE owner_id = ? ORDER BY created_at DESC, id DESC",
+        [7],
+    ),
+    "active_lease_by_property": (
+        f"""SELECT TOP 1 id, tenant_id, rent_amount FROM {SCHEMA}.leases
+            WHERE unit_id = ? AND LOWER(status) = 'active' AND (end_date IS NULL OR end_date > GETDATE())""",
+        f"""SELECT TOP 1 id, tenant_id, rent_amount FROM {SCHEMA}.leases
+            WHERE unit_id = ? AND status = 'active' AND (end_date IS NULL OR end_date > GETDATE())""",
+        [42],
+    ),
+    "monthly_collections": (
+        f"""SELECT TOP 6 CONVERT(VARCHAR(7), payment_date, 120) AS ym, SUM(amount) AS total
+            FROM {SCHEMA}.payments WHERE LOWER(payment_status) = 'completed'
+            GROUP BY CONVERT(VARCHAR(7), payment_date, 120) ORDER BY ym DESC""",
+        f"""SELECT TOP 6 CONVERT(VARCHAR(7), payment_date, 120) AS ym, SUM(amount) AS total
+            FROM {SCHEMA}.payments WHERE payment_status = 'completed'
+              AND payment_date >= DATEADD(MONTH, -6, CAST(GETDATE() AS DATE))
+            GROUP BY CONVERT(VARCHAR(7), payment_date, 120) ORDER BY ym DESC""",
+        [],
+    ),
+}
+
+_RELOP = re.compile(r'<RelOp [^>]*PhysicalOp="([^"]+)"')
+_INDEX = re.compile(r'<Object [^>]*Index="\[([^\]]+)\]"')
+
+
+def _execute(cursor, sql, params):
+    if params:
+        cursor.execute(sql, params)
+    else:
+        cursor.execute(sql)
+
+
+def _plan(cursor, sql, params) -> str:
+    """Physical operators and indexes from the actual execution plan."""
+    cursor.execute("SET STATISTICS XML ON")
+    try:
+        _execute(cursor, sql, params)
+        cursor.fetchall()
+        xml = ""
+        while cursor.nextset():
+            row = cursor.fetchone()
+            if row and isinstance(row[0], str) and "ShowPlanXML" in row[0]:
+                xml = row[0]
+    finally:
+        cursor.execute("SET STATISTICS XML OFF")
+    ops = list(dict.fromkeys(_RELOP.findall(xml)))
+    indexes = list(dict.fromkeys(_INDEX.findall(xml)))
+    return ", ".join(ops) + (f" [{', '.join(indexes)}]" if indexes else "")
+
+
+def _time(cursor, sql, params, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _execute(cursor, sql, params)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _run_phase(cursor, phase: int, repeat: int) -> dict:
+    results = {}
+    for name, queries in QUERIES.items():
+        sql, params = queries[phase], queries[2]
+        _execute(cursor, sql, params)  # warm the buffer pool and plan cache
+        cursor.fetchall()
+        results[name] = (_time(cursor, sql, params, repeat), _plan(cursor, sql, params))
+    return results
+
+
+def _drop(cursor):
+    for table in ("payments", "leases", "properties"):
+        cursor.execute(f"IF OBJECT_ID('{SCHEMA}.{table}','U') IS NOT NULL DROP TABLE {SCHEMA}.{table}")
+    cursor.execute(f"IF SCHEMA_ID('{SCHEMA}') IS NOT NULL EXEC('DROP SCHEMA {SCHEMA}')")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark status normalization and covering indexes")
+    parser.add_argument("--properties", type=int, default=20000)
+    parser.add_argument("--owners", type=int, default=200)
+    parser.add_argument("--leases", type=int, default=40000)
+    parser.add_argument("--payments", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Leave the bench schema in place afterwards")
+    args = parser.parse_args(argv)
+
+    try:
+        with StoredProcedures.connection() as conn:
+            cursor = conn.cursor()
+            _drop(cursor)
+            for sql in SETUP:
+                cursor.execute(sql)
+            seed_params = [[args.properties, args.owners], [args.leases], [args.payments]]
+            for sql, params in zip(SEED, seed_params):
+                cursor.execute(sql, params)
+            conn.commit()
+            print(f"Seeded {args.properties} properties ({args.owners} owners), {args.leases} leases, "
+                  f"{args.payments} payments")
+
+            before = _run_phase(cursor, 0, args.repeat)
+            for sql in MIGRATE:
+                cursor.execute(sql)
+            cursor.execute(f"UPDATE STATISTICS {SCHEMA}.properties; UPDATE STATISTICS {SCHEMA}.leases; "
+                           f"UPDATE STATISTICS {SCHEMA}.payments;")
+            conn.commit()
+            after = _run_phase(cursor, 1, args.repeat)
+
+            print(f"\n{'query':<26}{'before ms':>11}{'after ms':>11}{'speedup':>9}")
+            for name in QUERIES:
+                b, a = before[name][0], after[name][0]
+                print(f"{name:<26}{b:>11.2f}{a:>11.2f}{(b / a if a else 0):>8.1f}x")
+            print("\nPlans")
+            for name in QUERIES:
+                print(f"  {name}\n    before: {before[name][1]}\n    after:  {after[name][1]}")
+
+            if not args.keep:
+                _drop(cursor)
+                conn.commit()
+    except Exception as e:
+        print(f"Benchmark failed: {e}")
+        return 1
+    finally:
+        db_pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Garbage-collect unreferenced document blobs (see backend/app/core/blob_store.py).
+
+Run from the repository root (uses the same DB_* environment variables as the app):
+
+    python -m backend.scripts.gc_blobs                   # remove blobs unreferenced for 24h
+    python -m backend.scripts.gc_blobs --grace-minutes 60
+    python -m backend.scripts.gc_blobs --dry-run         # only list what would be removed
+
+Reference counts are re-derived from property_documents first, so documents
+removed by property deletes or direct SQL are accounted for. Abandoned upload
+temp files older than the grace period are removed as well.
+"""
+import argparse
+import os
+import sys
+import time
+
+from backend.app.core.blob_store import BLOB_DIR, blob_abspath
+from backend.app.database import StoredProcedures, db_pool
+
+
+def _remove_stale_temps(grace_seconds: float, dry_run: bool) -> int:
+    tmp_dir = os.path.join(BLOB_DIR, ".tmp")
+    removed = 0
+    cutoff = time.time() - grace_seconds
+    try:
+        entries = list(os.scandir(tmp_dir))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+            removed += 1
+    return removed
+
+
+def _remove_blob(path: str, sha256: str) -> bool:
+    """Move the file aside, then delete it only if no upload registered the blob meanwhile.
+
+    An upload registers its reference before checking for the file, so it either
+    sees the file gone (and writes its own copy) or is seen by the re-check here.
+    """
+    collecting = path + ".collecting"
+    try:
+        os.replace(path, collecting)
+    except FileNotFoundError:
+        return False
+    if StoredProcedures.document_blob_exists(sha256):
+        # Same content either way, even if the upload already wrote its own copy
+        os.replace(collecting, path)
+        return False
+    os.remove(collecting)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove document blobs no longer referenced by any document")
+    parser.add_argument("--grace-minutes", type=int, default=1440,
+                        help="Only remove blobs unreferenced for at least this long (default 1440)")
+    parser.add_argument("--dry-run", action="store_true", help="List candidates without deleting anything")
+    args = parser.parse_args(argv)
+
+    files = freed = 0
+    try:
+        blobs = StoredProcedures.collect_document_blobs(args.grace_minutes, args.dry_run)
+        for blob in blobs:
+            path = blob_abspath(blob["storage_path"])
+            if args.dry_run:
+                print(f"would remove {blob['storage_path']} ({blob['size_bytes']} bytes)")
+                continue
+            # A re-upload between the DB delete and here registers the blob again; keep its file
+            if StoredProcedures.document_blob_exists(blob["sha256"]):
+                continue
+            if _remove_blob(path, blob["sha256"]):
+                files += 1
+                freed += int(blob["size_bytes"] or 0)
+        temps = _remove_stale_temps(args.grace_minutes * 60, args.dry_run)
+    except Exception as e:
+        print(f"Blob GC failed: {e}")
+        return 1
+    finally:
+        db_pool.close()
+
+    if args.dry_run:
+        print(f"{len(blobs)} blobs and {temps} stale temp files would be removed")
+    else:
+        print(f"Removed {files} blobs ({freed} bytes) and {temps} stale temp files")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
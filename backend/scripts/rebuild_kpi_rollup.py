@@ -0,0 +1,39 @@
+"""
+Rebuild the monthly KPI rollup (kpi_monthly_rollup) from payments and leases.
+
+Run from the repository root (uses the same DB_* environment variables as the app):
+
+    python -m backend.scripts.rebuild_kpi_rollup            # all owners
+    python -m backend.scripts.rebuild_kpi_rollup --owner 12 # one owner
+
+The backend keeps the rollup current on every payment/lease write; use this
+after installing backend/database/kpi_rollup.sql, after bulk imports or direct
+SQL edits, or if the app logged "KPI rollup refresh failed" warnings.
+"""
+import argparse
+import sys
+import time
+
+from backend.app.database import StoredProcedures, db_pool
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the monthly KPI rollup table")
+    parser.add_argument("--owner", type=int, default=None, help="Only rebuild rows for this owner id")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        rows = StoredProcedures.rebuild_kpi_rollup(args.owner)
+    except Exception as e:
+        print(f"Rollup rebuild failed: {e}")
+        return 1
+    finally:
+        db_pool.close()
+    scope = f"owner {args.owner}" if args.owner is not None else "all owners"
+    print(f"Rebuilt KPI rollup for {scope}: {rows} rows in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
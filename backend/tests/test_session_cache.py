@@ -0,0 +1,63 @@
+"""Revocation vs. in-flight session verification (core/session_cache.py)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app.core.session_cache import SessionCache
+
+
+def _expires():
+    return datetime.utcnow() + timedelta(minutes=30)
+
+
+def test_put_active_after_invalidate_is_ignored():
+    cache = SessionCache(ttl=60)
+    # verify: cache miss, reads the row while the session is still active
+    assert cache.get("sid") is None
+    row_expires = _expires()
+    # revoke commits and invalidates
+    cache.invalidate("sid")
+    # verify finishes and tries to cache its stale verdict
+    cache.put("sid", True, row_expires)
+    assert cache.get("sid") is False
+
+
+def test_revoked_marker_expires_with_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.app.core.session_cache.time.monotonic", lambda: now[0])
+    cache = SessionCache(ttl=15)
+    cache.invalidate("sid")
+    now[0] += 16
+    assert cache.get("sid") is None
+    cache.put("sid", True, _expires())
+    assert cache.get("sid") is True
+
+
+def test_invalidate_does_not_block_other_sids():
+    cache = SessionCache(ttl=60)
+    cache.invalidate("revoked")
+    cache.put("other", True, _expires())
+    assert cache.get("other") is True
+
+
+def test_verify_racing_revoke_does_not_cache_active(monkeypatch):
+    pytest.importorskip("jose")
+    pytest.importorskip("passlib")
+    pytest.importorskip("pyodbc")
+    from backend.app.core import security
+    from backend.app.core.session_cache import session_cache
+
+    sid = "race-sid"
+    session_cache.invalidate(sid)
+    session_cache._entries.pop(sid, None)
+
+    def get_session(_sid):
+        # The row is read as active, then the revoke commits before the verify caches it
+        row = (None, _expires())
+        session_cache.invalidate(_sid)
+        return row
+
+    monkeypatch.setattr(security.StoredProcedures, "get_session", staticmethod(get_session))
+    monkeypatch.setattr(security.StoredProcedures, "touch_session", staticmethod(lambda _sid: None))
+    security._db_session_is_active(sid)
+    assert session_cache.get(sid) is False
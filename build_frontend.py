@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""
+Build frontend/public into frontend/dist: bundled, minified, fingerprinted and precompressed.
+
+    python build_frontend.py            # writes frontend/dist and frontend/dist/manifest.json
+    python serve_frontend.py            # serves frontend/dist when it exists
+
+For each HTML page, every run of consecutive local <script src="js/..."> tags
+(and of <link rel="stylesheet" href="css/...">) is concatenated in order into
+one bundle, so execution order is unchanged; CDN and inline scripts end a run.
+Bundles and any remaining local JS/CSS are minified and written as
+name.<hash>.ext, which serve_frontend.py and the backend serve as immutable.
+Compressible outputs get .gz (and .br when the brotli package is installed)
+siblings. HTML pages keep their names and are revalidated on every visit.
+
+rjsmin/rcssmin are used for minification when installed; otherwise a
+conservative built-in minifier strips comments and indentation only.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+ROOT = Path(__file__).parent
+SRC = ROOT / 'frontend' / 'public'
+DIST = ROOT / 'frontend' / 'dist'
+HASH_LEN = 10
+NODE = shutil.which('node')
+PRECOMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_SUFFIXES = {'.html', '.js', '.css', '.svg', '.json', '.txt', '.map'}
+
+SCRIPT_TAG = re.compile(r'<script\s+src="(js/[^"?#]+\.js)"\s*>\s*</script>')
+STYLE_TAG = re.compile(r'<link\s+rel="stylesheet"\s+href="(css/[^"?#]+\.css)"\s*/?>')
+# Only whitespace and HTML comments may sit between tags of one run
+GAP = re.compile(r'^(\s|<!--.*?-->)*$', re.S)
+
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                  'instanceof', 'yield', 'await'}
+
+
+def minify_js(src: str) -> str:
+    """Strip comments, indentation and blank lines; strings, templates and regex literals are kept verbatim."""
+    if rjsmin is not None:
+        return rjsmin.jsmin(src)
+    out = []
+    i, n = 0, len(src)
+    template_depths = []  # brace depth at which each open ${ ... } returns to its template
+    depth = 0
+
+    def last_significant():
+        for chunk in reversed(out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped
+        return ''
+
+    def copy_template(i):
+        # Copy template text up to the closing backtick or the next ${
+        start = i
+        while i < n:
+            c = src[i]
+            if c == '\\':
+                i += 2
+                continue
+            if c == '`':
+                out.append(src[start:i + 1])
+                return i + 1, False
+            if c == '$' and i + 1 < n and src[i + 1] == '{':
+                out.append(src[start:i + 2])
+                return i + 2, True
+            i += 1
+        out.append(src[start:])
+        return n, False
+
+    while i < n:
+        c = src[i]
+        if c in '"\'':
+            j = i + 1
+            while j < n and src[j] != c:
+                j += 2 if src[j] == '\\' else 1
+            out.append(src[i:j + 1])
+            i = j + 1
+        elif c == '`':
+            out.append('`')
+            i, opened = copy_template(i + 1)
+            if opened:
+                template_depths.append(depth)
+        elif c == '{':
+            depth += 1
+            out.append(c)
+            i += 1
+        elif c == '}':
+            if template_depths and template_depths[-1] == depth:
+                template_depths.pop()
+                out.append('}')
+                i, opened = copy_template(i + 1)
+                if opened:
+                    template_depths.append(depth)
+                continue
+            depth -= 1
+            out.append(c)
+            i += 1
+        elif c == '/' and i + 1 < n and src[i + 1] == '/':
+            while i < n and src[i] != '\n':
+                i += 1
+        elif c == '/' and i + 1 < n and src[i + 1] == '*':
+            end = src.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            out.append('\n' if '\n' in src[i:end] else ' ')
+            i = end
+        elif c == '/':
+            prev = last_significant()
+            word = re.search(r'[A-Za-z_$][\w$]*$', prev)
+            if not prev or prev[-1] in REGEX_PRECEDERS or (word and word.group(0) in REGEX_KEYWORDS):
+                j, in_class = i + 1, False
+                while j < n and src[j] != '\n':
+                    if src[j] == '\\':
+                        j += 2
+                        continue
+                    if src[j] == '[':
+                        in_class = True
+                    elif src[j] == ']':
+                        in_class = False
+                    elif src[j] == '/' and not in_class:
+                        break
+                    j += 1
+                j += 1
+                while j < n and (src[j].isalnum()):
+                    j += 1
+                out.append(src[i:j])
+                i = j
+            else:
+                out.append(c)
+                i += 1
+        elif c == '\n':
+            while out and out[-1] == ' ':
+                out.pop()
+            if out and not out[-1].endswith('\n'):
+                out.append('\n')
+            i += 1
+        elif c in ' \t\r':
+            if out and not out[-1].endswith(('\n', ' ')):
+                out.append(' ')
+            i += 1
+        else:
+            j = i + 1
+            while j < n and src[j] not in '"\'`{}/\n \t\r':
+                j += 1
+            out.append(src[i:j])
+            i = j
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(src: str) -> str:
+    """Strip comments and collapse whitespace around braces, semicolons and commas."""
+    if rcssmin is not None:
+        return rcssmin.cssmin(src)
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', src)
+    for k in range(0, len(parts), 2):
+        css = re.sub(r'/\*.*?\*/', '', parts[k], flags=re.S)
+        css = re.sub(r'\s+', ' ', css)
+        css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+        parts[k] = css.replace(';}', '}')
+    return ''.join(parts).strip() + '\n'
+
+
+def fingerprint(rel_path: str, content: bytes) -> str:
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LEN]}{ext}"
+
+
+class Build:
+    def __init__(self, src: Path, dist: Path):
+        self.src = src
+        self.dist = dist
+        self.assets = {}   # source path -> fingerprinted path (single files)
+        self.bundles = {}  # fingerprinted bundle path -> [source paths]
+        self.pages = {}    # page -> [asset paths it references]
+        self.missing = set()
+        self.broken = set()
+        self.syntax_ok = {}
+
+    def parses(self, rel_path: str) -> bool:
+        """Syntax-check a script with ``node --check`` when node is installed (otherwise assume it parses)."""
+        if rel_path not in self.syntax_ok:
+            ok = True
+            if NODE:
+                proc = subprocess.run([NODE, '--check', str(self.src / rel_path)], capture_output=True, text=True)
+                ok = proc.returncode == 0
+                if not ok:
+                    self.broken.add(rel_path)
+            self.syntax_ok[rel_path] = ok
+        return self.syntax_ok[rel_path]
+
+    def write(self, rel_path: str, content: bytes):
+        target = self.dist / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+
+    def emit(self, kind: str, sources: list) -> str:
+        """Minify and write one asset (or a bundle of several); returns its fingerprinted path."""
+        if len(sources) == 1 and sources[0] in self.assets:
+            return self.assets[sources[0]]
+        texts = [(self.src / s).read_text(encoding='utf-8') for s in sources]
+        if kind == 'js':
+            # ';' guards against a file that ends without a semicolon
+            content = ';\n'.join(minify_js(t) for t in texts)
+        else:
+            content = ''.join(minify_css(t) for t in texts)
+        data = content.encode('utf-8')
+        if len(sources) == 1:
+            out = fingerprint(sources[0], data)
+            self.assets[sources[0]] = out
+        else:
+            out = fingerprint(f"{kind}/bundle.{kind}", data)
+            self.bundles[out] = sources
+        self.write(out, data)
+        return out
+
+    def rewrite_runs(self, html: str, pattern, kind: str, make_tag) -> tuple:
+        result, refs, run, last_end = [], [], [], 0
+
+        def flush():
+            if not run:
+                return
+            sources = [m.group(1) for m in run if (self.src / m.group(1)).is_file()]
+            for m in run:
+                if not (self.src / m.group(1)).is_file():
+                    self.missing.add(m.group(1))
+            # A file that doesn't parse would take its whole bundle down with it; keep it on its own
+            groups, current = [], []
+            for source in sources:
+                if kind == 'js' and not self.parses(source):
+                    groups += [current, [source]] if current else [[source]]
+                    current = []
+                else:
+                    current.append(source)
+            if current:
+                groups.append(current)
+            for group in groups:
+                out = self.emit(kind, group)
+                refs.append(out)
+                result.append(make_tag(out))
+            run.clear()
+
+        for m in pattern.finditer(html):
+            gap = html[last_end:m.start()]
+            if run and not GAP.match(gap):
+                flush()
+            if not run:
+                result.append(gap)
+            run.append(m)
+            last_end = m.end()
+        flush()
+        result.append(html[last_end:])
+        return ''.join(result), refs
+
+    def page(self, rel_path: str):
+        html = (self.src / rel_path).read_text(encoding='utf-8')
+        html, scripts = self.rewrite_runs(html, SCRIPT_TAG, 'js', lambda p: f'<script src="{p}"></script>')
+        html, styles = self.rewrite_runs(html, STYLE_TAG, 'css', lambda p: f'<link rel="stylesheet" href="{p}">')
+        self.pages[rel_path] = styles + scripts
+        self.write(rel_path, html.encode('utf-8'))
+
+    def run(self):
+        if self.dist.exists():
+            shutil.rmtree(self.dist)
+        # Everything except JS/CSS is copied as-is (images, icons, pages are rewritten below)
+        for path in sorted(self.src.rglob('*')):
+            rel = path.relative_to(self.src).as_posix()
+            if path.is_file() and path.suffix not in ('.js', '.css', '.html'):
+                self.write(rel, path.read_bytes())
+        for path in sorted(self.src.rglob('*.html')):
+            self.page(path.relative_to(self.src).as_posix())
+        # JS/CSS not referenced by any page stay reachable under a fingerprinted name
+        for path in sorted(list(self.src.rglob('*.js')) + list(self.src.rglob('*.css'))):
+            rel = path.relative_to(self.src).as_posix()
+            if rel not in self.assets:
+                self.emit(path.suffix[1:], [rel])
+        self.precompress()
+        manifest = {'assets': self.assets, 'bundles': self.bundles, 'pages': self.pages}
+        self.write('manifest.json', json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    def precompress(self):
+        for path in sorted(self.dist.rglob('*')):
+            if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+                continue
+            data = path.read_bytes()
+            if len(data) < PRECOMPRESS_MIN_BYTES:
+                continue
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data, quality=11)))
+            for suffix, compressed in variants:
+                if len(compressed) < len(data):
+                    Path(str(path) + suffix).write_bytes(compressed)
+
+
+def _transfer(root: Path, paths, compressed: bool) -> int:
+    total = 0
+    for rel in paths:
+        path = root / rel
+        gz = Path(str(path) + '.gz')
+        total += (gz if compressed and gz.exists() else path).stat().st_size
+    return total
+
+
+def main():
+    build = Build(SRC, DIST)
+    build.run()
+    for missing in sorted(build.missing):
+        print(f"warning: referenced asset not found, tag dropped: {missing}")
+    for broken in sorted(build.broken):
+        print(f"warning: {broken} does not parse (node --check); served unbundled")
+    print(f"Built {len(build.pages)} pages, {len(build.bundles)} bundles, {len(build.assets)} assets into {DIST}")
+    print(f"{'page':<30}{'requests':>10}{'source bytes':>14}{'gzip bytes':>12}")
+    for page, refs in sorted(build.pages.items()):
+        html = (SRC / page).read_text(encoding='utf-8')
+        sources = [m.group(1) for pattern in (STYLE_TAG, SCRIPT_TAG) for m in pattern.finditer(html)
+                   if (SRC / m.group(1)).is_file()]
+        print(f"{page:<30}{f'{len(sources)} -> {len(refs)}':>10}{_transfer(SRC, sources, False):>14}"
+              f"{_transfer(DIST, refs, True):>12}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
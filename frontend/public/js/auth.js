@@ -169,6 +169,13 @@ class Auth {
             let title = 'Login Failed';
             let text = error.message || 'Please try again.';
             switch (error.errorCode) {
+                case 'INVALID_CREDENTIALS':
+                    text = 'Incorrect email or password. Please try again.';
+                    break;
+                case 'TOO_MANY_ATTEMPTS':
+                    title = 'Too Many Attempts';
+                    text = 'Too many login attempts. Please wait a moment and try again.';
+                    break;
                 case 'EMAIL_NOT_FOUND':
                     text = 'Email address not found. Please check or register a new account.';
                     break;
@@ -183,6 +190,7 @@ class Auth {
                     // Fallbacks based on status
                     if (error.status === 404) text = 'Email address not found.';
                     else if (error.status === 401) text = 'Incorrect email or password.';
+                    else if (error.status === 429) text = 'Too many login attempts. Please wait a moment and try again.';
                     break;
             }
             Swal.fire({ icon: 'error', title, text });
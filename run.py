@@ -9,8 +9,17 @@ if __name__ == "__main__":
     print("Starting backend...")
     backend = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.app.main:app", "--reload"])
     
+    # frontend/public is served as-is so edits show up on reload; --dist builds and
+    # serves the bundled, fingerprinted frontend/dist instead (production check)
+    serve_args = [sys.executable, "serve_frontend.py"]
+    if "--dist" in sys.argv[1:]:
+        print("Building frontend...")
+        if subprocess.call([sys.executable, "build_frontend.py"]) == 0:
+            serve_args.append("--dist")
+        else:
+            print("Warning: frontend build failed; serving frontend/public")
     print("Starting frontend...")
-    frontend = subprocess.Popen([sys.executable, "-m", "http.server", "8080"], cwd="frontend/public")
+    frontend = subprocess.Popen(serve_args)
     
     # Write PIDs to file for restart/stop scripts
     pid_file = os.path.join(os.getcwd(), "reown_pids.json")
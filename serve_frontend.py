@@ -1,25 +1,148 @@
 #!/usr/bin/env python
 import http.server
-import socketserver
 import os
+import re
+import sys
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 
+# Fingerprinted names (app.3f2a9c1b.js) never change content, so they can be cached for a year.
+# Everything else is revalidated on each use (ETag / Last-Modified -> 304) instead of re-downloaded.
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        return super().end_headers()
+    # Keep-alive: every response carries Content-Length, so one connection serves all of a page's assets
+    protocol_version = 'HTTP/1.1'
 
     def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
         # If path is just / or a directory, serve index.html
         if self.path == '/' or self.path.endswith('/'):
             self.path = '/index.html'
-        return super().do_GET()
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            f = self.send_head()  # 404 / redirects as before
+            if f:
+                try:
+                    if send_body:
+                        self.copyfile(f, self.wfile)
+                finally:
+                    f.close()
+            return
+
+        ctype = self.guess_type(path)
+        served, encoding = path, None
+        if ctype.startswith(COMPRESSIBLE):
+            accepted = {p.split(';')[0].strip().lower() for p in self.headers.get('Accept-Encoding', '').split(',')}
+            for name, suffix in ENCODINGS:
+                if name in accepted and os.path.isfile(path + suffix):
+                    served, encoding = path + suffix, name
+                    break
+
+        st = os.stat(served)
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        cache_control = IMMUTABLE_CACHE if FINGERPRINTED.search(path) else REVALIDATE_CACHE
+        validators = {
+            'ETag': etag,
+            'Last-Modified': self.date_time_string(st.st_mtime),
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+
+        if self._not_modified(etag, st.st_mtime):
+            self.send_response(304)
+            for k, v in validators.items():
+                self.send_header(k, v)
+            self.end_headers()
+            return
+
+        start, length, status = 0, st.st_size, 200
+        range_header = self.headers.get('Range')
+        if range_header and RANGE.match(range_header.strip()) and self.headers.get('If-Range', etag) == etag:
+            byte_range = self._parse_range(range_header, st.st_size)
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{st.st_size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            start, end = byte_range
+            length, status = end - start + 1, 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(length))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{start + length - 1}/{st.st_size}')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        for k, v in validators.items():
+            self.send_header(k, v)
+        self.end_headers()
+        if send_body and length:
+            with open(served, 'rb') as f:
+                # socket.sendfile uses os.sendfile (zero-copy) where the platform has it
+                self.wfile.flush()
+                self.connection.sendfile(f, offset=start, count=length)
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [t.strip() for t in if_none_match.split(',')]
+            return '*' in tags or etag in tags or ('W/' + etag) in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _parse_range(header, size):
+        """Single 'bytes=a-b' / 'bytes=a-' / 'bytes=-n' range -> (start, end), or None if unsatisfiable."""
+        if size == 0:
+            return None
+        first, last = RANGE.match(header.strip()).groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        elif last:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            return None
+        return (start, end) if start <= end else None
+
+PORT = int(os.getenv('FRONTEND_PORT', '8080'))
+# Serve the raw sources so edits are live; --dist serves the fingerprinted build (python build_frontend.py)
+frontend = Path(__file__).parent / 'frontend'
+root = frontend / 'public'
+if '--dist' in sys.argv[1:]:
+    if not (frontend / 'dist' / 'index.html').is_file():
+        sys.exit("frontend/dist not found; run python build_frontend.py first")
+    root = frontend / 'dist'
+os.chdir(root)
+
+
+class ThreadingFrontendServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
 
-PORT = 8080
-os.chdir(Path(__file__).parent / 'frontend' / 'public')
 
-with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-    print(f"Serving frontend on http://localhost:{PORT}")
+with ThreadingFrontendServer(("", PORT), MyHTTPRequestHandler) as httpd:
+    print(f"Serving {root} on http://localhost:{PORT}")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt: